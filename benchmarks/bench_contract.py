@@ -0,0 +1,93 @@
+__author__ = 'Arsenal_49'
+
+# Measure the time of the contract tests of a synthetic blueprint of 500 endpoints against the mock responses served
+# by another process with a simulated latency: one new connection per request with urllib (the sequential way), then
+# ContractRunner with one worker and with the bounded concurrency over the keep-alive connections.
+#
+# Usage: python benchmarks/bench_contract.py [--endpoints N] [--concurrency N] [--latency MS]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import asyncio
+import io
+import multiprocessing
+import time
+import urllib.error
+import urllib.request
+from benchmarks.generator import generate_blueprint
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.contract import ContractRunner
+from pre_commit_hook.mockserver import MockServer
+
+
+def _read_endpoints(count):
+    return BlueprintReader().read_stream(io.StringIO(''.join(generate_blueprint(groups=count // 10, endpoints=10))))
+
+
+def _serve(count, latency, connection):
+    mock_server = MockServer(_read_endpoints(count))
+
+    async def _handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                method, target = head.split(b' ', 2)[:2]
+                for line in head.lower().split(b'\r\n'):
+                    if line.startswith(b'content-length:'):
+                        await reader.readexactly(int(line.split(b':')[1]))
+                await asyncio.sleep(latency)
+                writer.write(mock_server.get_response(method, target))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    async def _run():
+        server = await asyncio.start_server(_handle, '127.0.0.1', 0)
+        connection.send(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+    asyncio.run(_run())
+
+
+def _run_with_urllib(runner):
+    for endpoint in runner.endpoints:
+        request = urllib.request.Request(runner.base_url + runner.get_target(endpoint), method=endpoint.method)
+        try:
+            with urllib.request.urlopen(request) as response:
+                runner.check_response(endpoint, response.status, response.read())
+        except urllib.error.HTTPError as e:
+            runner.check_response(endpoint, e.code, e.read())
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--endpoints', type=int, default=500, help='Number of the endpoints (multiple of 10)')
+    arg_parser.add_argument('--concurrency', type=int, default=16, help='Number of the concurrent requests')
+    arg_parser.add_argument('--latency', type=float, default=20, help='Milliseconds of the latency of the responses')
+    args = arg_parser.parse_args(argv)
+
+    receiver, sender = multiprocessing.Pipe(False)
+    server = multiprocessing.Process(target=_serve, args=(args.endpoints, args.latency / 1e3, sender), daemon=True)
+    server.start()
+    try:
+        url = 'http://127.0.0.1:%d' % receiver.recv()
+        endpoints = _read_endpoints(args.endpoints)
+        print('%d endpoints, %g ms latency:' % (len(endpoints), args.latency))
+
+        start_time = time.perf_counter()
+        _run_with_urllib(ContractRunner(endpoints, url))
+        sequential = time.perf_counter() - start_time
+        print('    urllib, a connection per request: %8.3f s' % sequential)
+        for concurrency in [1, args.concurrency]:
+            report = ContractRunner(endpoints, url, concurrency=concurrency).run()
+            assert not report.failures, report.failures[0].error
+            print('    ContractRunner, concurrency %3d:  %8.3f s (%.1fx)' % (concurrency, report.elapsed,
+                                                                           sequential / report.elapsed))
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+__author__ = 'Arsenal_49'
+
+# Measure the memory held by the element trees of the endpoints of a synthetic blueprint: the bytes per element, and
+# the number of the objects left for the cyclic garbage collector once the endpoints are dropped, i.e. the objects
+# which were kept alive by the reference cycles instead of being freed by the reference counting.
+#
+# Usage: python benchmarks/bench_element_memory.py [--groups N] [--endpoints N] [--copies N]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import gc
+import tracemalloc
+from benchmarks.generator import generate_blueprint
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.api.ApiContentElement import ApiContentSetElement, ApiContentDuplicateElement
+
+
+def _count_elements(endpoints):
+    elements = list()
+    for endpoint in endpoints:
+        elements.extend(element for name, element in endpoint.requests)
+        elements.extend(endpoint.responses.values())
+    count, seen = 0, set()
+    while elements:
+        element = elements.pop()
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+        count += 1
+        if isinstance(element, ApiContentDuplicateElement):
+            elements.append(element.source_element)
+        elif isinstance(element, ApiContentSetElement):
+            elements.extend(element.content.values() if isinstance(element.content, dict) else element.content)
+    return count
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--groups', type=int, default=8, help='Number of the groups of the blueprint')
+    arg_parser.add_argument('--endpoints', type=int, default=8, help='Number of the endpoints per group')
+    arg_parser.add_argument('--copies', type=int, default=10, help='Number of the blueprints loaded at the same time')
+    args = arg_parser.parse_args(argv)
+
+    lines = generate_blueprint(groups=args.groups, endpoints=args.endpoints)
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    blueprints = [BlueprintReader().read_stream(lines) for i in range(args.copies)]
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    element_count = sum(_count_elements(endpoints) for endpoints in blueprints)
+    del blueprints
+    garbage = gc.collect()
+    gc.enable()
+    print('blueprints:      %10d x %d lines' % (args.copies, len(lines)))
+    print('elements:        %10d' % element_count)
+    print('memory:          %10.1f KB' % (memory / 1024.0))
+    print('bytes/element:   %10.1f (with the endpoints and the keys)' % (float(memory) / element_count))
+    print('cyclic garbage:  %10d objects left for the gc after dropping the blueprints' % garbage)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+__author__ = 'Arsenal_49'
+
+# Compare the cost of building the key paths of the errors by searching each element among its siblings (as
+# get_key_path did before the keys were recorded at the attaching) with the current get_key_path, on a wide array of
+# the primitive elements and on a deep tree of the wide dictionaries.
+#
+# Usage: python benchmarks/bench_key_path.py [--width N] [--depth N] [--repeat N]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import timeit
+from pre_commit_hook.api.ApiContentElement import ApiContentElementFactory, ApiContentArrayElement
+
+
+def _get_key_path_by_search(element):
+    # The former get_key_path: the linear search of the element in its parent, level by level
+    parent = element._parent
+    if parent is None:
+        return None
+    if isinstance(parent, ApiContentArrayElement):
+        key_path = '%d' % [id(child) for child in parent.content].index(id(element))
+    else:
+        key_path = [key for key, child in parent.content.items() if id(child) == id(element)][0]
+    parent_key_path = _get_key_path_by_search(parent)
+    return '%s.%s' % (parent_key_path, key_path) if parent_key_path else key_path
+
+
+def _build_wide_array(width):
+    array = ApiContentElementFactory.get_response_element_by_type('array')
+    for i in range(width):
+        array.add_element(ApiContentElementFactory.get_response_element_by_type('number'))
+    return array, list(array.content)
+
+
+def _build_deep_tree(depth, width):
+    root = element = ApiContentElementFactory.get_response_element_by_type('dictionary')
+    leaves = list()
+    for level in range(depth):
+        for i in range(width):
+            leaf = ApiContentElementFactory.get_response_element_by_type('number')
+            element.add_element(leaf, 'key%d' % i)
+            leaves.append(leaf)
+        child = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        element.add_element(child, 'level%d' % level)
+        element = child
+    return root, leaves
+
+
+def _run(function, elements, repeat):
+    def _loop():
+        for element in elements:
+            function(element)
+    return min(timeit.repeat(_loop, number=1, repeat=repeat))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--width', type=int, default=5000, help='Number of the elements of the wide array')
+    arg_parser.add_argument('--depth', type=int, default=100, help='Depth of the nested dictionaries')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Number of the repeated runs')
+    args = arg_parser.parse_args(argv)
+
+    cases = [('wide array (%d items)' % args.width, _build_wide_array(args.width)),
+             ('deep tree (depth %d, 20 keys per level)' % args.depth, _build_deep_tree(args.depth, 20))]
+    for name, (root, elements) in cases:
+        assert all(_get_key_path_by_search(element) == element.get_key_path() for element in elements[-10:])
+        search = _run(_get_key_path_by_search, elements, args.repeat)
+        recorded = _run(lambda element: element.get_key_path(), elements, args.repeat)
+        print('%s, key paths of %d elements:' % (name, len(elements)))
+        print('    search in the parents: %10.2f ms' % (search * 1e3))
+        print('    recorded keys:         %10.2f ms (%.1fx)' % (recorded * 1e3, search / recorded))
+
+
+if __name__ == '__main__':
+    main()
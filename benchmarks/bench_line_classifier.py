@@ -0,0 +1,63 @@
+__author__ = 'Arsenal_49'
+
+# Compare the per-line cost of matching the patterns one by one (as _read_line did in each state) with the cost of
+# classifying the line once with _classify_line, on a prose-heavy blueprint.
+#
+# Usage: python benchmarks/bench_line_classifier.py [--lines N] [--repeat N]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import re
+import timeit
+from pre_commit_hook.apiary import _classify_line
+from pre_commit_hook.apiary import _group_title, _api_title, _api_method, _param_title, _param_string
+from pre_commit_hook.apiary import _request_title, _response_title
+
+_PROSE_LINES = [
+    'The endpoint returns the list of the departments of the hospital, ordered by the department code.\n',
+    'Use the `offset` and `limit` parameters for the pagination, see [the guide](/docs/pagination) for details.\n',
+    '\n',
+    '- The session key should be refreshed before it expires.\n',
+    '> Note: the response might be cached by the gateway for 30 seconds.\n',
+    '    + sessionKey    (string) ... SessionKey\n',
+]
+
+
+def _match_one_by_one(line):
+    # The worst case of the legacy _read_line, i.e. in the state after reading a group title:
+    if _api_title(line):
+        return 1
+    elif _api_method(line) or _param_title(line) or _param_string(line) or _request_title(line) \
+            or _response_title(line):
+        return 2
+    elif not re.match(r'\s+', line):
+        return 3
+    return 0
+
+
+def _run(function, lines, repeat):
+    def _loop():
+        for line in lines:
+            function(line)
+    return min(timeit.repeat(_loop, number=1, repeat=repeat)) / len(lines)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--lines', type=int, default=200000, help='Number of lines of the document')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Number of the repeated runs')
+    args = arg_parser.parse_args(argv)
+
+    lines = (_PROSE_LINES * (args.lines // len(_PROSE_LINES) + 1))[:args.lines]
+    legacy = _run(_match_one_by_one, lines, args.repeat)
+    classified = _run(_classify_line, lines, args.repeat)
+    print('patterns one by one: %8.1f ns/line' % (legacy * 1e9))
+    print('classify_line:       %8.1f ns/line' % (classified * 1e9))
+    print('speedup:             %8.1fx' % (legacy / classified))
+
+
+if __name__ == '__main__':
+    main()
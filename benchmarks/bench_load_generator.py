@@ -0,0 +1,62 @@
+__author__ = 'Arsenal_49'
+
+# Measure how far the load generator keeps up with its target rate: the mock server of the blueprint runs in its own
+# process, and the generator sends the requests at the growing rates on one core. Once the generator or the server
+# saturates, the achieved rate stays behind the target and the latencies (counted from the scheduled times) grow.
+#
+# Usage: python benchmarks/bench_load_generator.py [BLUEPRINT] [--rates 1000,5000,...] [--duration S]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.loadtest import LoadGenerator
+from pre_commit_hook.mockserver import MockServer
+
+_DEFAULT_BLUEPRINT = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'tests', 'order_2.apib')
+
+
+def _serve(blueprint, connection):
+    async def _run():
+        server = await MockServer(BlueprintReader().read_file(blueprint)).start('127.0.0.1', 0)
+        connection.send(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+    asyncio.run(_run())
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('blueprint', nargs='?', default=_DEFAULT_BLUEPRINT, help='The blueprint (.apib)')
+    arg_parser.add_argument('--rates', default='1000,2000,5000,10000', help='Target rates, comma separated')
+    arg_parser.add_argument('--duration', type=float, default=3.0, help='Seconds of each run')
+    arg_parser.add_argument('--connections', type=int, default=32, help='Number of the connections')
+    arg_parser.add_argument('--validate', type=float, default=0.0, help='Fraction of the validated responses')
+    args = arg_parser.parse_args(argv)
+
+    receiver, sender = multiprocessing.Pipe(False)
+    server = multiprocessing.Process(target=_serve, args=(args.blueprint, sender), daemon=True)
+    server.start()
+    try:
+        url = 'http://127.0.0.1:%d' % receiver.recv()
+        endpoints = BlueprintReader().read_file(args.blueprint)
+        print('%10s %10s %9s %9s %9s' % ('target', 'achieved', 'p50 ms', 'p99 ms', 'p99.9 ms'))
+        for rate in [float(rate) for rate in args.rates.split(',')]:
+            generator = LoadGenerator(endpoints, url, rate, args.duration, args.connections,
+                                      validate_fraction=args.validate)
+            histogram = generator.run().get_total_histogram()
+            print('%10.0f %10.0f %9.2f %9.2f %9.2f' % (rate, histogram.count / args.duration,
+                                                       histogram.get_percentile(50) / 1e3,
+                                                       histogram.get_percentile(99) / 1e3,
+                                                       histogram.get_percentile(99.9) / 1e3))
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+__author__ = 'Arsenal_49'
+
+# Compare building a large mock payload with generate_json_object and json.dumps (one item of the array per call,
+# as a tree of Python objects) with streaming it from MockDataGenerator, in MB/s.
+#
+# Usage: python benchmarks/bench_mock_data.py [--items N] [--size MB] [--repeat N]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import json
+import timeit
+from pre_commit_hook.api.ApiContentElement import ApiContentElementFactory
+from pre_commit_hook.mockdata import MockDataGenerator
+
+
+def _build_schema():
+    item = ApiContentElementFactory.get_response_element_by_type('dictionary')
+    for key, type_string in [('id', 'number'), ('name', 'string'), ('url', 'url'), ('created', 'timestamp'),
+                             ('paid', 'boolean')]:
+        item.add_element(ApiContentElementFactory.get_response_element_by_type(type_string), key)
+    items = ApiContentElementFactory.get_response_element_by_type('array')
+    items.add_element(item)
+    schema = ApiContentElementFactory.get_response_element_by_type('dictionary')
+    schema.add_element(items, 'orders')
+    schema.add_element(ApiContentElementFactory.get_response_element_by_type('number'), 'total')
+    return schema
+
+
+def _generate_with_objects(schema, items):
+    item = schema['orders'][0]
+    return json.dumps({'orders': [item.generate_json_object() for i in range(items)], 'total': items}).encode('utf-8')
+
+
+def _stream(schema, **options):
+    return sum(len(chunk) for chunk in MockDataGenerator(seed=49).iter_chunks(schema, **options))
+
+
+def _run(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--items', type=int, default=100000, help='Number of the items of the array')
+    arg_parser.add_argument('--size', type=int, default=64, help='Target size of the streamed payload, in MB')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Number of the repeated runs')
+    args = arg_parser.parse_args(argv)
+
+    schema = _build_schema()
+    megabytes = 1024.0 * 1024.0
+    size = len(_generate_with_objects(schema, args.items))
+    objects = _run(lambda: _generate_with_objects(schema, args.items), args.repeat)
+    streamed_size = _stream(schema, array_length=args.items)
+    streamed = _run(lambda: _stream(schema, array_length=args.items), args.repeat)
+    print('%d items:' % args.items)
+    print('    generate_json_object: %8.2f ms %8.1f MB/s' % (objects * 1e3, size / megabytes / objects))
+    print('    MockDataGenerator:    %8.2f ms %8.1f MB/s (%.1fx)' % (streamed * 1e3, streamed_size / megabytes / streamed,
+                                                                   objects / streamed))
+
+    target = args.size * 1024 * 1024
+    streamed = _run(lambda: _stream(schema, size=target), args.repeat)
+    print('%d MB payload:' % args.size)
+    print('    MockDataGenerator:    %8.2f ms %8.1f MB/s' % (streamed * 1e3, target / megabytes / streamed))
+
+
+if __name__ == '__main__':
+    main()
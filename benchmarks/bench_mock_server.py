@@ -0,0 +1,104 @@
+__author__ = 'Arsenal_49'
+
+# Measure the requests per second of the mock server on one core: the server runs in its own process, and the client
+# processes send the requests of the endpoints of the blueprint over the keep-alive connections, with or without
+# pipelining.
+#
+# Usage: python benchmarks/bench_mock_server.py [BLUEPRINT] [--clients N] [--connections N] [--depth N] [--duration S]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import re
+import socket
+import time
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.mockserver import MockServer
+
+_DEFAULT_BLUEPRINT = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'tests', 'order_2.apib')
+_content_length_search = re.compile(br'content-length: (\d+)', re.IGNORECASE).search
+
+
+def _serve(blueprint, connection):
+    async def _run():
+        server = await MockServer(BlueprintReader().read_file(blueprint)).start('127.0.0.1', 0)
+        connection.send(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+    asyncio.run(_run())
+
+
+def _get_requests(blueprint):
+    requests = list()
+    for endpoint in BlueprintReader().read_file(blueprint):
+        path = re.sub(r'\{[^{}/]+\}', 'X001', endpoint.path)
+        requests.append(b'%s %s HTTP/1.1\r\nHost: localhost\r\n\r\n' % (endpoint.method.encode(), path.encode()))
+    return requests
+
+
+def _count_responses(buffer):
+    count, start = 0, 0
+    while True:
+        end = buffer.find(b'\r\n\r\n', start)
+        if end < 0:
+            return count, buffer[start:]
+        body_end = end + 4 + int(_content_length_search(buffer, start, end).group(1))
+        if body_end > len(buffer):
+            return count, buffer[start:]
+        count += 1
+        start = body_end
+
+
+def _run_client(arguments):
+    port, requests, connections, depth, duration = arguments
+    sockets = [socket.create_connection(('127.0.0.1', port)) for i in range(connections)]
+    batch = b''.join(requests[i % len(requests)] for i in range(depth))
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for sock in sockets:
+            sock.sendall(batch)
+        for sock in sockets:
+            received, buffer = 0, b''
+            while received < depth:
+                buffer += sock.recv(1024 * 1024)
+                responses, buffer = _count_responses(buffer)
+                received += responses
+            count += received
+    for sock in sockets:
+        sock.close()
+    return count
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('blueprint', nargs='?', default=_DEFAULT_BLUEPRINT, help='The blueprint (.apib)')
+    arg_parser.add_argument('--clients', type=int, default=2, help='Number of the client processes')
+    arg_parser.add_argument('--connections', type=int, default=8, help='Number of the connections of each client')
+    arg_parser.add_argument('--depth', type=int, default=16, help='Number of the pipelined requests')
+    arg_parser.add_argument('--duration', type=float, default=3.0, help='Seconds of each run')
+    args = arg_parser.parse_args(argv)
+
+    receiver, sender = multiprocessing.Pipe(False)
+    server = multiprocessing.Process(target=_serve, args=(args.blueprint, sender), daemon=True)
+    server.start()
+    port = receiver.recv()
+    requests = _get_requests(args.blueprint)
+    try:
+        with multiprocessing.Pool(args.clients) as pool:
+            for depth in [1, args.depth]:
+                arguments = [(port, requests, args.connections, depth, args.duration)] * args.clients
+                count = sum(pool.map(_run_client, arguments))
+                print('%d connections, %2d pipelined request(s): %10.0f req/s' % (
+                    args.clients * args.connections, depth, count / args.duration))
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+__author__ = 'Arsenal_49'
+
+# Compare validating a large array of the primitive values item by item (as ApiContentArrayElement did for every
+# array) with the one-pass check of the types of the items, for validate_json_object and the compiled validators.
+#
+# Usage: python benchmarks/bench_primitive_arrays.py [--items N] [--repeat N]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import random
+import timeit
+from pre_commit_hook.api.ApiContentElement import ApiContentElementFactory
+from pre_commit_hook.api.ApiContentCompiler import get_compiled_validator
+
+
+def _validate_item_by_item(array, json_object):
+    for i in range(0, len(json_object)):
+        content_index = i if i < len(array.content) else 0
+        array.content[content_index].validate_json_object(json_object[i])
+
+
+def _run(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--items', type=int, default=100000, help='Number of the items of the arrays')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Number of the repeated runs')
+    args = arg_parser.parse_args(argv)
+
+    rng = random.Random(49)
+    payloads = [('number', [rng.choice([rng.randint(-9999, 9999), rng.random()]) for i in range(args.items)]),
+                ('boolean', [rng.random() < 0.5 for i in range(args.items)]),
+                ('string', ['value%d' % rng.randrange(1000) for i in range(args.items)])]
+    print('%-8s %14s %14s %14s' % ('type', 'item by item', 'one pass', 'compiled'))
+    for type_string, json_object in payloads:
+        array = ApiContentElementFactory.get_response_element_by_type('array')
+        array.add_element(ApiContentElementFactory.get_response_element_by_type(type_string))
+        validator = get_compiled_validator(array)
+        item_by_item = _run(lambda: _validate_item_by_item(array, json_object), args.repeat)
+        one_pass = _run(lambda: array.validate_json_object(json_object), args.repeat)
+        compiled = _run(lambda: validator(json_object), args.repeat)
+        print('%-8s %11.2f ms %11.2f ms %11.2f ms  (%.0fx)' % (type_string, item_by_item * 1e3, one_pass * 1e3,
+                                                             compiled * 1e3, item_by_item / one_pass))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+__author__ = 'Arsenal_49'
+
+# Measure the cost of the profiling hooks: the validation of a synthetic blueprint without the profiling, with the
+# Profiler, and again without it after a profiled run (the wrapped methods should be restored, so the time should be
+# the same as the first run).
+#
+# Usage: python benchmarks/bench_profiling.py [--groups N] [--repeat N]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import timeit
+from benchmarks.generator import generate_blueprint
+from pre_commit_hook.apiary import ApiaryValidator
+from pre_commit_hook.profiling import Profiler, profile_validation
+
+
+def _validate(lines):
+    valid, error = ApiaryValidator().validate_lines(lines)
+    assert valid, error
+
+
+def _validate_with_profiler(lines):
+    validator = ApiaryValidator()
+    with profile_validation(validator, Profiler()):
+        valid, error = validator.validate_lines(lines)
+    assert valid, error
+
+
+def _run(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--groups', type=int, default=16, help='Number of the groups of 8 endpoints')
+    arg_parser.add_argument('--repeat', type=int, default=10, help='Number of the repeated runs')
+    args = arg_parser.parse_args(argv)
+
+    lines = generate_blueprint(groups=args.groups)
+    disabled = _run(lambda: _validate(lines), args.repeat)
+    enabled = _run(lambda: _validate_with_profiler(lines), args.repeat)
+    restored = _run(lambda: _validate(lines), args.repeat)
+    print('%d lines:' % len(lines))
+    print('    without the profiling:       %8.2f ms' % (disabled * 1e3))
+    print('    with the Profiler:           %8.2f ms (+%.0f%%)' % (enabled * 1e3, 100.0 * (enabled / disabled - 1)))
+    print('    without it after profiling:  %8.2f ms (%+.1f%%)' % (restored * 1e3, 100.0 * (restored / disabled - 1)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+__author__ = 'Arsenal_49'
+
+# Compare the time of resolving a request path to its endpoint by matching the regex of each url template one by one
+# (as validate_traffic did) with the lookup in the segment trie of RouteIndex, for growing numbers of endpoints.
+#
+# Usage: python benchmarks/bench_route_index.py [--sizes 10,100,1000,5000] [--lookups N] [--repeat N]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import random
+import re
+import timeit
+from pre_commit_hook.blueprint import ApiEndpoint
+from pre_commit_hook.routes import RouteIndex
+
+
+def _get_endpoints(size):
+    return [ApiEndpoint('GET', '/interface/service%d/resource%d/{resourceId}/items/{itemId}{?sessionKey}' % (i % 20, i))
+            for i in range(size)]
+
+
+def _get_linear_lookup(endpoints):
+    routes = [(re.compile('%s$' % re.sub(r'\\\{[^/]*?\\\}', '[^/]+', re.escape(endpoint.path))).match, endpoint)
+              for endpoint in endpoints]
+
+    def _lookup(path):
+        for match, endpoint in routes:
+            if match(path):
+                return endpoint
+        return None
+    return _lookup
+
+
+def _run(lookup, paths, repeat):
+    def _loop():
+        for path in paths:
+            lookup(path)
+    return min(timeit.repeat(_loop, number=1, repeat=repeat)) / len(paths)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--sizes', default='10,100,1000,5000', help='Comma separated numbers of the endpoints')
+    arg_parser.add_argument('--lookups', type=int, default=2000, help='Number of the looked up paths')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Number of the repeated runs')
+    args = arg_parser.parse_args(argv)
+
+    rng = random.Random(49)
+    print('%10s %16s %16s %10s' % ('endpoints', 'linear us/path', 'trie us/path', 'speedup'))
+    for size in [int(size) for size in args.sizes.split(',')]:
+        endpoints = _get_endpoints(size)
+        paths = list()
+        for i in range(args.lookups):
+            index = rng.randrange(size)
+            paths.append('/interface/service%d/resource%d/R%d/items/%d' % (index % 20, index, i, i))
+
+        index = RouteIndex(endpoints)
+        linear = _run(_get_linear_lookup(endpoints), paths, args.repeat)
+        trie = _run(lambda path: index.lookup('GET', path), paths, args.repeat)
+        print('%10d %16.2f %16.2f %9.1fx' % (size, linear * 1e6, trie * 1e6, linear / trie))
+
+
+if __name__ == '__main__':
+    main()
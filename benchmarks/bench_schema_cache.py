@@ -0,0 +1,48 @@
+__author__ = 'Arsenal_49'
+
+# Compare the time of reading the endpoints of a synthetic blueprint with BlueprintReader (validating and decoding the
+# whole document) with the time of loading them from the serialized schemas of schema_cache.
+#
+# Usage: python benchmarks/bench_schema_cache.py [--groups N] [--endpoints N] [--repeat N]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import contextlib
+import io
+import timeit
+from benchmarks.generator import generate_blueprint
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.schema_cache import dump_endpoints, load_endpoints
+
+
+def _best_time(function, repeat):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--groups', type=int, default=32, help='Number of the groups of the blueprint')
+    arg_parser.add_argument('--endpoints', type=int, default=8, help='Number of the endpoints per group')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Number of the repeated runs')
+    args = arg_parser.parse_args(argv)
+
+    lines = generate_blueprint(groups=args.groups, endpoints=args.endpoints)
+    endpoints = BlueprintReader().read_stream(lines)
+    data = dump_endpoints(endpoints, 'benchmark')
+
+    parse_time = _best_time(lambda: BlueprintReader().read_stream(lines), args.repeat)
+    dump_time = _best_time(lambda: dump_endpoints(endpoints, 'benchmark'), args.repeat)
+    load_time = _best_time(lambda: load_endpoints(data, 'benchmark'), args.repeat)
+    print('blueprint: %d lines, %d endpoints, %d bytes serialized' % (len(lines), len(endpoints), len(data)))
+    print('full reparse: %10.2f ms' % (parse_time * 1e3))
+    print('dump:         %10.2f ms' % (dump_time * 1e3))
+    print('load:         %10.2f ms' % (load_time * 1e3))
+    print('speedup:      %10.1fx' % (parse_time / load_time))
+
+
+if __name__ == '__main__':
+    main()
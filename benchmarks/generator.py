@@ -0,0 +1,158 @@
+__author__ = 'Arsenal_49'
+
+# Generate the synthetic blueprints for the benchmarks. The payload schemas are random ApiContentElement trees, and
+# the example values in the code blocks come from a MockDataGenerator seeded by the rng of the blueprint, so the
+# documents exercise the same element types as the real ones. The generation is deterministic for a given seed, and
+# never touches the global state of the random module.
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import json
+import random
+from pre_commit_hook.api.ApiContentElement import ApiContentElementFactory, ApiContentElement
+from pre_commit_hook.mockdata import MockDataGenerator
+
+_LEAF_TYPES = ['string', 'string', 'number', 'number', 'boolean', 'url']
+_ANNOTATIONS = {
+    ApiContentElement.Type.string: 'string',
+    ApiContentElement.Type.url: 'string(url)',
+    ApiContentElement.Type.number: 'number',
+    ApiContentElement.Type.boolean: 'boolean',
+}
+_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'PATCH']
+_INDENT = ' ' * 8
+_DESCRIPTION = 'The description of the endpoint, which is only read by the people and skipped by the validator.'
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The payload schemas:
+# ----------------------------------------------------------------------------------------------------------------------
+def generate_schema(rng, depth=3, width=6):
+    """
+    Return a random dictionary element with up to width keys and up to depth levels of nested dictionaries and arrays.
+    """
+    schema = ApiContentElementFactory.get_response_element_by_type('dictionary')
+    for index in range(rng.randint(1, width)):
+        schema.add_element(_generate_element(rng, depth - 1, width), 'key%d' % index)
+        schema.content['key%d' % index].required = rng.random() < 0.7
+    return schema
+
+
+def _generate_element(rng, depth, width):
+    dice = rng.random()
+    if depth > 0 and dice < 0.2:
+        return generate_schema(rng, depth, width)
+    if depth > 0 and dice < 0.3:
+        array = ApiContentElementFactory.get_response_element_by_type('array')
+        if rng.random() < 0.5:
+            array.add_element(generate_schema(rng, depth - 1, width))
+        else:
+            array.add_element(ApiContentElementFactory.get_response_element_by_type(rng.choice(_LEAF_TYPES)))
+        return array
+    return ApiContentElementFactory.get_response_element_by_type(rng.choice(_LEAF_TYPES))
+
+
+def generate_payload(schema, seed=0):
+    """
+    Return a JSON object matching the schema, with the random values of a MockDataGenerator of the seed.
+    """
+    return json.loads(b''.join(MockDataGenerator(seed).iter_chunks(schema)).decode('utf-8'))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The code blocks:
+# ----------------------------------------------------------------------------------------------------------------------
+def render_code_block(schema, rng, array_length=2):
+    """
+    Return the lines of the annotated code block of the schema, indented for a request/response section.
+    """
+    lines = list()
+    values = MockDataGenerator(rng.getrandbits(32))
+    _render_element(schema, values, array_length, lines, 1, None, None, True)
+    return ['%s%s\n' % (_INDENT, line) for line in lines]
+
+
+def _render_element(element, values, array_length, lines, level, key, annotation, last):
+    prefix = '    ' * (level - 1) + ('"%s": ' % key if key is not None else '')
+    comma = '' if last else ','
+    comment = '  // [%s]' % annotation if annotation else ''
+
+    if element.type == ApiContentElement.Type.dictionary:
+        lines.append('%s{%s' % (prefix, comment))
+        keys = list(element.content.keys())
+        for index, child_key in enumerate(keys):
+            child = element.content[child_key]
+            _render_element(child, values, array_length, lines, level + 1, child_key, _get_annotation(child),
+                            index == len(keys) - 1)
+        lines.append('%s}%s' % ('    ' * (level - 1), comma))
+
+    elif element.type == ApiContentElement.Type.array:
+        lines.append('%s[%s' % (prefix, comment))
+        item = element.content[0]
+        for index in range(array_length):
+            _render_element(item, values, array_length, lines, level + 1, None, None, index == array_length - 1)
+        lines.append('%s]%s' % ('    ' * (level - 1), comma))
+
+    else:
+        value = json.loads(values.render(element).decode('utf-8'))
+        if element.type == ApiContentElement.Type.number:
+            value = abs(value) + 1  # the decoder only reads the positive numbers
+        lines.append('%s%s%s%s' % (prefix, json.dumps(value), comma, comment))
+
+
+def _get_annotation(element):
+    annotation = _ANNOTATIONS.get(element.type)
+    if not element.required:
+        return '%s, optional' % annotation if annotation else 'optional'
+    return annotation
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The blueprints:
+# ----------------------------------------------------------------------------------------------------------------------
+def generate_blueprint(groups=4, endpoints=8, parameters=2, depth=3, width=6, seed=49):
+    """
+    Return the lines of a valid blueprint with the given numbers of groups, endpoints per group, and url parameters
+    per endpoint. Each endpoint has a response block, and the non-GET endpoints also have a request block.
+
+    # For the doctest:
+    >>> from pre_commit_hook.apiary import ApiaryValidator
+    >>> lines = generate_blueprint(groups=2, endpoints=3)
+    >>> ApiaryValidator().validate_lines(lines)
+    (True, None)
+    """
+    rng = random.Random(seed)
+    lines = ['FORMAT: 1A\n', '\n', '# Synthetic API\n', '\n']
+    for group in range(groups):
+        lines.extend(['# Group Group%d\n' % group, '\n', '%s\n' % _DESCRIPTION, '\n'])
+        for endpoint in range(endpoints):
+            names = ['param%d' % index for index in range(parameters)]
+            url = '/group%d/resource%d' % (group, endpoint)
+            if names:
+                url = '%s/{%s}' % (url, names[0])
+            if len(names) > 1:
+                url = '%s{?%s}' % (url, ','.join(names[1:]))
+            method = rng.choice(_METHODS)
+
+            lines.extend(['## Resource %d-%d [%s]\n' % (group, endpoint, url), '\n',
+                          '### Action %d-%d [%s]\n' % (group, endpoint, method), '%s\n' % _DESCRIPTION, '\n'])
+            if names:
+                lines.append('+ Parameters\n')
+                for name in names:
+                    lines.append('    + %s (%s) ... The parameter %s\n' % (name, rng.choice(['string', 'number']), name))
+                lines.append('\n')
+            if method != 'GET':
+                lines.extend(['+ Request Payload (application/json)\n', '\n'])
+                lines.extend(render_code_block(generate_schema(rng, depth, width), rng))
+                lines.append('\n')
+            lines.extend(['+ Response 200 (application/json)\n', '\n'])
+            lines.extend(render_code_block(generate_schema(rng, depth, width), rng))
+            lines.append('\n')
+    return lines
+
+
+if __name__ == '__main__':
+    import sys
+    sys.stdout.writelines(generate_blueprint())
@@ -0,0 +1,209 @@
+__author__ = 'Arsenal_49'
+
+# Measure the throughput of the validator on the synthetic blueprints of growing sizes:
+#   - lines/sec of ApiaryValidator over the whole document,
+#   - lines/sec of ApiDecoder over the lines of the code blocks,
+#   - validations/sec of validate_json_object with the payloads generated from the parsed schemas, and of the
+#     validators compiled from the same schemas.
+# The throughput should stay flat across the sizes, the scaling exponent (the slope of log(time) over log(size)) close
+# to 1 means linear, and a clearly larger one exposes a superlinear behaviour.
+#
+# The results are saved as JSON and compared with the checked-in baseline, the run fails when a metric drops by more
+# than the tolerance.
+#
+# Usage: python benchmarks/run_benchmarks.py [--sizes 1,2,4,8,16,32] [--output results.json] [--baseline FILE]
+#                                            [--update-baseline] [--tolerance 0.3]
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import timeit
+from benchmarks.generator import generate_blueprint
+from pre_commit_hook.apiary import ApiaryValidator
+from pre_commit_hook.decoder import ApiDecoder
+from pre_commit_hook.api.ApiContentCompiler import get_compiled_validator
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'baseline.json')
+DEFAULT_SIZES = '1,2,4,8,16,32'
+_ENDPOINTS_PER_SIZE = 8  # each size unit is one group with 8 endpoints
+_PAYLOADS_PER_SCHEMA = 4
+_METRICS = ['validator_lines_per_sec', 'decoder_lines_per_sec', 'validations_per_sec', 'compiled_validations_per_sec']
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The measurements:
+# ----------------------------------------------------------------------------------------------------------------------
+def _best_time(function, repeat):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def _get_code_blocks(lines):
+    # The code blocks are the lines indented by 8 spaces, separated by the other lines:
+    blocks, block = list(), list()
+    for line in lines:
+        if line.startswith('        '):
+            block.append(line)
+        elif block:
+            blocks.append(block)
+            block = list()
+    if block:
+        blocks.append(block)
+    return blocks
+
+
+def _decode_blocks(blocks):
+    schemas = list()
+    for block in blocks:
+        decoder = ApiDecoder()
+        for line in block:
+            decoder.scan_line(line)
+        schemas.append(decoder.get_parsed_objects())
+    return schemas
+
+
+def measure(size, repeat, seed=49):
+    lines = generate_blueprint(groups=size, endpoints=_ENDPOINTS_PER_SIZE, seed=seed)
+    blocks = _get_code_blocks(lines)
+    block_line_count = sum(len(block) for block in blocks)
+
+    validator_time = _best_time(lambda: ApiaryValidator().validate_lines(lines), repeat)
+    decoder_time = _best_time(lambda: _decode_blocks(blocks), repeat)
+
+    random.seed(seed)
+    schemas = _decode_blocks(blocks)
+    pairs = [(schema, schema.generate_json_object()) for schema in schemas for i in range(_PAYLOADS_PER_SCHEMA)]
+
+    def _validate_payloads():
+        for schema, payload in pairs:
+            schema.validate_json_object(payload)
+    payload_time = _best_time(_validate_payloads, repeat)
+
+    compiled_pairs = [(get_compiled_validator(schema), payload) for schema, payload in pairs]
+
+    def _validate_payloads_compiled():
+        for validator, payload in compiled_pairs:
+            validator(payload)
+    compiled_time = _best_time(_validate_payloads_compiled, repeat)
+
+    return {
+        'size': size,
+        'lines': len(lines),
+        'block_lines': block_line_count,
+        'payloads': len(pairs),
+        'validator_lines_per_sec': len(lines) / validator_time,
+        'decoder_lines_per_sec': block_line_count / decoder_time,
+        'validations_per_sec': len(pairs) / payload_time,
+        'compiled_validations_per_sec': len(pairs) / compiled_time,
+    }
+
+
+def get_scaling_exponents(results):
+    """
+    Return the slope of log(time) over log(amount of work) between the smallest and the largest size per metric.
+    """
+    first, last = results[0], results[-1]
+    exponents = dict()
+    for metric, amount in [('validator_lines_per_sec', 'lines'), ('decoder_lines_per_sec', 'block_lines'),
+                           ('validations_per_sec', 'payloads'), ('compiled_validations_per_sec', 'payloads')]:
+        work_ratio = float(last[amount]) / first[amount]
+        if work_ratio <= 1:
+            continue
+        time_ratio = (last[amount] / last[metric]) / (first[amount] / first[metric])
+        exponents[metric] = math.log(time_ratio) / math.log(work_ratio)
+    return exponents
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The comparison with the baseline:
+# ----------------------------------------------------------------------------------------------------------------------
+def compare_with_baseline(report, baseline, tolerance):
+    """
+    Print the ratio of each metric to the baseline, and return the list of the metrics which dropped by more than
+    the tolerance.
+    """
+    regressions = list()
+    baseline_results = {result['size']: result for result in baseline.get('results', [])}
+    for result in report['results']:
+        expected = baseline_results.get(result['size'])
+        if expected is None:
+            continue
+        for metric in _METRICS:
+            if metric not in expected:
+                continue
+            ratio = result[metric] / expected[metric]
+            flag = ''
+            if ratio < 1 - tolerance:
+                flag = '  <-- regression'
+                regressions.append('%s @ size %d' % (metric, result['size']))
+            print('size %3d %-28s %12.0f vs %12.0f (%5.2fx)%s'
+                  % (result['size'], metric, result[metric], expected[metric], ratio, flag))
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                            help='Comma separated sizes, each unit is one group of %d endpoints (default: %%(default)s)'
+                                 % _ENDPOINTS_PER_SIZE)
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Number of the repeated runs')
+    arg_parser.add_argument('--output', default=None, help='Path for saving the results as JSON')
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Path of the baseline (default: %(default)s)')
+    arg_parser.add_argument('--update-baseline', action='store_true', help='Save the results as the new baseline')
+    arg_parser.add_argument('--tolerance', type=float, default=0.3,
+                            help='Allowed drop of a metric before it counts as a regression (default: %(default)s)')
+    args = arg_parser.parse_args(argv)
+
+    results = list()
+    print('%6s %8s %14s %14s %14s %14s' % ('size', 'lines', 'validator l/s', 'decoder l/s', 'validations/s',
+                                           'compiled/s'))
+    for size in [int(size) for size in args.sizes.split(',')]:
+        result = measure(size, args.repeat)
+        results.append(result)
+        print('%6d %8d %14.0f %14.0f %14.0f %14.0f' % (size, result['lines'], result['validator_lines_per_sec'],
+                                                       result['decoder_lines_per_sec'], result['validations_per_sec'],
+                                                       result['compiled_validations_per_sec']))
+
+    exponents = get_scaling_exponents(results) if len(results) > 1 else dict()
+    for metric, exponent in sorted(exponents.items()):
+        print('scaling exponent of %-28s %5.2f%s' % (metric, exponent, '  <-- superlinear' if exponent > 1.2 else ''))
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+        'scaling_exponents': exponents,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        return 0
+
+    try:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        print('no baseline found at %s' % args.baseline)
+        return 0
+    regressions = compare_with_baseline(report, baseline, args.tolerance)
+    if regressions:
+        print('regressions: %s' % ', '.join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,3 @@
+__author__ = 'admin'
+
+__version__ = '0.0.1.a1'
@@ -0,0 +1,255 @@
+__author__ = 'Arsenal_49'
+
+if __name__ == '__main__':
+    import sys, os
+    sys.path.append('%s/../../' % os.path.dirname(os.path.realpath(__file__)))
+
+import re
+from pre_commit_hook.api.ApiContentElement import ApiContentElement, ApiContentDuplicateElement
+from pre_commit_hook.api.ApiContentElement import ApiContentStringElement, ApiContentUrlElement
+from pre_commit_hook.api.ApiContentElement import ApiContentNumberElement, ApiContentTimestampElement
+from pre_commit_hook.api.ApiContentElement import ApiContentBooleanElement
+from pre_commit_hook.api.ApiContentElement import ApiContentArrayElement, ApiContentDictionaryElement
+from pre_commit_hook.api.ApiContentElement import get_bulk_types
+from pre_commit_hook.api.Exception import ResponseContentTypeNotValidException, ResponseContentNotFoundException
+
+# The same pattern as ApiContentUrlElement.validate_json_object, compiled once:
+_url_match = re.compile(r'^http(s)*:\/(\/[a-zA-Z0-9|_|-|\?|\.|=]*)+(\/)*$').match
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The compiled validators:
+# ----------------------------------------------------------------------------------------------------------------------
+def get_compiled_validator(element):
+    """
+    Return the function which validates a JSON object against the element tree, with the same results and the same
+    exceptions as element.validate_json_object. The function is compiled on the first call for the element and kept
+    by the element itself, so the cache lives as long as the schema. The tree should not be changed once it is
+    compiled (see clear_compiled_validators).
+
+    # For the doctest:
+    >>> from pre_commit_hook.api.ApiContentElement import ApiContentElementFactory
+    >>> schema = ApiContentElementFactory.get_response_element_by_type('dictionary')
+    >>> schema.add_element(ApiContentElementFactory.get_response_element_by_type('string'), 'name')
+    >>> validate = get_compiled_validator(schema)
+    >>> validate is get_compiled_validator(schema)
+    True
+    >>> validate({'name': 'Alice'})
+    >>> validate({'name': 49})
+    Traceback (most recent call last):
+    ...
+    pre_commit_hook.api.Exception.ResponseContentTypeNotValidException: error 902: The response content (49):<class 'int'> is not valid with type (string) for key path: name
+    """
+    validator = element._compiled_validator
+    if validator is None:
+        validator = _ApiContentCompiler(element).compile()
+    return validator
+
+
+def clear_compiled_validators(element):
+    """
+    Drop the compiled validators of the element tree, e.g. after changing the tree.
+    """
+    elements = [element]
+    while elements:
+        element = elements.pop()
+        if element._compiled_validator is None:
+            continue
+        element._compiled_validator = None
+        if isinstance(element, ApiContentDuplicateElement):
+            elements.append(element.source_element)
+        elif isinstance(element, ApiContentDictionaryElement):
+            elements.extend(element.content.values())
+        elif isinstance(element, ApiContentArrayElement):
+            elements.extend(element.content)
+
+
+def _register(element, validator):
+    element._compiled_validator = validator
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The validators of the values, same as the validate_json_object of each element class:
+# ----------------------------------------------------------------------------------------------------------------------
+def _compile_string(element):
+    def _validate(json_object, key_path=None):
+        if not isinstance(json_object, str):
+            raise ResponseContentTypeNotValidException(json_object, element.type.name, key_path)
+    return _validate
+
+
+def _compile_url(element):
+    def _validate(json_object, key_path=None):
+        assert isinstance(json_object, str)
+        return _url_match(json_object)
+    return _validate
+
+
+def _compile_number(element):
+    def _validate(json_object, key_path=None):
+        if not isinstance(json_object, (int, float)):
+            raise ResponseContentTypeNotValidException(json_object, element.type.name, key_path)
+    return _validate
+
+
+def _compile_timestamp(element):
+    def _validate(json_object, key_path=None):
+        return isinstance(json_object, (int, float))
+    return _validate
+
+
+def _compile_boolean(element):
+    def _validate(json_object, key_path=None):
+        if not isinstance(json_object, bool):
+            raise ResponseContentTypeNotValidException(json_object, element.type.name, key_path)
+    return _validate
+
+
+def _compile_duplicate(element):
+    # Looked up on each call, the source might be an ancestor which is still being compiled:
+    source_element = element.source_element
+
+    def _validate(json_object, key_path=None):
+        return get_compiled_validator(source_element)(json_object, key_path)
+    return _validate
+
+
+_value_compilers = {
+    ApiContentStringElement: _compile_string,
+    ApiContentUrlElement: _compile_url,
+    ApiContentNumberElement: _compile_number,
+    ApiContentTimestampElement: _compile_timestamp,
+    ApiContentBooleanElement: _compile_boolean,
+    ApiContentDuplicateElement: _compile_duplicate,
+}
+
+# The inline checks of the values in the generated code, {value} is the name of the variable. The values inside a
+# dictionary are only validated when they are truthy, where `is not True` is the same as not being a bool.
+_inline_checks = {
+    ApiContentStringElement: ('not isinstance({value}, str)', 'not isinstance({value}, str)'),
+    ApiContentNumberElement: ('not isinstance({value}, (int, float))', 'not isinstance({value}, (int, float))'),
+    ApiContentBooleanElement: ('{value} is not True', 'not isinstance({value}, bool)'),
+}
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The compiler for the dictionaries and the arrays:
+# ----------------------------------------------------------------------------------------------------------------------
+class _ApiContentCompiler(object):
+    """
+    Generate the source of one function per dictionary or array element. The keys of a dictionary are checked one by
+    one without a loop, the string/number/boolean values are checked inline, and the nested dictionaries and arrays
+    are validated by calling their own compiled functions with their key paths, which are only formatted for the
+    nested dictionaries and arrays, or when raising the errors.
+    """
+
+    def __init__(self, element):
+        assert isinstance(element, ApiContentElement)
+        self.element = element
+        self.namespace = {
+            '_TypeNotValid': ResponseContentTypeNotValidException,
+            '_NotFound': ResponseContentNotFoundException,
+            '_element': element,
+        }
+        self.children = list()  # the (name, element) of the children validated by their compiled functions
+        self.item_names = None  # the names of the validators for the items of an array with more than one element
+
+    def compile(self):
+        element_class = type(self.element)
+        if element_class is ApiContentDictionaryElement:
+            source = self._get_dictionary_source()
+        elif element_class is ApiContentArrayElement:
+            source = self._get_array_source()
+        elif element_class in _value_compilers:
+            validator = _value_compilers[element_class](self.element)
+            _register(self.element, validator)
+            return validator
+        else:
+            # The subclasses might define their own validation:
+            validator = self.element.validate_json_object
+            _register(self.element, validator)
+            return validator
+
+        exec(compile(source, '<compiled %s validator>' % self.element.type.name, 'exec'), self.namespace)
+        validator = self.namespace['_validate']
+        # Registered before compiling the children, so that a cycle of copied elements reuses this function:
+        _register(self.element, validator)
+        for name, child in self.children:
+            self.namespace[name] = get_compiled_validator(child)
+        if self.item_names is not None:
+            self.namespace['_item_validators'] = [self.namespace[name] for name in self.item_names]
+        return validator
+
+    def _get_dictionary_source(self):
+        lines = ['def _validate(json_object, key_path=None):',
+                 '    if not isinstance(json_object, dict):',
+                 '        raise _TypeNotValid(json_object, _element.type, key_path)',
+                 '    get = json_object.get']
+        for index, (key, child) in enumerate(self.element.content.items()):
+            key_name, child_name = '_key%d' % index, '_child%d' % index
+            self.namespace[key_name] = key
+            self.namespace[child_name] = child
+            lines.append('    value = get(%s)' % key_name)
+            if child.required:
+                lines.extend(['    if value is None:',
+                              "        raise _NotFound('%%s.%%s' %% (key_path, %s))" % key_name])
+            path = '%s if key_path is None else key_path + %r' % (key_name, '.' + key)
+            check = self._get_value_check(child, child_name, 'value', path, truthy=True)
+            if check:
+                lines.append('    if value:')
+                lines.extend('        %s' % line for line in check)
+        return '\n'.join(lines) + '\n'
+
+    def _get_array_source(self):
+        lines = ['def _validate(json_object, key_path=None):',
+                 '    if not isinstance(json_object, list):',
+                 '        raise _TypeNotValid(json_object, _element.type.name, key_path)']
+        content = self.element.content
+        bulk_types = get_bulk_types(content)
+        if bulk_types is not None:
+            # All the items are checked in one pass, the loops below only run for finding the error:
+            self.namespace['_bulk_types'] = bulk_types
+            lines.extend(['    if set(map(type, json_object)) <= _bulk_types:',
+                          '        return'])
+        if len(content) == 1:
+            self.namespace['_child0'] = content[0]
+            check = self._get_value_check(content[0], '_child0', 'item', 'item_path', truthy=False)
+            if check:
+                lines.extend(["    item_path = '0' if key_path is None else key_path + '.0'",
+                              '    for item in json_object:'])
+                lines.extend('        %s' % line for line in check)
+        else:
+            # The extra items are validated with the first element, as ApiContentArrayElement does:
+            names = list()
+            for index, child in enumerate(content):
+                names.append('_validator%d' % index)
+                self.children.append((names[-1], child))
+            self.item_names = names
+            lines.extend(["    item_paths = ['%d' % index if key_path is None else '%s.%d' % (key_path, index)",
+                          '                  for index in range(%d)]' % len(names),
+                          '    for index, item in enumerate(json_object):',
+                          '        index = index if index < %d else 0' % len(names),
+                          '        _item_validators[index](item, item_paths[index])'])
+        return '\n'.join(lines) + '\n'
+
+    def _get_value_check(self, child, child_name, value, path, truthy):
+        # The path is the expression of the key path of the child
+        child_class = type(child)
+        if child_class in _inline_checks:
+            condition = _inline_checks[child_class][0 if truthy else 1].format(value=value)
+            return ['if %s:' % condition,
+                    '    raise _TypeNotValid(%s, %s.type.name, %s)' % (value, child_name, path)]
+        if child_class is ApiContentUrlElement:
+            return ['assert isinstance(%s, str)' % value]
+        if child_class is ApiContentTimestampElement:
+            return list()  # never raises
+        validator_name = '_validator_%s' % child_name
+        self.children.append((validator_name, child))
+        return ['%s(%s, %s)' % (validator_name, value, path)]
+
+
+if __name__ == '__main__':
+
+    # Running the doctest:
+    import doctest
+    doctest.testmod()
@@ -1,7 +1,5 @@
 __author__ = 'admin'
 
-DEBUG=True
-
 if __name__ == '__main__':
     import sys, os
     sys.path.append('%s/../' % os.path.dirname(os.path.realpath(__file__)))
@@ -10,8 +8,11 @@ from abc import ABCMeta, abstractclassmethod, abstractmethod
 from pre_commit_hook.api.Exception import ResponseContentTypeNotValidException, ResponseContentNotFoundException
 from enum import Enum
 import re
+import hashlib
 import random
 import string
+import sys
+import weakref
 import six
 
 # --------------------------------------------------------------------------------------
@@ -29,22 +30,89 @@ class ApiContentElement(object):
         boolean     = 6
         duplicate   = 7
 
-    content  = None
-    default  = None
-    type     = None
-    required = True
+    # No __dict__ per element, the schemas of the blueprints loaded at the same time could hold millions of them:
+    __slots__ = ('content', 'default', 'type', '_required', '_parent_ref', '_key', '_fingerprints',
+                 '_compiled_validator', '__weakref__')
+
+    # The exact types of the values which validate_json_object always accepts, for checking a whole array of the
+    # values at once (see get_bulk_types), None for the elements without such a check:
+    _bulk_types = None
 
     def __init__(self, type):
         assert isinstance(type, ApiContentElement.Type), "The type of the element should be ApiResponseElement.Type"
+        self.content    = None
+        self.default    = None
+        self._fingerprints = None  # see get_fingerprint
+        self._parent_ref = None # for fetching the key_path
+        self._key       = None  # the key or the index of the element in the parent
         self.required   = True
         self.type       = type
-        self._parent    = None # for fetching the key_path
+        self._compiled_validator = None  # see ApiContentCompiler.get_compiled_validator
 
     def __str__(self):
         return self._get_description()
 
     def __eq__(self, other):
-        return self.type == other.type
+        return self.get_fingerprint() == other.get_fingerprint()
+
+    @property
+    def required(self):
+        return self._required
+
+    @required.setter
+    def required(self, required):
+        self._required = required
+        self._invalidate_fingerprints()
+        parent = self._parent
+        if parent is not None:
+            parent._update_required_key(self)
+
+    # Fingerprint Related: ---------------------------------------------------------------------------------------------
+    def get_fingerprint(self):
+        """
+        Return the digest of the parts of the tree compared by __eq__: the type of a value, the required keys of a
+        dictionary with their values, and the set of the items of an array. It is computed once and kept until the
+        tree is changed through add_element, merge or required, so the equality is a compare of two digests.
+
+        # For the doctest:
+        >>> a = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        >>> b = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        >>> a.add_element(ApiContentElementFactory.get_response_element_by_type('number'), 'id')
+        >>> b.add_element(ApiContentElementFactory.get_response_element_by_type('number'), 'id')
+        >>> a.get_fingerprint() == b.get_fingerprint(), a == b
+        (True, True)
+        >>> b['id'].required = False
+        >>> a.get_fingerprint() == b.get_fingerprint(), a == b
+        (False, False)
+        """
+        fingerprints = self._fingerprints
+        if fingerprints is None:
+            fingerprints = self._fingerprints = self._compute_fingerprints()
+        return fingerprints[0]
+
+    def get_structure_fingerprint(self):
+        """
+        Return the digest of the whole structure of the tree: the classes, the types, the required flags, the default
+        values, all the keys of the dictionaries and the items of the arrays in order. Two trees with the same
+        structure fingerprint are interchangeable, see ApiContentElementInterner.
+        """
+        fingerprints = self._fingerprints
+        if fingerprints is None:
+            fingerprints = self._fingerprints = self._compute_fingerprints()
+        return fingerprints[1]
+
+    def _compute_fingerprints(self):
+        header = ('%s\0%d\0%r' % (type(self).__name__, self.type.value, self.default)).encode('utf-8')
+        structure = _digest(b'%s\0%d' % (header, self.required))
+        return _digest(b'%d' % self.type.value), structure
+
+    def _invalidate_fingerprints(self):
+        # A cached fingerprint of the parent implies the cached fingerprints of all its children, so the climbing
+        # stops at the first element without the fingerprints:
+        element = self
+        while element is not None and element._fingerprints is not None:
+            element._fingerprints = None
+            element = element._parent
 
     def _get_description(self, indents=0):
         return "(%s, required: %s)" % (self.type.name, self.required)
@@ -62,22 +130,69 @@ class ApiContentElement(object):
         assert self.__class__.validate_with_value(value), \
             "The input string format is not compatible to the element type"
         self.default = value
+        self._invalidate_fingerprints()
 
-    def set_parent(self, parent):
+    def set_parent(self, parent, key=None):
         assert isinstance(parent, ApiContentSetElement), 'The parent can only be an array or a dictionary'
         self._parent = parent
+        self._key = key
+
+    def __getstate__(self):
+        # The weak link to the parent can not be copied or pickled, the state keeps the parent itself instead:
+        state = dict()
+        for cls in type(self).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name not in ('__weakref__', '_parent_ref', '_fingerprints', '_compiled_validator') and \
+                        hasattr(self, name):
+                    state[name] = getattr(self, name)
+        state['_parent'] = self._parent
+        return state
+
+    def __setstate__(self, state):
+        self._fingerprints = None
+        self._compiled_validator = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    # The parent is only weakly referenced, so the trees have no reference cycles and are freed without the gc:
+    @property
+    def _parent(self):
+        parent_ref = self._parent_ref
+        return None if parent_ref is None else parent_ref()
+
+    @_parent.setter
+    def _parent(self, parent):
+        self._parent_ref = None if parent is None else weakref.ref(parent)
 
     def get_key_path(self):
-        if self._parent:
-            return self._parent.get_key_path_with_element(element=self)
-        return None
+        # Climb the parents with the keys recorded when the elements were attached, in time proportional to the depth.
+        # An element shared by several trees (see ApiContentElementInterner) keeps the parent it was first attached to,
+        # the errors of the validation carry the key paths from where it started instead:
+        keys = list()
+        element, parent = self, self._parent
+        while parent is not None:
+            keys.append(parent._get_key_of_element(element))
+            element, parent = parent, parent._parent
+        if not keys:
+            return None
+        keys.reverse()
+        return '.'.join(keys)
+
+    def copy(self):
+        # The values have no children, the copy keeps all the slots but the parent:
+        copy_element = type(self).__new__(type(self))
+        copy_element.__setstate__(self.__getstate__())
+        copy_element._parent = None
+        copy_element._key = None
+        return copy_element
 
     @abstractclassmethod
     def generate_json_object(self):
         return None
 
     @abstractclassmethod
-    def validate_json_object(self, json_object):
+    def validate_json_object(self, json_object, key_path=None):
+        # The key path of the element in the validated object, None for the element the validation starts from
         pass
 
 
@@ -86,6 +201,8 @@ class ApiContentElement(object):
 # The Class for Special Response Element Type (Duplicate):
 # --------------------------------------------------------------------------------------
 class ApiContentDuplicateElement(ApiContentElement):
+    __slots__ = ('source_element',)
+
     def __init__(self, source_element):
         assert isinstance(source_element, ApiContentElement), "The duplicate source should be an ApiResponseElement"
         self.source_element = source_element
@@ -94,8 +211,13 @@ class ApiContentDuplicateElement(ApiContentElement):
     def generate_json_object(self):
         return self.source_element.generate_json_object()
 
-    def validate_json_object(self, json_object):
-        return self.source_element.validate_json_object(json_object)
+    def validate_json_object(self, json_object, key_path=None):
+        return self.source_element.validate_json_object(json_object, key_path)
+
+    def _compute_fingerprints(self):
+        # Compared as the source element, instead of only by the type:
+        fingerprint = self.source_element.get_fingerprint()
+        return fingerprint, _digest(b'duplicate\0%s' % self.source_element.get_structure_fingerprint())
 
     def _get_required_keys(self):
         if hasattr(self.source_element, '_get_required_keys'):
@@ -108,6 +230,9 @@ class ApiContentDuplicateElement(ApiContentElement):
 # The Class for String Value Element:
 # --------------------------------------------------------------------------------------
 class ApiContentStringElement(ApiContentElement):
+    __slots__ = ()
+    _bulk_types = frozenset([str])
+
     def __init__(self, type=None):
         if not type:
             type = ApiContentElement.Type.string
@@ -119,18 +244,21 @@ class ApiContentStringElement(ApiContentElement):
         result  = ''.join(random.sample(samples, length))
         return result
 
-    def validate_json_object(self, json_object):
+    def validate_json_object(self, json_object, key_path=None):
         if not isinstance(json_object, str):
             raise ResponseContentTypeNotValidException(
                 json_object,
                 self.type.name,
-                self.get_key_path())
+                key_path)
 
 
 # --------------------------------------------------------------------------------------
 # The Class for URL Value Element:
 # --------------------------------------------------------------------------------------
 class ApiContentUrlElement(ApiContentStringElement):
+    __slots__ = ()
+    _bulk_types = frozenset([str])  # the url validation never raises with a string
+
     def __init__(self):
         super(ApiContentUrlElement, self).__init__(ApiContentElement.Type.url)
 
@@ -146,7 +274,7 @@ class ApiContentUrlElement(ApiContentStringElement):
 
         return url_string
 
-    def validate_json_object(self, json_object):
+    def validate_json_object(self, json_object, key_path=None):
         assert isinstance(json_object, str)
         url_pattern = '^http(s)*:\/(\/[a-zA-Z0-9|_|-|\?|\.|=]*)+(\/)*$'
         return re.match(url_pattern, json_object)
@@ -155,6 +283,9 @@ class ApiContentUrlElement(ApiContentStringElement):
 # The Class for Number Value Element:
 # --------------------------------------------------------------------------------------
 class ApiContentNumberElement(ApiContentElement):
+    __slots__ = ()
+    _bulk_types = frozenset([int, float, bool])
+
     def __init__(self, type=None):
         if not type:
             type = ApiContentElement.Type.number
@@ -163,18 +294,21 @@ class ApiContentNumberElement(ApiContentElement):
     def generate_json_object(self):
         return random.randint(-9999, 9999)
 
-    def validate_json_object(self, json_object):
+    def validate_json_object(self, json_object, key_path=None):
         if not isinstance(json_object, int) and not isinstance(json_object, float):
             raise ResponseContentTypeNotValidException(
                 json_object,
                 self.type.name,
-                self.get_key_path())
+                key_path)
 
 
 # --------------------------------------------------------------------------------------
 # The Class for Timestamp Value Element:
 # --------------------------------------------------------------------------------------
 class ApiContentTimestampElement(ApiContentNumberElement):
+    __slots__ = ()
+    _bulk_types = None
+
     def __init__(self):
         super(ApiContentTimestampElement, self).__init__(ApiContentElement.Type.timestamp)
 
@@ -182,13 +316,16 @@ class ApiContentTimestampElement(ApiContentNumberElement):
         import time
         return int(time.time())
 
-    def validate_json_object(self, json_object):
+    def validate_json_object(self, json_object, key_path=None):
         return isinstance(json_object, int) or isinstance(json_object, float)
 
 # --------------------------------------------------------------------------------------
 # The Class for Boolean Value Element:
 # --------------------------------------------------------------------------------------
 class ApiContentBooleanElement(ApiContentElement):
+    __slots__ = ()
+    _bulk_types = frozenset([bool])
+
     def __init__(self):
         super(ApiContentBooleanElement, self).__init__(ApiContentElement.Type.boolean)
 
@@ -196,30 +333,28 @@ class ApiContentBooleanElement(ApiContentElement):
         ApiContentBooleanElement.validate_with_value(value)
         true_pattern = r'^(true|y|t)$'
         self.default = re.match(true_pattern, value) is not None
+        self._invalidate_fingerprints()
 
     def generate_json_object(self):
         return random.randint(0, 1) == 1
 
-    def validate_json_object(self, json_object):
+    def validate_json_object(self, json_object, key_path=None):
         if not isinstance(json_object, bool):
             raise ResponseContentTypeNotValidException(
                 json_object,
                 self.type.name,
-                self.get_key_path())
+                key_path)
 
 # --------------------------------------------------------------------------------------
 # The Base Class for Set Element:
 # --------------------------------------------------------------------------------------
 @six.add_metaclass(ABCMeta)
 class ApiContentSetElement(ApiContentElement):
+    __slots__ = ()
+
     def __init__(self, type):
         super(ApiContentSetElement, self).__init__(type)
 
-    @abstractclassmethod
-    def __eq__(self, other):
-        # Should re-define the equality for the SetElement
-        return False
-
     @abstractclassmethod
     def _get_description(self, indents=0):
         return None
@@ -239,10 +374,16 @@ class ApiContentSetElement(ApiContentElement):
     def get_key_path_with_element(self):
         return None
 
+    def _update_required_key(self, element):
+        # Called when the element changed its required, see ApiContentDictionaryElement.required_keys
+        pass
+
 # --------------------------------------------------------------------------------------
 # The Class for Array Value Element:
 # --------------------------------------------------------------------------------------
 class ApiContentArrayElement(ApiContentSetElement):
+    __slots__ = ()
+
     def __init__(self):
         super(ApiContentArrayElement, self).__init__(ApiContentElement.Type.array)
         self.content = list()
@@ -250,28 +391,13 @@ class ApiContentArrayElement(ApiContentSetElement):
     def __len__(self):
         return len(self.content)
 
-    def __eq__(self, other):
-        if self.type != other.type:
-            return False
-
-        for my_element in self.content:
-            found_matched = False
-            for others_element in other.content:
-                if my_element == others_element:
-                    found_matched = True
-                    break
-            if not found_matched:
-                return False
-
-        for others_element in other.content:
-            found_matched = False
-            for my_element in self.content:
-                if my_element == others_element:
-                    found_matched = True
-                    break
-            if not found_matched:
-                return False
-        return True
+    def _compute_fingerprints(self):
+        # The arrays are equal with the same set of the items, the structure keeps the items in order:
+        items = [(element.get_fingerprint(), element.get_structure_fingerprint()) for element in self.content]
+        fingerprint = _digest(b'array\0%s' % b''.join(sorted(set(item[0] for item in items))))
+        header = ApiContentElement._compute_fingerprints(self)[1]
+        structure = _digest(b'%s\0%s' % (header, b''.join(item[1] for item in items)))
+        return fingerprint, structure
 
     def __getitem__(self, index):
         assert isinstance(index, int) and index < len(self.content)
@@ -284,11 +410,15 @@ class ApiContentArrayElement(ApiContentSetElement):
         return len(self.content)
 
     def copy(self):
+        # The children are copied as well, so that they are attached to the copy (not merged like add_element does):
         copy_element = ApiContentArrayElement()
         copy_element.type = self.type
         copy_element.default = self.default
         copy_element.required = self.required
-        copy_element = self.content[:]
+        for element in self.content:
+            element = element.copy()
+            copy_element.content.append(element)
+            element.set_parent(copy_element, len(copy_element.content) - 1)
         return copy_element
 
     def _get_description(self, indents=0):
@@ -302,12 +432,7 @@ class ApiContentArrayElement(ApiContentSetElement):
 
     def get_key_path_with_element(self, element):
         assert isinstance(element, ApiContentElement), 'The input element should be an ApiResponseElement'
-        key_path = None
-        for index in range(len(self.content)):
-            if id(self[index]) == id(element):
-                key_path = '%d' % index
-                break
-        assert key_path, 'Error: could not found the corresponding element'
+        key_path = self._get_key_of_element(element)
 
         parent_key_path = self.get_key_path()
         if parent_key_path:
@@ -323,7 +448,20 @@ class ApiContentArrayElement(ApiContentSetElement):
             assert element == original, 'Syntax Error: trying to add element to the Array which is not match'
             element.merge(original)
         self.content.append(element)
-        element.set_parent(self)
+        element.set_parent(self, len(self.content) - 1)
+        self._invalidate_fingerprints()
+
+    def _get_key_of_element(self, element):
+        index = element._key
+        if not (isinstance(index, int) and index < len(self.content) and self.content[index] is element):
+            # Not attached by add_element, search for the element instead:
+            index = None
+            for i in range(len(self.content)):
+                if id(self[i]) == id(element):
+                    index = i
+                    break
+            assert index is not None, 'Error: could not found the corresponding element'
+        return '%d' % index
 
     def generate_json_object(self):
         json_object = list()
@@ -331,53 +469,53 @@ class ApiContentArrayElement(ApiContentSetElement):
             json_object.append(element.generate_json_object())
         return json_object
 
-    def validate_json_object(self, json_object):
+    def validate_json_object(self, json_object, key_path=None):
         if not isinstance(json_object, list):
             raise ResponseContentTypeNotValidException(
                 json_object,
                 self.type.name,
-                self.get_key_path())
+                key_path)
+
+        # Check the types of all the items in one pass, and only validate them one by one for finding the error:
+        bulk_types = get_bulk_types(self.content)
+        if bulk_types is not None and set(map(type, json_object)) <= bulk_types:
+            return
 
         for i in range(0, len(json_object)):
             content_index = i
             if not content_index < len(self.content):
                 content_index = 0 # TODO: find the proper index for the self.content
-            self.content[content_index].validate_json_object(json_object[i])
+            self.content[content_index].validate_json_object(json_object[i], _join_key_path(key_path, content_index))
 
 # --------------------------------------------------------------------------------------
 # The Class for Dictionary Value Element:
 # --------------------------------------------------------------------------------------
 class ApiContentDictionaryElement(ApiContentSetElement):
+    __slots__ = ('_required_key_set', '_required_keys')
+
     def __init__(self):
         super(ApiContentDictionaryElement, self).__init__(ApiContentElement.Type.dictionary)
         self.content = dict()
+        self._required_key_set = set()  # kept by add_element, None to rebuild it from the content
+        self._required_keys = None  # the frozenset of the required keys, see required_keys
 
     def __len__(self):
         return len(self.content)
 
-    def __eq__(self, other):
-        # validate if the types are the same:
-        if self.type != other.type:
-            if DEBUG:
-                print('DEBUG for __eq__: types not matched')
-            return False
-
-        # validate if the required keys are the same:
-        self_required_keys  = self._get_required_keys()
-        other_required_keys = other._get_required_keys()
-        if not self_required_keys == other_required_keys:
-            if DEBUG:
-                print('DEBUG for __eq__: required keys not matched\n self: %s\n other: %s'
-                      % (self_required_keys, other_required_keys))
-            return False
-        # validate the values:
-        for key in self_required_keys:
-            if not self.content.get(key) == other.content.get(key):
-                print('DEBUG for __eq__: values not match for key: %s\n self: %s\n other: %s'
-                      % (key, self.content.get(key), other.content.get(key)))
-                return False
-
-        return True
+    def _compute_fingerprints(self):
+        # The dictionaries are equal with the same required keys and the same values of them:
+        required, structure = list(), list()
+        required_keys = self.required_keys
+        for key in sorted(self.content):
+            element = self.content[key]
+            encoded_key = key.encode('utf-8')
+            encoded_key = b'%d:%s' % (len(encoded_key), encoded_key)
+            if key in required_keys:
+                required.append(encoded_key + element.get_fingerprint())
+            structure.append(encoded_key + element.get_structure_fingerprint())
+        fingerprint = _digest(b'dictionary\0%s' % b''.join(required))
+        header = ApiContentElement._compute_fingerprints(self)[1]
+        return fingerprint, _digest(b'%s\0%s' % (header, b''.join(structure)))
 
     def __getitem__(self, key):
         assert isinstance(key, str)
@@ -396,7 +534,8 @@ class ApiContentDictionaryElement(ApiContentSetElement):
         copy_element.type = self.type
         copy_element.default = self.default
         copy_element.required = self.required
-        copy_element.content = self.content.copy()
+        for key, element in self.content.items():
+            copy_element.add_element(element.copy(), key)
         return copy_element
 
     def merge(self, other):
@@ -409,14 +548,43 @@ class ApiContentDictionaryElement(ApiContentSetElement):
     def get(self, key, default=None):
         return self.content.get(key, default)
 
-    def _get_required_keys(self):
-        required_keys = list()
-        for key in self.content:
-            if self.content.get(key).required:
-                required_keys.append(key)
-        required_keys.sort()
+    @property
+    def required_keys(self):
+        """
+        The frozenset of the keys of the required elements, kept up to date by add_element, merge and the required of
+        the elements. The content should not be changed directly, or the set should be reset by setting
+        _required_key_set to None.
+
+        # For the doctest:
+        >>> d = ApiContentDictionaryElement()
+        >>> d.add_element(ApiContentElementFactory.get_response_element_by_type('number'), 'id')
+        >>> d.add_element(ApiContentElementFactory.get_response_element_by_type('string'), 'name')
+        >>> sorted(d.required_keys)
+        ['id', 'name']
+        >>> d['name'].required = False
+        >>> sorted(d.required_keys)
+        ['id']
+        """
+        required_keys = self._required_keys
+        if required_keys is None:
+            if self._required_key_set is None:
+                self._required_key_set = set(key for key, element in self.content.items() if element.required)
+            required_keys = self._required_keys = frozenset(self._required_key_set)
         return required_keys
 
+    def _get_required_keys(self):
+        return sorted(self.required_keys)
+
+    def _update_required_key(self, element):
+        key = element._key
+        if self._required_key_set is None or key is None or self.content.get(key) is not element:
+            return
+        if element.required:
+            self._required_key_set.add(key)
+        else:
+            self._required_key_set.discard(key)
+        self._required_keys = None
+
     def _get_description(self, indents=0):
         indent_string = ApiContentElement._get_indents_string(indents)
         string = "%s{" % indent_string
@@ -430,17 +598,27 @@ class ApiContentDictionaryElement(ApiContentSetElement):
     def add_element(self, element, key=None):
         assert key is not None
         super(ApiContentDictionaryElement, self).add_element(element, key)
+        key = sys.intern(key)  # the same keys repeat across the schemas
         self.content[key] = element
-        element.set_parent(self)
+        element.set_parent(self, key)
+        self._update_required_key(element)
+        self._invalidate_fingerprints()
+
+    def _get_key_of_element(self, element):
+        key = element._key
+        if key is None or self.content.get(key) is not element:
+            # Not attached by add_element, search for the element instead:
+            key = None
+            for other_key in self.content:
+                if id(self.content.get(other_key)) == id(element):
+                    key = other_key
+                    break
+            assert key, 'Error: could not found the corresponding element'
+        return '%s' % key
 
     def get_key_path_with_element(self, element):
         assert isinstance(element, ApiContentElement), 'The input element should be an ApiResponseElement'
-        key_path = None
-        for key in self.content:
-            if id(self.content.get(key)) == id(element):
-                key_path = '%s' % key
-                break
-        assert key_path, 'Error: could not found the corresponding element'
+        key_path = self._get_key_of_element(element)
 
         parent_key_path = self.get_key_path()
         if parent_key_path:
@@ -459,21 +637,112 @@ class ApiContentDictionaryElement(ApiContentSetElement):
 
         return json_object
 
-    def validate_json_object(self, json_object):
+    def validate_json_object(self, json_object, key_path=None):
         if not isinstance(json_object, dict):
             raise ResponseContentTypeNotValidException(
                 json_object,
                 self.type,
-                self.get_key_path())
+                key_path)
 
         for key in self.content:
             element   = self.content.get(key)
             js_object = json_object.get(key, None)
             if js_object is None and element.required:
-                key_path = '%s.%s' % (self.get_key_path(), key)
-                raise ResponseContentNotFoundException(key_path)
+                raise ResponseContentNotFoundException('%s.%s' % (key_path, key))
             if js_object:
-                self.content[key].validate_json_object(js_object)
+                self.content[key].validate_json_object(js_object, _join_key_path(key_path, key))
+
+# --------------------------------------------------------------------------------------
+# The Interner for the Identical Element Trees:
+# --------------------------------------------------------------------------------------
+class ApiContentElementInterner(object):
+    '''
+    Keep one instance of each element tree with the same structure fingerprint, so the identical schemas of the
+    endpoints are stored once: the same error body documented for every endpoint, and the same sub-trees nested in
+    different bodies (e.g. the pagination envelope of every list). The trees are interned from the leaves up, each
+    child is replaced by the first sub-tree seen with the same structure, so a sub-tree could be shared by several
+    parents. A shared element keeps the parent it was first attached to, the validation passes the key paths of the
+    errors down instead (see validate_json_object). The interned trees should not be changed afterwards.
+
+    # For the doctest:
+    >>> interner = ApiContentElementInterner()
+    >>> a = ApiContentElementFactory.get_response_element_by_type('dictionary')
+    >>> b = ApiContentElementFactory.get_response_element_by_type('dictionary')
+    >>> interner.intern(a) is a, interner.intern(b) is a
+    (True, True)
+    >>> c = ApiContentElementFactory.get_response_element_by_type('dictionary')
+    >>> c.add_element(ApiContentElementFactory.get_response_element_by_type('dictionary'), 'page')
+    >>> interner.intern(c) is c, c['page'] is a
+    (True, True)
+    '''
+
+    def __init__(self):
+        self._elements = weakref.WeakValueDictionary()  # the interned elements by the structure fingerprint
+
+    def __len__(self):
+        return len(self._elements)
+
+    def intern(self, element):
+        # Without the recursion: a container is visited again after its children, which are interned by then
+        elements = self._elements
+        stack = [(element, False)]
+        while stack:
+            current, visited = stack.pop()
+            if isinstance(current, ApiContentDictionaryElement):
+                children = list(current.content.items())
+            elif isinstance(current, ApiContentArrayElement):
+                children = list(enumerate(current.content))
+            else:
+                continue
+            if not visited:
+                stack.append((current, True))
+                # The interned sub-trees are already made of the interned elements:
+                stack.extend((child, False) for key, child in children
+                             if elements.get(child.get_structure_fingerprint()) is not child)
+                continue
+            for key, child in children:
+                interned = self._intern_element(child)
+                if interned is not child:
+                    current.content[key] = interned
+        return self._intern_element(element)
+
+    def _intern_element(self, element):
+        fingerprint = element.get_structure_fingerprint()
+        interned = self._elements.get(fingerprint)
+        if interned is None:
+            self._elements[fingerprint] = interned = element
+        return interned
+
+
+def _join_key_path(key_path, key):
+    # The key path of a child, with the key path None of the element the validation starts from
+    return '%s' % key if key_path is None else '%s.%s' % (key_path, key)
+
+
+def get_bulk_types(elements):
+    '''
+    Return the set of the exact types of the values accepted by all the elements, when they are the primitive elements
+    of the same class, or None. A list of the values of these types is valid against the elements in any order.
+
+    # For the doctest:
+    >>> number = ApiContentElementFactory.get_response_element_by_type('number')
+    >>> sorted(t.__name__ for t in get_bulk_types([number, number]))
+    ['bool', 'float', 'int']
+    >>> get_bulk_types([number, ApiContentElementFactory.get_response_element_by_type('string')]) is None
+    True
+    '''
+    if not elements:
+        return None
+    element_class = type(elements[0])
+    for element in elements:
+        if type(element) is not element_class:
+            return None
+    return element_class._bulk_types
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
 
 # --------------------------------------------------------------------------------------
 # The Factory Class for the ApiResponseElement
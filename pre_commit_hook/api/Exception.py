@@ -140,7 +140,7 @@ class ResponseContentNotFoundException(TestingException):
         super(ResponseContentNotFoundException, self).__init__(
             message='The response not found with key path: %s' % key_path,
             code=903,
-            user_info={})
+            user_info={'key_path': key_path})
 
 class ResponseContentNotEqualException(TestingException):
     def __init__(self, key_path, response, expectation):
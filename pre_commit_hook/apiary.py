@@ -1,8 +1,10 @@
 __author__ = 'Arsenal_49'
 
+import io
+import itertools
+import mmap
 import re
 import string
-from pre_commit_hook.decoder import ApiDecoder as ContentDecoder
 from pre_commit_hook.error import ApiarySyntaxError, ApiaryParameterNotDefinedError, ApiaryError
 
 # Define the pattern match/search
@@ -15,6 +17,34 @@ _param_string = re.compile(r'^\s*\+\s*[a-zA-Z0-9\_\-]+\s*\([a-zA-Z\_\-0-9\,\ ]+\
 _request_title = re.compile(r'^\+ Request .+').search
 _response_title = re.compile(r'^\+ Response').match
 
+# Define the combined patterns for classifying the lines (see _classify_line):
+_header_match = re.compile(r'(?P<api_title>##(?:\s)+.*\[\/.+\]$)|(?P<group_title>#(?:\s)+)').match
+_tag_match = re.compile(r'\+ (?:(?P<param_title>Parameters)|(?P<request_title>Request .+)|(?P<response_title>Response))').match
+
+# Define the kinds of the lines, a line might be of more than one kind:
+_line_group_title = 0x01
+_line_api_title = 0x02
+_line_api_method = 0x04
+_line_param_title = 0x08
+_line_param_string = 0x10
+_line_request_title = 0x20
+_line_response_title = 0x40
+_line_indented = 0x80
+
+_line_kind_table = {
+    'group_title': _line_group_title,
+    'api_title': _line_api_title,
+    'param_title': _line_param_title,
+    'request_title': _line_request_title,
+    'response_title': _line_response_title,
+}
+_line_tags = _line_api_method | _line_param_title | _line_param_string | _line_request_title | _line_response_title
+
+# The kinds of the lines which end the code block in each state, the other lines are the lines of the block:
+_request_end_kinds = _line_request_title | _line_response_title
+_response_end_kinds = _line_group_title | _line_api_title | _line_api_method | _line_request_title | \
+                      _line_response_title
+
 # Define the static states for validation process:
 _state_init = 0
 _state_read_group_title = 1
@@ -25,50 +55,225 @@ _state_read_request_tag = 5
 _state_read_response_tag = 6
 _state_error = -1
 
+_code_block_end_kinds = {
+    _state_read_request_tag: _request_end_kinds,
+    _state_read_response_tag: _response_end_kinds,
+}
+
+# Define the default cap of the errors collected in one pass (see ApiaryValidator.validate_lines):
+DEFAULT_MAX_ERRORS = 100
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Classify the line once, instead of matching the patterns one by one in each state
+def _classify_line(line):
+    """
+    Return the kinds of the line as the combination of the _line_* flags. The first character decides which combined
+    pattern to run, so most of the lines (descriptions and code blocks) are classified without running any pattern.
+
+    # For the doctest:
+    >>> _classify_line('## test api [/test/api/pattern]') == _line_api_title
+    True
+    >>> _classify_line('### api method [GET]') == _line_api_method
+    True
+    >>> _classify_line('    + test  (number) ... descriptions') == _line_param_string | _line_indented
+    True
+    >>> _classify_line('The description of the api.')
+    0
+    """
+    kinds = 0
+    first = line[:1]
+    if first == '#':
+        header = _header_match(line)
+        if header:
+            kinds = _line_kind_table[header.lastgroup]
+    elif first == '+':
+        tag = _tag_match(line)
+        if tag:
+            kinds = _line_kind_table[tag.lastgroup]
+    elif first.isspace():
+        kinds = _line_indented
+
+    if '+' in line and _param_string(line):
+        kinds |= _line_param_string
+    if '[' in line and _api_method(line):
+        kinds |= _line_api_method
+    return kinds
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Read the lines lazily from the stream
+def get_lines_from_stream(stream, encoding='utf-8'):
+    if isinstance(stream, (bytes, bytearray, memoryview)):
+        stream = io.BytesIO(stream)
+    if isinstance(stream, mmap.mmap):
+        stream = iter(stream.readline, b'')
+
+    for line in stream:
+        if isinstance(line, (bytes, bytearray)):
+            line = line.decode(encoding)
+        yield line
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 # define the Validator class
 class ApiaryValidator:
-    def __init__(self):
+    def __init__(self, decoder_engine=None):
         self.state = _state_init
-        self.decoder = ContentDecoder()
+        self._decoder = None
+        self._decoder_engine = decoder_engine  # None for the default engine of the decoder
         self._read_parameter_string = False
         self._read_newline = False
         self._parameters = list()
+        self._line_count = 0  # the number of the line read by _read_line, or of the first line of _read_code_block
+        self.errors = list()  # The (line_count, error) of the failed validation
+
+    @property
+    def decoder(self):
+        """
+        The decoder of the code blocks. The decoder and the content elements are only imported when the first
+        request/response block is reached, so the documents without any code block never load them.
+        """
+        if self._decoder is None:
+            from pre_commit_hook.decoder import ApiDecoder as ContentDecoder
+            if self._decoder_engine is None:
+                self._decoder = ContentDecoder()
+            else:
+                self._decoder = ContentDecoder(engine=self._decoder_engine)
+        return self._decoder
 
-    def validate_file(self, file, verbose=False):
-        validation_result = True
-        error = None
+    @decoder.setter
+    def decoder(self, decoder):
+        self._decoder = decoder
+
+    def validate_file(self, file, verbose=False, max_errors=1):
         assert isinstance(file, str)
         try:
-            with open(file, 'r') as f:
-                lines = f.readlines()
-
+            f = open(file, 'r')
         except FileNotFoundError:
             print('Error: could not find the file %s' % file)
-            lines = list()
-            validation_result = False
-            error = ApiaryError(message='could not find the file: %s' % file)
-
-        line_count = 0
-        for line in lines:
-            line_count += 1
-            if verbose:
-                print('%d %s' % (line_count, line))
-            valid, error = self._read_line(line)
-            if not valid:
-                print('ValError: %s (@ %d)' % (error.message, line_count))
+            return False, ApiaryError(message='could not find the file: %s' % file)
+
+        with f:
+            return self.validate_lines(f, verbose, max_errors)
+
+    def validate_text(self, text, verbose=False, max_errors=1):
+        assert isinstance(text, str)
+        return self.validate_lines(io.StringIO(text), verbose, max_errors)
+
+    def validate_stream(self, stream, verbose=False, encoding='utf-8', max_errors=1):
+        """
+        Validate the document from a text or binary file object, an mmap, a bytes buffer or an iterable of lines.
+        The lines are read lazily, so the whole document is never loaded into the memory.
+
+        # For the doctest:
+        >>> ApiaryValidator().validate_stream(b'# Group TEST\\n## test api [/test]\\n')
+        (True, None)
+        """
+        return self.validate_lines(get_lines_from_stream(stream, encoding), verbose, max_errors)
+
+    def validate_lines(self, lines, verbose=False, max_errors=1):
+        """
+        Validate the lines and return (valid, error) with the first error. By default the validation stops at the first
+        error. With max_errors greater than 1, the validator recovers from each error by skipping the lines until the
+        next '#', '##' or '###' header, so up to max_errors errors are collected into self.errors in one pass.
+
+        # For the doctest:
+        >>> validator = ApiaryValidator()
+        >>> lines = ['# Group A', '+ Response 200', '## api [/a]', '+ Request abc', '## api [/b]', '### get [GET]']
+        >>> validator.validate_lines(lines, max_errors=10)[0]
+        ValError: Missing api title string (@ 2)
+        ValError: Missing api method string (@ 4)
+        False
+        >>> [line_count for line_count, error in validator.errors]
+        [2, 4]
+        """
+        assert isinstance(max_errors, int) and max_errors > 0, 'The max errors should be a positive integer'
+        validation_result = True
+        first_error = None
+        for line_count, error in self._iter_errors(lines, verbose):
+            print('ValError: %s (@ %d)' % (error.message, line_count))
+            self.errors.append((line_count, error))
+            if validation_result:
                 validation_result = False
+                first_error = error
+            if len(self.errors) >= max_errors:
+                if max_errors > 1:
+                    print('ValError: stop validating after %d errors (@ %d)' % (max_errors, line_count))
                 break
 
-        return validation_result, error
+        return validation_result, first_error
+
+    def _iter_errors(self, lines, verbose=False, line_count=0):
+        """
+        Read the lines and yield the (line_count, error) of the failed lines, recovering from each error as described in
+        validate_lines. The lines of a code block are read ahead until the end of the block and read at once by
+        _read_code_block, they are only read one by one when the block could not be read at once, so the errors are
+        the same as reading the lines one by one.
+        """
+        recovering = False
+        block = list()  # the (line_count, line) of the code block read ahead
+        for line in itertools.chain(lines, [None]):
+            if line is not None:
+                line_count += 1
+                if verbose:
+                    print('%d %s' % (line_count, line))
+                if not recovering and self._read_newline and self.state in _code_block_end_kinds \
+                        and not _classify_line(line) & _code_block_end_kinds[self.state]:
+                    block.append((line_count, line))
+                    continue
+
+            pending = list()
+            if block:
+                self._line_count = block[0][0]
+                if not self._read_code_block([block_line for block_line_count, block_line in block]):
+                    pending.extend(block)
+                block = list()
+            if line is not None:
+                pending.append((line_count, line))
+
+            for pending_line_count, pending_line in pending:
+                if recovering:
+                    if not self._resynchronize(pending_line):
+                        continue
+                    recovering = False
+
+                self._line_count = pending_line_count
+                valid, error = self._read_line(pending_line)
+                if not valid:
+                    yield pending_line_count, error
+                    recovering = True
+
+    def _resynchronize(self, line):
+        """
+        Reset the validator to the state before the header line, and return False if the line is not a header line.
+        The parameters of the last api title are kept for a '###' header in the same api.
+        """
+        if line[:1] != '#':
+            return False
+        kinds = _classify_line(line)
+        if kinds & _line_group_title:
+            self.state = _state_init
+        elif kinds & _line_api_title:
+            self.state = _state_read_group_title
+        elif kinds & _line_api_method:
+            self.state = _state_read_api_title
+        else:
+            return False
+
+        if self._decoder is not None:
+            self._decoder.clear()
+        self._read_parameter_string = False
+        self._read_newline = False
+        return True
 
     def _read_line(self, line):
         error = None
         assert not self.state < 0, 'StateError: the validator is in the error state with line %s' % line
+        kinds = _classify_line(line)
 
         if self.state == _state_read_group_title:
-            if _api_title(line):
+            if kinds & _line_api_title:
                 if not _api_url(line):
                     error = ApiarySyntaxError(message='Cannot find the api url in line: %s' % line)
                     self.state = _state_error
@@ -76,77 +281,76 @@ class ApiaryValidator:
                     self._parameters = ApiaryValidator._get_parameters_from_api_title(line)
                     self.state = _state_read_api_title
 
-            elif _api_method(line) or _param_title(line) or _param_string(line) or _request_title(line) \
-                    or _response_title(line):
+            elif kinds & _line_tags:
                 error = ApiarySyntaxError(message='Missing api title string')
                 self.state = _state_error
 
         elif self.state == _state_read_api_title:
-            if _api_method(line):
+            if kinds & _line_api_method:
                 self.state = _state_read_api_method
 
-            elif _param_title(line) or _param_string(line) or _request_title(line) or _response_title(line):
+            elif kinds & (_line_param_title | _line_param_string | _line_request_title | _line_response_title):
                 error = ApiarySyntaxError(message='Missing api method string')
                 self.state = _state_error
 
         elif self.state == _state_read_api_method:
-            if _param_title(line):
+            if kinds & _line_param_title:
                 self._read_parameter_string = False
                 self.state = _state_read_param_tag
 
-            elif _request_title(line):
+            elif kinds & _line_request_title:
                 self._prepare_for_scanning_request_content()
 
-            elif _response_title(line):
+            elif kinds & _line_response_title:
                 self._prepare_for_scanning_response_content()
 
-            elif _param_string(line):
+            elif kinds & _line_param_string:
                 error = ApiarySyntaxError(message='Missing parameter title')
                 self.state = _state_error
 
         elif self.state == _state_read_param_tag:
-            if _param_string(line):
+            if kinds & _line_param_string:
                 self._read_parameter_string = True
                 parameter = ApiaryValidator._get_parameter_from_parameter_string(line)
                 if parameter not in self._parameters:
                     error = ApiaryParameterNotDefinedError(parameter=parameter)
                     self.state = _state_error
 
-            elif _request_title(line):
+            elif kinds & _line_request_title:
                 if not self._read_parameter_string:
                     error = ApiarySyntaxError(message='Missing parameter info')
                     self.state = _state_error
                 else:
                     self._prepare_for_scanning_request_content()
 
-            elif _response_title(line):
+            elif kinds & _line_response_title:
                 if not self._read_parameter_string:
                     error = ApiarySyntaxError(message='Missing parameter info')
                     self.state = _state_error
                 else:
                     self._prepare_for_scanning_response_content()
 
-            elif not re.match(r'\s+', line):
+            elif not kinds & _line_indented:
                 error = ApiarySyntaxError(message='The lines should contain the parameter info')
                 self.state = _state_error
 
         elif self.state == _state_read_request_tag:
             test_line = line
-            if _response_title(line):
+            if kinds & _line_response_title:
                 if not self.decoder.get_parsed_objects():
                     error = ApiarySyntaxError(message='Missing request content')
                     self.state = _state_error
                 else:
                     self._prepare_for_scanning_response_content()
 
-            elif _request_title(line):
+            elif kinds & _line_request_title:
                 self._prepare_for_scanning_request_content()
 
             else:
                 error = self._scan_line_by_decoder(line)
 
         elif self.state == _state_read_response_tag:
-            if _group_title(line):
+            if kinds & _line_group_title:
                 if not self.decoder.get_parsed_objects():
                     error = ApiarySyntaxError(message='Missing response content')
                     self.state = _state_error
@@ -155,7 +359,7 @@ class ApiaryValidator:
                     self._read_newline = False
                     self.state = _state_read_group_title
 
-            elif _api_title(line):
+            elif kinds & _line_api_title:
                 if not self.decoder.get_parsed_objects():
                     error = ApiarySyntaxError(message='Missing response content')
                     self.state = _state_error
@@ -164,7 +368,7 @@ class ApiaryValidator:
                     self._parameters = ApiaryValidator._get_parameters_from_api_title(line)
                     self.state = _state_read_api_title
 
-            elif _api_method(line):
+            elif kinds & _line_api_method:
                 if not self.decoder.get_parsed_objects():
                     error = ApiarySyntaxError(message='Missing response content')
                     self.state = _state_error
@@ -172,14 +376,14 @@ class ApiaryValidator:
                     self.decoder.clear()
                     self.state = _state_read_api_method
 
-            elif _request_title(line):
+            elif kinds & _line_request_title:
                 if not self.decoder.get_parsed_objects():
                     error = ApiarySyntaxError('Missing the request content')
                     self.state = _state_error
                 else:
                     self._prepare_for_scanning_request_content()
 
-            elif _response_title(line):
+            elif kinds & _line_response_title:
                 if not self.decoder.get_parsed_objects():
                     error = ApiarySyntaxError('Missing the response content')
                     self.state = _state_error
@@ -190,11 +394,22 @@ class ApiaryValidator:
                 error = self._scan_line_by_decoder(line)
 
         else:  # _state_init
-            if _group_title(line):
+            if kinds & _line_group_title:
                 self.state = _state_read_group_title
 
         return (error is None), error
 
+    def _read_code_block(self, lines):
+        """
+        Read the lines of a code block at once with the json fast path of the decoder (see ApiDecoder.decode_block),
+        and return True if they were read. Return False without reading any line when the block should be read line
+        by line instead, e.g. it is not valid, so that the errors are reported at their lines.
+        """
+        for line in lines:
+            if not ApiaryValidator._indent_validation(line):
+                return False
+        return self.decoder.decode_block(lines)
+
     def _scan_line_by_decoder(self, line):
         assert self.decoder is not None
         assert isinstance(line, str)
@@ -220,7 +435,7 @@ class ApiaryValidator:
             self.decoder.scan_line(line)
 
         except AssertionError as e:
-            error = ApiarySyntaxError(message='DecoderAssertion: %s' % e.args)
+            error = ApiarySyntaxError(message='DecoderAssertion: %s' % (e.args[0] if e.args else ''))
             self.state = _state_error
 
         except Exception as e:
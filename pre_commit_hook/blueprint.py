@@ -0,0 +1,161 @@
+__author__ = 'Arsenal_49'
+
+import re
+from pre_commit_hook.api.ApiContentElement import ApiContentElementInterner
+from pre_commit_hook.apiary import ApiaryValidator, _classify_line, _api_method
+from pre_commit_hook.apiary import _line_group_title, _line_api_title, _line_api_method
+from pre_commit_hook.apiary import _line_request_title, _line_response_title, _line_param_string
+from pre_commit_hook.apiary import _state_read_group_title, _state_read_api_title, _state_read_api_method
+from pre_commit_hook.apiary import _state_read_request_tag, _state_read_response_tag, _state_read_param_tag
+from pre_commit_hook.apiary import _request_end_kinds, _response_end_kinds
+
+_url_search = re.compile(r'\[(\/.+)\]').search
+_status_search = re.compile(r'^\+ Response\s+(\d+)').search
+_request_name_search = re.compile(r'^\+ Request\s+(.*?)(\s+\([^()]*\))?\s*$').search
+_parameter_search = re.compile(r'^\s*\+\s*([a-zA-Z0-9_\-]+)\s*\(([^()]*)\)').search
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The endpoint of the blueprint
+# ----------------------------------------------------------------------------------------------------------------------
+class ApiEndpoint(object):
+    """
+    One action of the blueprint, i.e. the method with the url template of its resource, and the element trees of the
+    code blocks of its requests and responses.
+    """
+
+    def __init__(self, method, url, parameters=None, group=None, line_count=0):
+        self.method = method
+        self.url = url  # the url template as written, e.g. /order/{orderId}{?sessionKey}
+        self.parameters = list(parameters or [])
+        self.parameter_types = dict()  # the (type, required) of the parameters described in + Parameters, by the name
+        self.group = group
+        self.line_count = line_count
+        self.requests = list()  # the (name, element) of the request blocks
+        self.responses = dict()  # the element of the response block by the status code, None without a status code
+
+    def __repr__(self):
+        return 'ApiEndpoint(%s %s)' % (self.method, self.url)
+
+    @property
+    def name(self):
+        return '%s %s' % (self.method, self.path)
+
+    @property
+    def path(self):
+        """
+        The url template without the query parameters, e.g. /order/{orderId}.
+        """
+        index = self.url.find('{?')
+        return self.url if index < 0 else self.url[:index]
+
+    def get_response(self, status_code):
+        """
+        Return the element tree of the response with the status code, falling back to the response without a status.
+        """
+        response = self.responses.get(status_code)
+        if response is None:
+            response = self.responses.get(None)
+        return response
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The validator which also keeps the endpoints of the blueprint
+# ----------------------------------------------------------------------------------------------------------------------
+class BlueprintReader(ApiaryValidator):
+    """
+    Validate the blueprint and collect its endpoints. The element trees parsed by the decoder for each request and
+    response block are kept by the endpoints, instead of being dropped at the end of the block. The identical trees
+    and sub-trees are interned (see ApiContentElementInterner), pass the same interner to the readers of several
+    blueprints for sharing them across the blueprints.
+
+    # For the doctest:
+    >>> reader = BlueprintReader()
+    >>> reader.validate_lines(['# Group A', '## api [/a/{id}]', '### get [GET]', '+ Response 200',
+    ...                        '', '        {', '            "id": 1', '        }'])
+    (True, None)
+    >>> endpoint = reader.get_endpoints()[0]
+    >>> endpoint.name, sorted(endpoint.get_response(200).content.keys())
+    ('GET /a/{id}', ['id'])
+    """
+
+    def __init__(self, decoder_engine=None, interner=None):
+        super(BlueprintReader, self).__init__(decoder_engine)
+        self.endpoints = list()
+        self.interner = interner if interner is not None else ApiContentElementInterner()
+        self._group = None
+        self._url = None
+        self._block = None  # ('request', name) or ('response', status_code) of the current code block
+
+    def read_file(self, file):
+        """
+        Return the endpoints of the blueprint, or raise ValueError with the first error.
+        """
+        return self._get_valid_endpoints(*self.validate_file(file))
+
+    def read_stream(self, stream):
+        """
+        Return the endpoints of the blueprint read from the stream (see ApiaryValidator.validate_stream), or raise
+        ValueError with the first error.
+        """
+        return self._get_valid_endpoints(*self.validate_stream(stream))
+
+    def get_endpoints(self):
+        self._save_block()
+        return self.endpoints
+
+    def _get_valid_endpoints(self, valid, error):
+        if not valid:
+            raise ValueError('%s (@ %d)' % (error.message, self.errors[0][0]) if self.errors else str(error))
+        return self.get_endpoints()
+
+    def _read_line(self, line):
+        kinds = _classify_line(line)
+        if (self.state == _state_read_request_tag and kinds & _request_end_kinds) or \
+                (self.state == _state_read_response_tag and kinds & _response_end_kinds):
+            self._save_block()
+
+        state = self.state
+        valid, error = super(BlueprintReader, self)._read_line(line)
+        if not valid:
+            return valid, error
+
+        # Only the lines which the validator accepted as the titles are read:
+        if self.state == _state_read_group_title and kinds & _line_group_title:
+            self._group = line.lstrip('#').strip()
+        elif self.state == _state_read_api_title and kinds & _line_api_title and state != _state_read_api_title:
+            self._url = _url_search(line.rstrip()).group(1)
+        elif self.state == _state_read_api_method and kinds & _line_api_method and state != _state_read_api_method:
+            self.endpoints.append(ApiEndpoint(_api_method(line).group(1), self._url, self._parameters, self._group,
+                                              self._line_count))
+        elif self.state == _state_read_param_tag and kinds & _line_param_string and self.endpoints:
+            self._read_parameter(line)
+        elif self.state == _state_read_request_tag and kinds & _line_request_title:
+            name = _request_name_search(line.rstrip())
+            self._block = ('request', name.group(1) if name else None)
+        elif self.state == _state_read_response_tag and kinds & _line_response_title:
+            status = _status_search(line)
+            self._block = ('response', int(status.group(1)) if status else None)
+        return valid, error
+
+    def _read_parameter(self, line):
+        # e.g. '    + offset  (number, optional) ... The offset', the type is 'string' without any:
+        parameter = _parameter_search(line)
+        if parameter:
+            attributes = [attribute.strip().lower() for attribute in parameter.group(2).split(',')]
+            types = [attribute for attribute in attributes if attribute not in ('optional', 'required')]
+            self.endpoints[-1].parameter_types[parameter.group(1)] = (types[0] if types and types[0] else 'string',
+                                                                      'optional' not in attributes)
+
+    def _save_block(self):
+        if self._block is None or self._decoder is None or not self.endpoints:
+            return
+        element = self._decoder.get_parsed_objects()
+        if element is not None and not self._decoder._object_stacks:
+            element = self.interner.intern(element)
+            kind, key = self._block
+            if kind == 'request':
+                self.endpoints[-1].requests.append((key, element))
+            else:
+                self.endpoints[-1].responses[key] = element
+        self._block = None
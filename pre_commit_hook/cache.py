@@ -0,0 +1,168 @@
+__author__ = 'Arsenal_49'
+
+import hashlib
+import json
+import os
+import tempfile
+from pre_commit_hook import __version__
+from pre_commit_hook.error import ApiaryError
+
+DEFAULT_CACHE_DIRECTORY = os.path.join('.cache', 'pre-commit-apiary')
+DEFAULT_CACHE_ENTRIES = 65536
+
+_CACHE_FORMAT = 1
+_CACHE_SUFFIX = '.json'
+_SOURCE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+_source_digests = dict()  # the digest of the sources by the directory of the package
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The version of the validator
+# ----------------------------------------------------------------------------------------------------------------------
+def get_source_digest(directory=_SOURCE_DIRECTORY):
+    """
+    Return the hash of the python sources of the package, for keying the results computed by the validator: the
+    __version__ is not bumped with every change of the validation, while any change of the sources changes the digest.
+    The package version is used instead if the sources can not be read.
+    """
+    digest = _source_digests.get(directory)
+    if digest is not None:
+        return digest
+
+    source_hash = hashlib.sha1()
+    try:
+        for root, dirs, names in os.walk(directory):
+            dirs[:] = sorted(name for name in dirs if name != '__pycache__')
+            for name in sorted(names):
+                if name.endswith('.py'):
+                    path = os.path.join(root, name)
+                    source_hash.update(os.path.relpath(path, directory).replace(os.sep, '/').encode('utf-8') + b'\0')
+                    with open(path, 'rb') as f:
+                        source_hash.update(f.read())
+                    source_hash.update(b'\0')
+        digest = source_hash.hexdigest()
+    except OSError:
+        digest = __version__
+    _source_digests[directory] = digest
+    return digest
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The persistent cache for the validation results
+# ----------------------------------------------------------------------------------------------------------------------
+class ValidationCache(object):
+    """
+    The on-disk cache of the validation results, one file per entry. The entries are keyed by the hash of the content
+    and the sources of the validator (see get_source_digest), so a cache hit does not need to run the validator at all.
+    The least recently used entries are evicted once the cache holds more than max_entries entries.
+
+    # For the doctest:
+    >>> cache = ValidationCache(tempfile.mkdtemp())
+    >>> key = cache.get_key(b'# Group TEST')
+    >>> cache.get(key) is None
+    True
+    >>> cache.set(key, ValidationCache.make_record(True, []))
+    >>> cache.get(key)['valid']
+    True
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIRECTORY, max_entries=DEFAULT_CACHE_ENTRIES, namespace=''):
+        assert isinstance(max_entries, int) and max_entries > 0, 'The max entries should be a positive integer'
+        self.directory = directory
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self._prefix = ('%s\0%d\0%s\0' % (get_source_digest(), _CACHE_FORMAT, namespace)).encode('utf-8')
+        self._entry_count = None  # counted lazily, so that a write does not need to list the directory
+
+    def get_key(self, content):
+        assert isinstance(content, bytes), 'The content should be bytes'
+        return hashlib.sha256(self._prefix + content).hexdigest()
+
+    def get(self, key):
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                record = json.loads(f.read().decode('utf-8'))
+            os.utime(path)  # for the LRU eviction
+        except (OSError, ValueError):
+            return None
+        return record
+
+    def set(self, key, record):
+        path = self._get_path(key)
+        temp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if self._entry_count is None:
+                self._entry_count = len(self._get_entry_paths())
+            if not os.path.exists(path):
+                self._entry_count += 1
+
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(record).encode('utf-8'))
+            os.replace(temp_path, path)
+            if self._entry_count > self.max_entries:
+                self._evict()
+        except OSError:
+            # The cache is only an optimization, never fail the validation because of it
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        for path in self._get_entry_paths():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._entry_count = None
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + _CACHE_SUFFIX)
+
+    def _get_entry_paths(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return list()
+        return [os.path.join(self.directory, name) for name in names if name.endswith(_CACHE_SUFFIX)]
+
+    def _evict(self):
+        paths = self._get_entry_paths()
+        self._entry_count = len(paths)
+        if len(paths) <= self.max_entries:
+            return
+
+        def _get_mtime(path):
+            try:
+                return os.stat(path).st_mtime
+            except OSError:
+                return 0
+
+        paths.sort(key=_get_mtime)
+        for path in paths[:len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._entry_count = min(len(paths), self.max_entries)
+
+    # Record Related: --------------------------------------------------------------------------------------------------
+    @staticmethod
+    def make_record(valid, errors):
+        """
+        Make the record with the validation result and a list of (line_count, error).
+        """
+        return {
+            'valid': bool(valid),
+            'errors': [{'line': line_count, 'type': error.type, 'message': error.message}
+                       for line_count, error in errors],
+        }
+
+    @staticmethod
+    def get_errors_from_record(record):
+        return [(e['line'], ApiaryError(error_type=e['type'], message=e['message'])) for e in record['errors']]
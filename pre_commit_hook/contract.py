@@ -0,0 +1,396 @@
+__author__ = 'Arsenal_49'
+
+# Run the contract tests of a blueprint against a running service: each documented endpoint is requested once on the
+# base url, and the status and the body of its response are checked against the documented responses.
+#
+# The requests go through a bounded number of workers over a pool of keep-alive connections, with a minimal HTTP/1.1
+# client on the asyncio streams, so a suite of hundreds of endpoints takes about as long as its slowest requests
+# instead of the sum of all of them. The failures are reported with the testing exceptions of api.Exception.
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import quote, urlencode, urlsplit
+from pre_commit_hook.mockdata import MockDataGenerator
+from pre_commit_hook.api.ApiContentCompiler import get_compiled_validator
+from pre_commit_hook.api.Exception import TestingException, UrlNotReachException, ResponseNotFoundException
+from pre_commit_hook.api.Exception import ResponseContentStatusNotMatchException, ResponseContentJsonException
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 10  # seconds for each request
+DEFAULT_PARAMETER_VALUE = '1'  # for the path parameters without a given value
+
+_MAX_HEAD_SIZE = 64 * 1024
+_IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'])
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The results
+# ----------------------------------------------------------------------------------------------------------------------
+class ContractResult(object):
+    """
+    The outcome of one endpoint: the status of its response (None when the url was not reached), and the testing
+    exception (or the AssertionError) of the failure, None when the response matched the contract.
+    """
+    __slots__ = ('endpoint', 'url', 'status', 'error', 'elapsed')
+
+    def __init__(self, endpoint, url, status=None, error=None, elapsed=0.0):
+        self.endpoint = endpoint
+        self.url = url
+        self.status = status
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def passed(self):
+        return self.error is None
+
+    @property
+    def message(self):
+        message = getattr(self.error, 'message', None)
+        if message is None and self.error is not None:
+            message = str(self.error) or type(self.error).__name__
+        return message
+
+    def to_dict(self):
+        result = {'endpoint': self.endpoint.name, 'url': self.url, 'status': self.status,
+                  'elapsed': round(self.elapsed, 6)}
+        if self.error is not None:
+            result['error'] = type(self.error).__name__
+            result['message'] = self.message
+            key_path = getattr(self.error, 'user_info', {}).get('key_path')
+            if key_path is not None:
+                result['key_path'] = key_path
+        return result
+
+
+class ContractReport(object):
+
+    def __init__(self, results=None, elapsed=0.0):
+        self.results = list(results or [])
+        self.elapsed = elapsed
+
+    @property
+    def failures(self):
+        return [result for result in self.results if not result.passed]
+
+    def to_dict(self):
+        return {'endpoints': len(self.results), 'passed': len(self.results) - len(self.failures),
+                'failed': len(self.failures), 'elapsed': round(self.elapsed, 6),
+                'results': [result.to_dict() for result in self.results]}
+
+    def print_report(self):
+        failures = self.failures
+        print('checked %d endpoint(s) in %.2fs: %d passed, %d failed' % (
+            len(self.results), self.elapsed, len(self.results) - len(failures), len(failures)))
+        for result in failures:
+            print('%s (%s): %s' % (result.endpoint.name, result.url, result.message))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The pool of the keep-alive connections
+# ----------------------------------------------------------------------------------------------------------------------
+class _ConnectionPool(object):
+
+    def __init__(self, host, port, ssl=False):
+        self._host = host
+        self._port = port
+        self._ssl = ssl or None
+        self._idle = list()  # the (reader, writer) of the idle connections, the latest used last
+
+    async def acquire(self, reuse=True):
+        # Return the connection and whether it was reused from the idle ones
+        while reuse and self._idle:
+            reader, writer = self._idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return (reader, writer), True
+            writer.close()
+        return await asyncio.open_connection(self._host, self._port, ssl=self._ssl), False
+
+    def release(self, connection, keep_alive=True):
+        if keep_alive:
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+
+    def close(self):
+        for reader, writer in self._idle:
+            writer.close()
+        self._idle = list()
+
+
+async def _read_response(reader):
+    # Return the (status, headers, body) of the response, with the names of the headers in lowercase
+    head = await reader.readuntil(b'\r\n\r\n')
+    if len(head) > _MAX_HEAD_SIZE:
+        raise ValueError('the head of the response is too large')
+    lines = head.decode('latin-1').split('\r\n')
+    status_line = lines[0].split(' ', 2)
+    if len(status_line) < 2 or not status_line[0].startswith('HTTP/'):
+        raise ValueError('invalid status line: %s' % lines[0])
+    headers = dict()
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        chunks = list()
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';', 1)[0], 16)
+            if size == 0:
+                await _skip_trailers(reader)
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+        headers['connection'] = 'close'
+    return int(status_line[1]), headers, body
+
+
+async def _skip_trailers(reader):
+    while (await reader.readuntil(b'\r\n')) != b'\r\n':
+        pass
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The runner
+# ----------------------------------------------------------------------------------------------------------------------
+class ContractRunner(object):
+    """
+    Request every endpoint on the base url and check its response. The path parameters are filled from the
+    parameters (the value of each name of the url template, DEFAULT_PARAMETER_VALUE by default), the query parameters
+    of the template only when they are given, and the body of the first documented request is a mock payload from
+    MockDataGenerator.
+
+    The expected status is the first documented 2xx of the endpoint (the first documented status without any). The
+    failures of each endpoint are reported as:
+        - UrlNotReachException: the connection failed or timed out, or the response was not HTTP,
+        - ResponseNotFoundException: the status of the response is not documented for the endpoint,
+        - ResponseContentStatusNotMatchException: the status is documented, but it is not the expected one,
+        - ResponseContentJsonException: the body is not JSON,
+        - the exceptions of validate_json_object: the body does not match the documented response,
+        - AssertionError: a value of the body failed the assertion of its element, e.g. a url which is not a string.
+    A failed request is only sent again for the idempotent methods, when it failed on a reused keep-alive connection
+    which the server might have closed while it was idle.
+    """
+
+    def __init__(self, endpoints, base_url, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, parameters=None,
+                 headers=None, seed=0):
+        assert concurrency > 0, 'The concurrency should be positive'
+        split_url = urlsplit(base_url)
+        assert split_url.scheme in ('http', 'https') and split_url.hostname, 'The base url should be http(s)://host'
+        self.endpoints = list(endpoints)
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.parameters = dict(parameters or {})
+        self.headers = dict(headers or {})
+        self._generator = MockDataGenerator(seed)
+        self._host = split_url.hostname
+        self._port = split_url.port or (443 if split_url.scheme == 'https' else 80)
+        self._ssl = split_url.scheme == 'https'
+        self._prefix = split_url.path.rstrip('/')
+        self._host_header = split_url.netloc
+        for endpoint in self.endpoints:
+            for element in endpoint.responses.values():
+                get_compiled_validator(element)
+
+    # Request Related: -------------------------------------------------------------------------------------------------
+    def get_target(self, endpoint):
+        """
+        Return the path with the query string requested for the endpoint, e.g. /v1/orders/1?sessionKey=abc.
+        """
+        segments = list()
+        for segment in endpoint.path.split('/'):
+            while '{' in segment and '}' in segment:
+                start = segment.index('{')
+                end = segment.index('}', start)
+                name = segment[start + 1:end]
+                value = quote(str(self.parameters.get(name, DEFAULT_PARAMETER_VALUE)), safe='')
+                segment = segment[:start] + value + segment[end + 1:]
+            segments.append(segment)
+        target = self._prefix + '/'.join(segments)
+
+        index = endpoint.url.find('{?')
+        if index >= 0:
+            names = [name.strip() for name in endpoint.url[index + 2:].rstrip('}').split(',')]
+            query = [(name, self.parameters[name]) for name in names if name in self.parameters]
+            if query:
+                target = '%s?%s' % (target, urlencode(query))
+        return target or '/'
+
+    def get_request(self, endpoint):
+        """
+        Return the bytes of the HTTP request of the endpoint.
+        """
+        body = b''
+        if endpoint.requests:
+            body = b''.join(self._generator.iter_chunks(endpoint.requests[0][1]))
+        headers = {'Host': self._host_header, 'Accept': 'application/json', 'Connection': 'keep-alive'}
+        if body or endpoint.method in ('POST', 'PUT', 'PATCH'):
+            headers['Content-Type'] = 'application/json'
+            headers['Content-Length'] = str(len(body))
+        headers.update(self.headers)
+        head = ''.join('%s: %s\r\n' % item for item in headers.items())
+        return ('%s %s HTTP/1.1\r\n%s\r\n' % (endpoint.method, self.get_target(endpoint), head)).encode('latin-1') + body
+
+    @staticmethod
+    def get_expected_status(endpoint):
+        statuses = [status for status in endpoint.responses if status is not None]
+        successful = [status for status in statuses if 200 <= status < 300]
+        if successful:
+            return successful[0]
+        return statuses[0] if statuses else 200
+
+    # Running Related: -------------------------------------------------------------------------------------------------
+    def run(self):
+        """
+        Run the contract tests and return the ContractReport, the results in the order of the endpoints.
+        """
+        return asyncio.run(self.run_async())
+
+    async def run_async(self):
+        start_time = time.perf_counter()
+        pool = _ConnectionPool(self._host, self._port, self._ssl)
+        queue = asyncio.Queue()
+        for index, endpoint in enumerate(self.endpoints):
+            queue.put_nowait((index, endpoint))
+        results = [None] * len(self.endpoints)
+
+        async def _work():
+            while not queue.empty():
+                index, endpoint = queue.get_nowait()
+                results[index] = await self.check_endpoint(endpoint, pool)
+
+        try:
+            await asyncio.gather(*[_work() for i in range(min(self.concurrency, len(self.endpoints)))])
+        finally:
+            pool.close()
+        return ContractReport(results, time.perf_counter() - start_time)
+
+    async def check_endpoint(self, endpoint, pool):
+        url = self.base_url + self.get_target(endpoint)[len(self._prefix):]
+        start_time = time.perf_counter()
+        try:
+            status, headers, body = await asyncio.wait_for(self._exchange(endpoint, pool), self.timeout)
+        except asyncio.TimeoutError:
+            error = UrlNotReachException(url, 'timed out after %ss' % self.timeout)
+            return ContractResult(endpoint, url, None, error, time.perf_counter() - start_time)
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            error = UrlNotReachException(url, '%s: %s' % (type(e).__name__, e))
+            return ContractResult(endpoint, url, None, error, time.perf_counter() - start_time)
+
+        try:
+            self.check_response(endpoint, status, body)
+            error = None
+        except (TestingException, AssertionError) as e:
+            error = e
+        return ContractResult(endpoint, url, status, error, time.perf_counter() - start_time)
+
+    async def _exchange(self, endpoint, pool):
+        request = self.get_request(endpoint)
+        retry, reuse = endpoint.method in _IDEMPOTENT_METHODS, True
+        while True:
+            connection, reused = await pool.acquire(reuse)
+            reader, writer = connection
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, headers, body = await _read_response(reader)
+            except (OSError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused and retry:
+                    retry = reuse = False
+                    continue  # the idle connection was closed by the server, retried once on a new one
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            pool.release(connection, headers.get('connection', '').lower() != 'close')
+            return status, headers, body
+
+    def check_response(self, endpoint, status, body):
+        """
+        Raise the testing exception of the first mismatch of the response with the contract of the endpoint.
+        """
+        expected_status = self.get_expected_status(endpoint)
+        if status not in endpoint.responses and None not in endpoint.responses and endpoint.responses:
+            raise ResponseNotFoundException(status)
+        if status != expected_status:
+            raise ResponseContentStatusNotMatchException(expected_status, status)
+
+        element = endpoint.get_response(status)
+        if element is None:
+            return
+        try:
+            json_object = json.loads(body.decode('utf-8'))
+        except ValueError as e:
+            raise ResponseContentJsonException('The response content is not valid JSON: %s' % e,
+                                               body.decode('utf-8', 'replace'))
+        get_compiled_validator(element)(json_object)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Define the entry point for running the contract tests
+def _parse_pair(text):
+    if '=' not in text:
+        raise argparse.ArgumentTypeError('expected NAME=VALUE: %s' % text)
+    return tuple(text.split('=', 1))
+
+
+def _parse_header(text):
+    if ':' not in text:
+        raise argparse.ArgumentTypeError('expected "Name: value": %s' % text)
+    name, value = text.split(':', 1)
+    return name.strip(), value.strip()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='Check the documented endpoints of the blueprint on a service')
+    arg_parser.add_argument('blueprint', help='The blueprint (.apib)')
+    arg_parser.add_argument('base_url', help='The base url of the service, e.g. http://localhost:3000/v1')
+    arg_parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                            help='Number of the concurrent requests (default: %(default)s)')
+    arg_parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                            help='Seconds for each request (default: %(default)s)')
+    arg_parser.add_argument('--param', type=_parse_pair, action='append', default=[], metavar='NAME=VALUE',
+                            help='Value of a parameter of the url templates, repeatable')
+    arg_parser.add_argument('--header', type=_parse_header, action='append', default=[], metavar='"NAME: VALUE"',
+                            help='Header sent with every request, repeatable')
+    arg_parser.add_argument('--seed', type=int, default=0, help='Seed of the mock request bodies (default: %(default)s)')
+    arg_parser.add_argument('--schema-cache', nargs='?', const='', default=None, metavar='DIRECTORY',
+                            help='Keep the parsed schemas of the blueprint in the directory (default: '
+                                 '.cache/pre-commit-apiary/schemas)')
+    arg_parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = arg_parser.parse_args(argv)
+
+    try:
+        if args.schema_cache is None:
+            from pre_commit_hook.blueprint import BlueprintReader
+            endpoints = BlueprintReader().read_file(args.blueprint)
+        else:
+            from pre_commit_hook.schema_cache import read_endpoints, DEFAULT_SCHEMA_DIRECTORY
+            endpoints = read_endpoints(args.blueprint, args.schema_cache or DEFAULT_SCHEMA_DIRECTORY)
+    except (ValueError, OSError) as e:
+        print('Error: could not read the blueprint %s: %s' % (args.blueprint, e))
+        return -1
+
+    runner = ContractRunner(endpoints, args.base_url, args.concurrency, args.timeout, dict(args.param),
+                            dict(args.header), args.seed)
+    report = runner.run()
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        report.print_report()
+    return 0 if not report.failures else -1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,333 @@
+__author__ = 'Arsenal_49'
+
+# The daemon only imports the standard library and the digest of the sources at the top, so that the client side stays
+# cheap to start. The validator is imported by the daemon process when it starts serving.
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pre_commit_hook.cache import get_source_digest
+
+DEFAULT_IDLE_TIMEOUT = 600  # seconds
+_CONNECT_TIMEOUT = 5  # seconds for waiting the daemon to start
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The socket of the daemon for the working directory:
+# ----------------------------------------------------------------------------------------------------------------------
+def get_socket_path(directory=None):
+    """
+    Return the path of the daemon socket. Each working directory has its own daemon, since the filenames are relative
+    to the working directory, and each version of the sources (see cache.get_source_digest), so a daemon still running
+    the sources before an upgrade is never asked again. The socket is in the directory of the user only (see
+    get_socket_directory), return None if there is no such directory.
+    """
+    socket_directory = get_socket_directory()
+    if socket_directory is None:
+        return None
+    directory = os.path.abspath(directory or os.getcwd())
+    digest = hashlib.sha1(('%s\0%s' % (get_source_digest(), directory)).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(socket_directory, 'daemon-%s.sock' % digest)
+
+
+def get_socket_directory():
+    """
+    Return the directory of the daemon sockets, which only the user could access: in $XDG_RUNTIME_DIR when it is set,
+    or in the temporary directory. Return None if the directory is not a directory of the user with the mode 0700,
+    e.g. when another user created it first.
+    """
+    runtime_directory = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_directory:
+        directory = os.path.join(runtime_directory, 'pre-commit-apiary')
+    else:
+        directory = os.path.join(tempfile.gettempdir(), 'pre-commit-apiary-%d' % os.getuid())
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        status = os.lstat(directory)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() or status.st_mode & 0o077:
+        return None
+    return directory
+
+
+def _connect(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _is_trusted(sock, socket_path):
+    # Only the daemon of the same user is trusted with the results of the validation:
+    try:
+        status = os.lstat(socket_path)
+        if not stat.S_ISSOCK(status.st_mode) or status.st_uid != os.getuid():
+            return False
+        if hasattr(socket, 'SO_PEERCRED'):
+            credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+            pid, uid, gid = struct.unpack('3i', credentials)
+            return uid == os.getuid()
+    except OSError:
+        return False
+    return True
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The client side:
+# ----------------------------------------------------------------------------------------------------------------------
+def run_client(argv, socket_path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """
+    Forward the arguments of validate_apiary to the daemon, starting it if needed, and print the output of the daemon
+    while it validates. Return the result of the validation, or None if the daemon is not available, in which case the
+    caller should validate the files by itself.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    socket_path = socket_path or get_socket_path()
+    if socket_path is None:
+        return None
+    try:
+        sock = _connect(socket_path)
+    except OSError:
+        sock = _start_daemon(socket_path, idle_timeout)
+        if sock is None:
+            return None
+    if not _is_trusted(sock, socket_path):
+        sock.close()
+        return None
+
+    result = None
+    with sock, sock.makefile('rb') as responses:
+        try:
+            sock.sendall(json.dumps({'cwd': os.getcwd(), 'argv': list(argv)}).encode('utf-8') + b'\n')
+            for response in responses:
+                message = json.loads(response.decode('utf-8'))
+                if 'output' in message:
+                    sys.stdout.write(message['output'])
+                    sys.stdout.flush()
+                else:
+                    result = message.get('result')
+                    break
+        except (OSError, ValueError):
+            return None
+    return result
+
+
+def stop_daemon(socket_path=None):
+    """
+    Ask the daemon to shut down, return False if no daemon is listening on the socket.
+    """
+    socket_path = socket_path or get_socket_path()
+    if socket_path is None:
+        return False
+    try:
+        sock = _connect(socket_path)
+    except OSError:
+        return False
+    with sock, sock.makefile('rb') as responses:
+        try:
+            sock.sendall(json.dumps({'command': 'stop'}).encode('utf-8') + b'\n')
+            return bool(responses.readline())
+        except OSError:  # the daemon was shutting down
+            return False
+
+
+def _start_daemon(socket_path, idle_timeout):
+    # Make sure the daemon imports the same package as the client:
+    env = dict(os.environ)
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+    try:
+        subprocess.Popen([sys.executable, '-m', 'pre_commit_hook.daemon',
+                          '--socket', socket_path, '--idle-timeout', str(idle_timeout)],
+                         cwd=os.getcwd(), env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, start_new_session=True)
+    except OSError:
+        return None
+
+    deadline = time.time() + _CONNECT_TIMEOUT
+    while time.time() < deadline:
+        try:
+            return _connect(socket_path)
+        except OSError:
+            time.sleep(0.02)
+    return None
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The daemon side:
+# ----------------------------------------------------------------------------------------------------------------------
+class _MessageWriter(object):
+    """
+    The stdout of the validation in the daemon, which sends the printed lines to the client as soon as they are
+    complete.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._buffer = ''
+
+    def write(self, text):
+        self._buffer += text
+        index = self._buffer.rfind('\n')
+        if index >= 0:
+            self.send({'output': self._buffer[:index + 1]})
+            self._buffer = self._buffer[index + 1:]
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            self.send({'output': self._buffer})
+            self._buffer = ''
+
+    def send(self, message):
+        self._stream.write(json.dumps(message).encode('utf-8') + b'\n')
+        self._stream.flush()
+
+
+class _PoolCache(object):
+    """
+    The process pools of the daemon, kept warm between the requests and keyed by the number of processes.
+    """
+
+    def __init__(self):
+        self._pools = dict()
+
+    def get(self, jobs):
+        pool = self._pools.get(jobs)
+        if pool is None:
+            from multiprocessing import Pool
+            pool = self._pools[jobs] = Pool(processes=jobs)
+        return pool
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.terminate()
+        self._pools.clear()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        from pre_commit_hook.validate import validate
+
+        writer = _MessageWriter(self.wfile)
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+        except ValueError:
+            return writer.send({'result': None})
+
+        if request.get('command') == 'stop':
+            self.server.stopped = True
+            return writer.send({'result': 0})
+
+        if request.get('cwd') != self.server.directory:
+            # Served by the daemon of the other directory, let the client validate by itself
+            return writer.send({'result': None})
+
+        try:
+            with contextlib.redirect_stdout(writer), contextlib.redirect_stderr(writer):
+                try:
+                    result = validate(request.get('argv', []), pools=self.server.pools)
+                except SystemExit as e:  # --help or the invalid arguments
+                    result = e.code
+        finally:
+            writer.flush()
+        writer.send({'result': result})
+
+
+class ValidationDaemon(socketserver.UnixStreamServer):
+    """
+    Serve the validation on the Unix socket for the working directory, one request at a time. The validator modules,
+    the compiled patterns and the process pools stay loaded between the requests, and the daemon shuts down by itself
+    once no request comes in idle_timeout seconds.
+    """
+
+    def __init__(self, socket_path, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.directory = os.getcwd()
+        self.socket_path = socket_path
+        self.timeout = idle_timeout
+        self.stopped = False
+        self.pools = _PoolCache()
+        socketserver.UnixStreamServer.__init__(self, socket_path, _RequestHandler, bind_and_activate=False)
+
+    def server_bind(self):
+        # Only the owner could connect to the daemon:
+        umask = os.umask(0o077)
+        try:
+            socketserver.UnixStreamServer.server_bind(self)
+        finally:
+            os.umask(umask)
+
+    def handle_timeout(self):
+        self.stopped = True
+
+    def serve_until_idle(self):
+        # Load the validator before the first request:
+        import pre_commit_hook.validate
+
+        try:
+            while not self.stopped:
+                self.handle_request()
+        finally:
+            self.server_close()
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+            self.pools.close()
+
+
+def serve(socket_path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """
+    Start the daemon, return False if another daemon is already listening on the socket.
+    """
+    socket_path = socket_path or get_socket_path()
+    if socket_path is None:
+        return False
+    try:
+        _connect(socket_path).close()
+        return False
+    except OSError:
+        pass
+    # Remove the socket left by the daemon which did not shut down cleanly:
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    daemon = ValidationDaemon(socket_path, idle_timeout)
+    try:
+        daemon.server_bind()
+        daemon.server_activate()
+    except OSError:
+        daemon.server_close()
+        return False
+    daemon.serve_until_idle()
+    return True
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Define the entry point for starting the daemon
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='Serve the apiary validation for the current directory')
+    arg_parser.add_argument('--socket', default=None, help='Path of the Unix socket (default: derived from the cwd)')
+    arg_parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                            help='Seconds without any request before the daemon shuts down (default: %(default)s)')
+    args = arg_parser.parse_args(argv)
+    return 0 if serve(args.socket, args.idle_timeout) else -1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,7 @@ if __name__ == '__main__':
     sys.path.append('%s/../../' % os.path.dirname(os.path.realpath(__file__)))
 
 import re
+import json
 import six
 from abc import ABCMeta, abstractmethod
 from pre_commit_hook.api.ApiContentElement import ApiContentElement, ApiContentElementFactory
@@ -21,6 +22,46 @@ WHITESPACE_STRING   = ' \t'
 NEWLINE_STRING      = '\r\n'
 _white_search       = WHITESPACE.search
 _url_pattern        = re.compile(r'http[s]*\/\/:[\w\_\-\.a-zA-Z0-9]+}').match
+_STRING_PATTERN     = r'\"[\b@\b%\w\_\-\.\s,\:\/\[\]\(\)\{\}\?\*\=\~\<\>\&\+\\]*\"'
+_NUMBER_PATTERN     = r'[1-9][0-9]*(.[0-9]+)?'
+
+# The engines for scanning the lines of the code block:
+ENGINE_CHARACTER    = 'character'  # scan the line character by character
+ENGINE_REGEX        = 'regex'      # scan the line token by token with the master pattern
+
+# The master pattern for the regex engine, each alternative matches one whole token:
+_token_match        = re.compile(r'''
+      (?P<whitespace>[ \t]+)
+    | (?P<string>%s)
+    | (?P<colon>:)
+    | (?P<comma>,)
+    | (?P<newline>[\r\n])
+    | (?P<dictionary_start>\{)
+    | (?P<dictionary_end>\})
+    | (?P<array_start>\[)
+    | (?P<array_end>\])
+    | (?P<number>[1-9][0-9]*(?:.[0-9]+)?)
+    | (?P<zero>0)
+    | (?P<true>[Tt][Rr][Uu][Ee])
+    | (?P<false>[Ff][Aa][Ll][Ss][Ee])
+    | (?P<ellipsis>\.\.\.)
+''' % _STRING_PATTERN, re.VERBOSE | re.UNICODE).match
+
+# The layout of the lines accepted by the json fast path (see ApiDecoder.scan_block), one element per line. The strings
+# do not contain any backslash, so the keys decoded by json are the same as the ones scanned by scan_line:
+_BLOCK_STRING_PATTERN = r'\"[\b@\b%\w\_\-\.\s,\:\/\[\]\(\)\{\}\?\*\=\~\<\>\&\+]*\"'
+_block_line_match   = re.compile(r'''
+    [ \t]*
+    (?:
+        (?P<ellipsis>\.\.\.)[ \t\r\n]*
+      | (?P<close>[\]\}])[ \t]*,?[ \t\r\n]*
+      | (?:(?P<key>%s)[ \t]*:[ \t]*)?
+        (?:
+            (?P<open>[\[\{])[ \t\r\n]*
+          | (?P<scalar>%s|true|false|0|[1-9][0-9]*(?:\.[0-9]+)?)(?:[ \t]*,[ \t\r\n]*|[ \t\r\n]+)
+        )
+    )
+''' % (_BLOCK_STRING_PATTERN, _BLOCK_STRING_PATTERN), re.VERBOSE | re.UNICODE).fullmatch
 
 
 __all__ = ['ApiDecoder']
@@ -91,6 +132,7 @@ def _validate_element_with_string_type(element, string_type):
 # ----------------------------------------------------------------------------------------------------------------------
 @six.add_metaclass(ABCMeta)
 class ApiBaseObject(object):
+    __slots__ = ('previous_element_append_with_comma', '_base_element', '_key', '_duplication_reference')
     _BASE_CLS = object
 
     def __init__(self):
@@ -139,6 +181,7 @@ class ApiDictionaryObject(ApiBaseObject):
         >>> isinstance(object["age"], ApiContentNumberElement)
         True
     """
+    __slots__ = ()
     _BASE_CLS = ApiContentDictionaryElement
 
     def append_child(self, child, key=None):
@@ -203,6 +246,7 @@ class ApiArrayObject(ApiBaseObject):
         >>> isinstance(element['code'], ApiContentNumberElement)
         True
     """
+    __slots__ = ()
     _BASE_CLS = ApiContentArrayElement
 
 
@@ -229,12 +273,12 @@ class ApiArrayObject(ApiBaseObject):
 #  The Decoder:
 # ----------------------------------------------------------------------------------------------------------------------
 class ApiDecoder(object):
-    _str_search      = re.compile(r'\"[\b@\b%\w\_\-\.\s,\:\/\[\]\(\)\{\}\?\*\=\~\<\>\&\+\\]*\"', re.UNICODE).search
+    _str_search      = re.compile(_STRING_PATTERN, re.UNICODE).search
     _comment_tag     = re.compile(r'\/\/').search
     _url_search      = re.compile(r'(http(s)*:)\/\/').search
     _comment_search  = re.compile(r'\[[a-zA-Z\s\w\_\-\.0-9,\(\)]*\]').search
     _subtype_search  = re.compile(r'\([a-zA-Z\_\-\. 0-9]+\)').search
-    _number_match    = re.compile(r'[1-9][0-9]*(.[0-9]+)?').match
+    _number_match    = re.compile(_NUMBER_PATTERN).match
 
     # The object for handling comment info:
     class ApiComment(object):
@@ -256,7 +300,9 @@ class ApiDecoder(object):
         def get(self, key, default=None):
             return self._info.get(key, default)
 
-    def __init__(self):
+    def __init__(self, engine=ENGINE_CHARACTER):
+        assert engine in (ENGINE_CHARACTER, ENGINE_REGEX), 'Unknown engine: %s' % engine
+        self.engine                = engine
         self._object_stacks        = list()    # The stack for the parsing process
         self._parsed_objects       = None      # The parsed result(s)
         self._buffered_element     = None
@@ -323,7 +369,7 @@ class ApiDecoder(object):
             next_chart = info[index]
             # skip whitespaces:
             if next_chart in WHITESPACE_STRING:
-                index  = _white_search(info).end()
+                index  = _white_search(info, index).end()
                 buffer = ''
                 continue
             # reach the end of the info
@@ -404,6 +450,12 @@ class ApiDecoder(object):
             if comment:
                 self._set_line_scanned_comment(comment)
 
+        if self.engine == ENGINE_REGEX:
+            self._scan_tokens(line)
+        else:
+            self._scan_characters(line)
+
+    def _scan_characters(self, line):
         # Skip the whitespaces:
         index = 0
         while index < len(line):
@@ -488,7 +540,233 @@ class ApiDecoder(object):
 
             index += 1
 
-        # Combine the object with the comments:
+    def _scan_tokens(self, line):
+        """
+        Scan the line with the master pattern, which matches the whole token in one call. The result and the errors
+        are the same as the ones of _scan_characters.
+
+        # For the doctest:
+        >>> d = ApiDecoder(engine=ENGINE_REGEX)
+        >>> for line in ['{\\n', '  "name": "Alice",\\n', '  "score": 2.5,\\n', '  "active": true\\n', '}\\n']:
+        ...     d.scan_line(line)
+        >>> sorted(d.get_parsed_objects().content.keys())
+        ['active', 'name', 'score']
+        """
+        index  = 0
+        length = len(line)
+        while index < length:
+            token = _token_match(line, index)
+            if token is None:
+                next_chart = line[index]
+                if next_chart == 'T' or next_chart == 't':
+                    raise ApiParsingException(message='could not recognize the syntax: %s' % line[index:index + 4])
+                elif next_chart == 'F' or next_chart == 'f':
+                    raise ApiParsingException(message='could not recognize the syntax: %s' % line[index:index + 5])
+                elif next_chart == '.':
+                    raise ApiParsingException(message='could not recognize the syntax: %s' % line[index:index + 3])
+                elif next_chart == '\"':
+                    # the string pattern is searched after the quote by the character engine:
+                    string, string_length = self._parse_string(line[index:])
+                    self._save_buffered_element(string)
+                    index += string_length
+                    continue
+                elif index == length - 1:
+                    self._append_buffered_element_to_current_object()
+                    index += 1
+                    continue
+                raise ApiParsingException(message='Syntax Error with line: %s' % line)
+
+            kind  = token.lastgroup
+            index = token.end()
+            if kind == 'whitespace':
+                if index == length:
+                    self._append_buffered_element_to_current_object()
+
+            elif kind == 'string':
+                self._save_buffered_element(token.group()[1:-1])
+
+            elif kind == 'colon':
+                if not isinstance(self._buffered_element, str):
+                    raise ApiParsingException(message='expected to be a string object before the \":\" sign')
+                key = self._buffered_element
+                self._buffered_element = dict(key=key)
+
+            elif kind == 'comma':
+                self._append_buffered_element_to_current_object(append_with_comma=True)
+
+            elif kind == 'newline':
+                self._append_buffered_element_to_current_object()
+
+            elif kind == 'dictionary_start':
+                new_object = self._create_dictionary_object_with_comment(self._get_line_scanned_comment())
+                self._append_object_to_stack(new_object)
+
+            elif kind == 'dictionary_end':
+                if not isinstance(self._get_current_object(), ApiDictionaryObject):
+                    raise ApiParsingException(message='expected to be a dictionary object with line: %s' % line)
+                self._pop_and_save_object()
+
+            elif kind == 'array_start':
+                new_object = self._create_array_object_with_comment(self._get_line_scanned_comment())
+                self._append_object_to_stack(new_object)
+
+            elif kind == 'array_end':
+                if not isinstance(self._get_current_object(), ApiArrayObject):
+                    raise ApiParsingException(message='expected to be an array object with line: %s' % line)
+                self._pop_and_save_object()
+
+            elif kind == 'number' or kind == 'zero':
+                self._save_buffered_element(float(token.group()))
+
+            elif kind == 'true':
+                self._save_buffered_element(bool(True))
+
+            elif kind == 'false':
+                self._save_buffered_element(bool(False))
+
+            else:  # ellipsis
+                self._get_current_object().previous_element_append_with_comma = False
+
+    # Block Scanning Related: -----------------------------------------------------------------------------------------
+    def scan_block(self, lines):
+        """
+        Scan all the lines of a code block. The block is parsed by the json module when its layout allows it (one
+        element per line, with the comments and the '...' on their own), and by scan_line line by line otherwise.
+        Both ways give the same parsed objects and the same errors.
+
+        # For the doctest:
+        >>> d = ApiDecoder()
+        >>> d.scan_block(['{\\n', '  "name": "Alice",  // [string, optional]\\n', '  "age": 28\\n', '}\\n'])
+        >>> d.get_parsed_objects()['name'].required
+        False
+        >>> d.get_parsed_objects()['age'].required
+        True
+        """
+        lines = list(lines)
+        if self.decode_block(lines):
+            return
+
+        for line in lines:
+            self.scan_line(line)
+
+    def decode_block(self, lines):
+        """
+        Parse the lines of a whole code block with the json module, and return True if they were parsed. Return False
+        without changing the decoder if the block should be scanned by scan_line instead: the decoder is not at the
+        start of a block, the layout of the block is not supported or the block is not valid.
+        """
+        if self._object_stacks or self._parsed_objects is not None or self._buffered_element is not None \
+                or self._line_scanned_comment is not None:
+            return False
+        element = self._decode_block_with_json(lines)
+        if element is None:
+            return False
+        self._parsed_objects = element
+        return True
+
+    def _decode_block_with_json(self, lines):
+        # Strip the comments, and record them with the paths of the elements they belong to:
+        codes       = list()
+        comments    = dict()
+        stack       = list()  # [is_dictionary, path, item_count] of the open containers
+        last_code   = None    # the index of the last code with an element
+        need_close  = False   # the '...' should be followed by the end of the container
+        root_closed = False
+        parsed_comments = dict()  # the comments are only read, so the same comment strings share the parsed result
+        for line in lines:
+            try:
+                comment_string, code = self._get_comment_string(line)
+                if not comment_string:
+                    comment = None
+                elif comment_string in parsed_comments:
+                    comment = parsed_comments[comment_string]
+                else:
+                    comment = parsed_comments[comment_string] = self._parse_comment(comment_string)
+            except Exception:
+                # let scan_line report the error in the order of the lines
+                return None
+            codes.append(code)
+            if not code.strip():
+                if comment:
+                    return None
+                continue
+
+            shape = _block_line_match(code)
+            if shape is None or root_closed:
+                return None
+            ellipsis, close, key, opening = shape.group('ellipsis', 'close', 'key', 'open')
+            if need_close and close is None:
+                return None
+            need_close = False
+
+            if ellipsis is not None:
+                if comment or not stack:
+                    return None
+                need_close = True
+                # remove the comma before the '...', which json does not accept:
+                if last_code is not None:
+                    previous = codes[last_code].rstrip()
+                    if previous.endswith(','):
+                        codes[last_code] = previous[:-1]
+                codes[-1] = ''
+                continue
+
+            last_code = len(codes) - 1
+            if close is not None:
+                if comment or not stack:
+                    return None
+                stack.pop()
+                root_closed = not stack
+                continue
+
+            if not stack:
+                if key is not None or opening is None:
+                    return None
+                path = tuple()
+            elif stack[-1][0]:
+                if key is None:
+                    return None
+                path = stack[-1][1] + (key[1:-1],)
+            else:
+                if key is not None:
+                    return None
+                path = stack[-1][1] + (stack[-1][2],)
+                stack[-1][2] += 1
+
+            comments[path] = comment
+            if opening is not None:
+                stack.append([opening == '{', path, 0])
+
+        if not root_closed:
+            return None
+
+        try:
+            value = json.loads('\n'.join(codes))
+            return self._build_block_element(value, tuple(), comments, None)
+        except Exception:
+            # let scan_line report the error at its line
+            return None
+
+    def _build_block_element(self, value, path, comments, container_object):
+        comment = comments.get(path)
+        if isinstance(value, dict) or isinstance(value, list):
+            new_object = ApiDictionaryObject() if isinstance(value, dict) else ApiArrayObject()
+            if comment:
+                if 'duplication' in comment:
+                    if not isinstance(container_object, ApiDictionaryObject):
+                        raise ApiParsingException(message='Syntax Error with duplication tag')
+                    new_object.set_duplication_reference(container_object.get_base_element().copy())
+                new_object.set_required(comment['required'])
+
+            if isinstance(value, dict):
+                for key, child in value.items():
+                    new_object.append_child(self._build_block_element(child, path + (key,), comments, new_object), key)
+            else:
+                for index, child in enumerate(value):
+                    new_object.append_child(self._build_block_element(child, path + (index,), comments, new_object))
+            return new_object.get_base_element()
+
+        return _get_api_response_element_from_element_and_comment(value, comment)
 
     # Append element Related: ------------------------------------------------------------------------------------------
     def _save_buffered_element(self, element):
@@ -596,8 +874,11 @@ class ApiDecoder(object):
         return self._parsed_objects
 
     def clear(self):
+        # Reset all the state of the block, also after an error in the middle of a line (see ApiaryValidator):
         self._parsed_objects = None
         self._object_stacks.clear()
+        self._buffered_element = None
+        self._line_scanned_comment = None
 
 
 if __name__ == "__main__":
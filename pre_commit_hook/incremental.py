@@ -0,0 +1,155 @@
+__author__ = 'Arsenal_49'
+
+import json
+from pre_commit_hook.apiary import ApiaryValidator, get_lines_from_stream, _group_title, _api_title
+from pre_commit_hook.cache import ValidationCache
+from pre_commit_hook.error import ApiaryError
+
+# The stand-in for the parsed objects of the decoder when restoring the validator from a snapshot. The validator only
+# checks if the previous code block had been parsed, the parsed objects themselves are not used across the sections.
+_RESTORED_PARSED_OBJECTS = True
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Split the document into sections at the group titles and the api titles:
+# ----------------------------------------------------------------------------------------------------------------------
+def split_sections(lines):
+    """
+    Return the list of (start_index, lines) for the sections of the document. The first section holds the lines before
+    the first title and might be empty.
+
+    # For the doctest:
+    >>> lines = ['FORMAT: 1A', '# Group A', '## api [/a]', '### get [GET]', '## api [/b]']
+    >>> [(start, len(section)) for start, section in split_sections(lines)]
+    [(0, 1), (1, 1), (2, 2), (4, 1)]
+    """
+    sections = list()
+    start = 0
+    for index, line in enumerate(lines):
+        if index > start and (_group_title(line) or _api_title(line)):
+            sections.append((start, lines[start:index]))
+            start = index
+    sections.append((start, lines[start:]))
+    return sections
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The snapshot of the validator state between the sections:
+# ----------------------------------------------------------------------------------------------------------------------
+def get_snapshot(validator):
+    """
+    Return the state of the validator as a JSON-serializable list, or None if the state could not be restored later,
+    i.e. the decoder is in the middle of a code block.
+    """
+    assert isinstance(validator, ApiaryValidator)
+    decoder = validator._decoder  # not loading the decoder before the first code block
+    if decoder is not None and (decoder._object_stacks or decoder._buffered_element is not None or
+                                decoder._line_scanned_comment is not None):
+        return None
+    return [validator.state,
+            list(validator._parameters),
+            validator._read_parameter_string,
+            validator._read_newline,
+            decoder is not None and bool(decoder.get_parsed_objects())]
+
+
+def restore_snapshot(validator, snapshot):
+    assert isinstance(validator, ApiaryValidator) and snapshot is not None
+    state, parameters, read_parameter_string, read_newline, parsed = snapshot
+    validator.state = state
+    validator._parameters = list(parameters)
+    validator._read_parameter_string = read_parameter_string
+    validator._read_newline = read_newline
+    if validator._decoder is not None:
+        validator._decoder.clear()
+    if parsed:
+        validator.decoder._parsed_objects = _RESTORED_PARSED_OBJECTS
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The validator which only re-validates the changed sections
+# ----------------------------------------------------------------------------------------------------------------------
+class IncrementalValidator(object):
+    """
+    Validate the document section by section. The result of each section is cached with the hash of its content and
+    the validator state it started with, together with the state it ended with. An unchanged section starting with an
+    unchanged state is skipped, so editing one endpoint only re-validates that endpoint (plus the following section
+    when the edit changes the state it ends with).
+
+    The result is the same as validating the whole document with validator_cls.
+    """
+
+    def __init__(self, cache, validator_cls=ApiaryValidator):
+        assert isinstance(cache, ValidationCache)
+        assert issubclass(validator_cls, ApiaryValidator)
+        self.cache = cache
+        self.validator_cls = validator_cls
+        self.errors = list()
+        self.validated_section_count = 0
+        self.cached_section_count = 0
+
+    def validate_file(self, file, verbose=False):
+        assert isinstance(file, str)
+        try:
+            f = open(file, 'r')
+        except FileNotFoundError:
+            print('Error: could not find the file %s' % file)
+            return False, ApiaryError(message='could not find the file: %s' % file)
+
+        with f:
+            return self.validate_stream(f, verbose)
+
+    def validate_stream(self, stream, verbose=False, encoding='utf-8'):
+        # The sections are hashed as a whole, so the lines are kept in the memory:
+        return self.validate_lines(list(get_lines_from_stream(stream, encoding)), verbose)
+
+    def validate_lines(self, lines, verbose=False):
+        self.errors = list()
+        validator = self.validator_cls()
+        snapshot = get_snapshot(validator)
+        live = True  # if the validator is at the state of the snapshot
+
+        for start, section in split_sections(lines):
+            key = None
+            if snapshot is not None:
+                key = self.cache.get_key(('%s\n%s' % (json.dumps(snapshot), ''.join(section))).encode('utf-8'))
+                record = self.cache.get(key)
+                if record is not None:
+                    self.cached_section_count += 1
+                    if not record['valid']:
+                        for offset, error in ValidationCache.get_errors_from_record(record):
+                            print('ValError: %s (@ %d)' % (error.message, start + offset))
+                            self.errors.append((start + offset, error))
+                        return False, self.errors[0][1]
+                    snapshot = record['snapshot']
+                    live = False
+                    continue
+
+            if not live:
+                validator = self.validator_cls()
+                restore_snapshot(validator, snapshot)
+                live = True
+
+            self.validated_section_count += 1
+            valid, error, offset = self._validate_section(validator, section, start, verbose)
+            if not valid:
+                print('ValError: %s (@ %d)' % (error.message, start + offset))
+                self.errors.append((start + offset, error))
+                if key is not None:
+                    self.cache.set(key, ValidationCache.make_record(False, [(offset, error)]))
+                return False, error
+
+            snapshot_end = get_snapshot(validator)
+            if key is not None and snapshot_end is not None:
+                record = ValidationCache.make_record(True, [])
+                record['snapshot'] = snapshot_end
+                self.cache.set(key, record)
+            snapshot = snapshot_end
+
+        return True, None
+
+    @staticmethod
+    def _validate_section(validator, section, start, verbose):
+        for line_count, error in validator._iter_errors(section, verbose, start):
+            return False, error, line_count - start
+        return True, None, len(section)
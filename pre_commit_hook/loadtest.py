@@ -0,0 +1,471 @@
+__author__ = 'Arsenal_49'
+
+# Drive the documented endpoints of a blueprint at a target request rate, and report the latency percentiles of each
+# endpoint.
+#
+# The generator is open-loop: the requests are scheduled at the fixed intervals of the target rate, whether or not the
+# previous responses came back, and the latency of a request is measured from its scheduled time instead of the time
+# it was actually sent. A stalled service therefore shows up in the percentiles with all the requests which should
+# have been sent meanwhile, instead of one slow sample (the coordinated omission of the closed-loop generators). The
+# requests still waiting for their responses or for a connection when the run stops are counted as timed out.
+#
+# The requests are rendered before the run, a pool per endpoint with the url parameters filled by the types of
+# + Parameters and the bodies from MockDataGenerator, so the generator only writes bytes while it runs. The latencies
+# go into the log-linear histograms of the microseconds, with the relative error under 0.8%.
+
+import argparse
+import asyncio
+import bisect
+import collections
+import itertools
+import json
+import random
+import string
+import sys
+import time
+from urllib.parse import quote, urlencode, urlsplit
+from pre_commit_hook.contract import _read_response
+from pre_commit_hook.mockdata import MockDataGenerator
+from pre_commit_hook.api.ApiContentCompiler import get_compiled_validator
+from pre_commit_hook.api.Exception import TestingException
+
+DEFAULT_RATE = 100  # requests per second
+DEFAULT_DURATION = 10  # seconds
+DEFAULT_CONNECTIONS = 16
+DEFAULT_TIMEOUT = 10  # seconds for each request
+DEFAULT_POOL_SIZE = 64  # the requests rendered for each endpoint
+
+_PERCENTILES = (50.0, 99.0, 99.9)
+_SUB_BUCKET_BITS = 8  # the precision of the histograms, 2 ** -(8 - 1) of the value at most
+_SCHEDULER_RESOLUTION = 0.001  # the scheduler sends all the requests due within a millisecond at once
+_ALPHANUMERIC = string.ascii_lowercase + string.digits
+_TIMEOUT_ERROR = asyncio.TimeoutError.__name__  # the kind of the errors of the timed out requests
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The latency histogram
+# ----------------------------------------------------------------------------------------------------------------------
+class LatencyHistogram(object):
+    """
+    Count the latencies in microseconds in the log-linear buckets: the values below 2 ** 8 exactly, then 128 buckets
+    for each power of 2, like HdrHistogram. The percentiles are the highest value of their bucket.
+
+    # For the doctest:
+    >>> histogram = LatencyHistogram()
+    >>> for value in range(1, 10001):
+    ...     histogram.record(value)
+    >>> histogram.get_percentile(50), histogram.get_percentile(99), histogram.max
+    (5023, 9919, 10000)
+    """
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = dict()  # the count of each bucket index
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def _get_index(value):
+        shift = value.bit_length() - _SUB_BUCKET_BITS
+        if shift <= 0:
+            return value
+        return (shift << _SUB_BUCKET_BITS) + (value >> shift)
+
+    @staticmethod
+    def _get_highest_value(index):
+        shift = index >> _SUB_BUCKET_BITS
+        if shift == 0:
+            return index
+        return (((index & ((1 << _SUB_BUCKET_BITS) - 1)) + 1) << shift) - 1
+
+    def record(self, value):
+        value = int(value)
+        index = self._get_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.total / float(self.count) if self.count else 0.0
+
+    def get_percentile(self, percentile):
+        if not self.count:
+            return 0
+        rank = max(1, int(round(percentile / 100.0 * self.count + 0.4999999)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._get_highest_value(index), self.max)
+        return self.max
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The report
+# ----------------------------------------------------------------------------------------------------------------------
+class _EndpointStats(object):
+    __slots__ = ('histogram', 'statuses', 'errors', 'validated', 'mismatches')
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.statuses = collections.Counter()
+        self.errors = collections.Counter()  # the failed requests by the kind of the error
+        self.validated = 0
+        self.mismatches = collections.Counter()  # the sampled responses not matching the contract, by the error
+
+
+class LoadReport(object):
+
+    def __init__(self, endpoint_names, rate, duration):
+        self.rate = rate
+        self.duration = duration
+        self.elapsed = 0.0
+        self.scheduled = 0
+        self.stats = collections.OrderedDict((name, _EndpointStats()) for name in endpoint_names)
+
+    def get_total_histogram(self):
+        histogram = LatencyHistogram()
+        for stats in self.stats.values():
+            histogram.merge(stats.histogram)
+        return histogram
+
+    def to_dict(self):
+        def _stats_to_dict(histogram, stats_list):
+            result = {'requests': histogram.count, 'mean_ms': round(histogram.mean / 1e3, 3),
+                      'max_ms': histogram.max / 1e3}
+            for percentile in _PERCENTILES:
+                result['p%g_ms' % percentile] = histogram.get_percentile(percentile) / 1e3
+            result['errors'] = sum(sum(stats.errors.values()) for stats in stats_list)
+            result['validated'] = sum(stats.validated for stats in stats_list)
+            result['mismatches'] = sum(sum(stats.mismatches.values()) for stats in stats_list)
+            return result
+
+        result = _stats_to_dict(self.get_total_histogram(), list(self.stats.values()))
+        result.update({'target_rate': self.rate, 'duration': self.duration, 'scheduled': self.scheduled,
+                       'elapsed': round(self.elapsed, 6)})
+        result['endpoints'] = dict()
+        for name, stats in self.stats.items():
+            endpoint_result = _stats_to_dict(stats.histogram, [stats])
+            endpoint_result['statuses'] = dict((str(status), count) for status, count in stats.statuses.items())
+            endpoint_result['error_kinds'] = dict(stats.errors)
+            endpoint_result['mismatch_kinds'] = dict(stats.mismatches)
+            result['endpoints'][name] = endpoint_result
+        return result
+
+    def print_report(self):
+        total = self.get_total_histogram()
+        errors = sum(sum(stats.errors.values()) for stats in self.stats.values())
+        print('finished %d of %d scheduled request(s) at %g req/s for %gs: %.1f req/s achieved, %d error(s)' % (
+            total.count + errors, self.scheduled, self.rate, self.duration,
+            total.count / self.elapsed if self.elapsed else 0.0, errors))
+        print('%-48s %8s %9s %9s %9s %9s %7s' % ('endpoint', 'requests', 'p50 ms', 'p99 ms', 'p99.9 ms', 'max ms',
+                                                   'errors'))
+        rows = [(name, stats.histogram, stats) for name, stats in self.stats.items()]
+        for name, histogram, stats in rows + [('total', total, None)]:
+            error_count = errors if stats is None else sum(stats.errors.values())
+            print('%-48s %8d %9.2f %9.2f %9.2f %9.2f %7d' % (
+                name[:48], histogram.count, histogram.get_percentile(50) / 1e3, histogram.get_percentile(99) / 1e3,
+                histogram.get_percentile(99.9) / 1e3, histogram.max / 1e3, error_count))
+        for name, stats in self.stats.items():
+            for kind, count in stats.errors.most_common():
+                print('error: %s: %s (%d)' % (name, kind, count))
+            if stats.validated:
+                print('validated %d response(s) of %s: %d mismatched%s' % (
+                    stats.validated, name, sum(stats.mismatches.values()),
+                    ''.join(', %s (%d)' % item for item in stats.mismatches.most_common())))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The load generator
+# ----------------------------------------------------------------------------------------------------------------------
+class LoadGenerator(object):
+    """
+    Send the requests of the endpoints at the rate for the duration, each endpoint chosen with the probability of its
+    weight (the weights by the endpoint name "METHOD /path", 1 by default and 0 for skipping it). The given parameters
+    override the generated values, and the validate_fraction of the responses is checked with the compiled validators
+    of the documented responses.
+    """
+
+    def __init__(self, endpoints, base_url, rate=DEFAULT_RATE, duration=DEFAULT_DURATION,
+                 connections=DEFAULT_CONNECTIONS, weights=None, parameters=None, headers=None, validate_fraction=0.0,
+                 timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE, seed=0):
+        assert rate > 0 and duration > 0 and connections > 0, 'The rate, duration and connections should be positive'
+        assert 0.0 <= validate_fraction <= 1.0, 'The validate fraction should be between 0 and 1'
+        split_url = urlsplit(base_url)
+        assert split_url.scheme in ('http', 'https') and split_url.hostname, 'The base url should be http(s)://host'
+        weights = dict(weights or {})
+        unknown_names = set(weights) - set(endpoint.name for endpoint in endpoints)
+        assert not unknown_names, 'Unknown endpoint(s) in the weights: %s' % ', '.join(sorted(unknown_names))
+
+        self.rate = rate
+        self.duration = duration
+        self.connections = connections
+        self.validate_fraction = validate_fraction
+        self.timeout = timeout
+        self.parameters = dict(parameters or {})
+        self.headers = dict(headers or {})
+        self._random = random.Random(seed)
+        self._host = split_url.hostname
+        self._port = split_url.port or (443 if split_url.scheme == 'https' else 80)
+        self._ssl = (split_url.scheme == 'https') or None
+        self._prefix = split_url.path.rstrip('/')
+        self._host_header = split_url.netloc
+
+        # The endpoints with a positive weight, each with its pool of the rendered requests:
+        self.endpoints = list()
+        self._pools = list()
+        cumulative_weights = list()
+        generator = MockDataGenerator(seed)
+        for endpoint in endpoints:
+            weight = weights.get(endpoint.name, 1)
+            if weight <= 0 or endpoint.name in [other.name for other in self.endpoints]:
+                continue
+            self.endpoints.append(endpoint)
+            requests = [self._render_request(endpoint, generator) for i in range(pool_size)]
+            self._pools.append(itertools.cycle(requests))
+            cumulative_weights.append((cumulative_weights[-1] if cumulative_weights else 0) + weight)
+            for element in endpoint.responses.values():
+                get_compiled_validator(element)
+        assert self.endpoints, 'No endpoint to send the requests to'
+        self._cumulative_weights = cumulative_weights
+
+    # Request Related: -------------------------------------------------------------------------------------------------
+    def _get_parameter_value(self, endpoint, name):
+        if name in self.parameters:
+            return str(self.parameters[name])
+        type_string = endpoint.parameter_types.get(name, ('string', True))[0]
+        if type_string == 'number':
+            return str(self._random.randint(1, 9999))
+        if type_string == 'boolean':
+            return self._random.choice(['true', 'false'])
+        return ''.join(self._random.choice(_ALPHANUMERIC) for i in range(8))
+
+    def get_target(self, endpoint):
+        """
+        Return a path with the query string for the endpoint: all the path parameters, and the required query
+        parameters of + Parameters (or the given ones) with the values generated by their types.
+        """
+        segments = list()
+        for segment in endpoint.path.split('/'):
+            while '{' in segment and '}' in segment:
+                start = segment.index('{')
+                end = segment.index('}', start)
+                value = quote(self._get_parameter_value(endpoint, segment[start + 1:end]), safe='')
+                segment = segment[:start] + value + segment[end + 1:]
+            segments.append(segment)
+        target = self._prefix + '/'.join(segments)
+
+        index = endpoint.url.find('{?')
+        if index >= 0:
+            query = list()
+            for name in [name.strip() for name in endpoint.url[index + 2:].rstrip('}').split(',')]:
+                type_string, required = endpoint.parameter_types.get(name, ('string', False))
+                if name in self.parameters or required:
+                    query.append((name, self._get_parameter_value(endpoint, name)))
+            if query:
+                target = '%s?%s' % (target, urlencode(query))
+        return target or '/'
+
+    def _render_request(self, endpoint, generator):
+        body = b''
+        if endpoint.requests:
+            body = b''.join(generator.iter_chunks(endpoint.requests[0][1]))
+        headers = {'Host': self._host_header, 'Accept': 'application/json'}
+        if body or endpoint.method in ('POST', 'PUT', 'PATCH'):
+            headers['Content-Type'] = 'application/json'
+            headers['Content-Length'] = str(len(body))
+        headers.update(self.headers)
+        head = ''.join('%s: %s\r\n' % item for item in headers.items())
+        return ('%s %s HTTP/1.1\r\n%s\r\n' % (endpoint.method, self.get_target(endpoint), head)).encode('latin-1') + body
+
+    # Running Related: -------------------------------------------------------------------------------------------------
+    def run(self):
+        """
+        Run the load and return the LoadReport.
+        """
+        return asyncio.run(self.run_async())
+
+    async def run_async(self):
+        report = LoadReport([endpoint.name for endpoint in self.endpoints], self.rate, self.duration)
+        queue = collections.deque()
+        wakeup = asyncio.Event()
+        state = {'done': False}
+        workers = [asyncio.ensure_future(self._work(queue, wakeup, state, report)) for i in range(self.connections)]
+        start_time = time.perf_counter()
+        try:
+            await self._schedule(queue, wakeup, start_time, report)
+            state['done'] = True
+            wakeup.set()
+            await asyncio.wait(workers, timeout=self.timeout)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        # The requests never sent before the workers were stopped timed out as well:
+        stats_list = list(report.stats.values())
+        for scheduled_time, endpoint_index in queue:
+            stats_list[endpoint_index].errors[_TIMEOUT_ERROR] += 1
+        report.elapsed = time.perf_counter() - start_time
+        return report
+
+    async def _schedule(self, queue, wakeup, start_time, report):
+        # Queue the requests at their scheduled times, the ones due within the resolution together:
+        interval = 1.0 / self.rate
+        count = int(self.rate * self.duration)
+        choose = self._random.random
+        cumulative_weights = self._cumulative_weights
+        total_weight = cumulative_weights[-1]
+        index = 0
+        while index < count:
+            now = time.perf_counter()
+            while index < count and start_time + index * interval <= now + _SCHEDULER_RESOLUTION:
+                endpoint_index = bisect.bisect_right(cumulative_weights, choose() * total_weight)
+                queue.append((start_time + index * interval, endpoint_index))
+                index += 1
+            report.scheduled = index
+            wakeup.set()
+            if index < count:
+                await asyncio.sleep(max(0.0, start_time + index * interval - time.perf_counter()))
+
+    async def _work(self, queue, wakeup, state, report):
+        connection = None
+        stats_list = list(report.stats.values())
+        try:
+            while True:
+                if not queue:
+                    if state['done']:
+                        return
+                    wakeup.clear()
+                    await wakeup.wait()
+                    continue
+                scheduled_time, endpoint_index = queue.popleft()
+                stats = stats_list[endpoint_index]
+                try:
+                    if connection is None:
+                        connection = await asyncio.wait_for(
+                            asyncio.open_connection(self._host, self._port, ssl=self._ssl), self.timeout)
+                    status, headers, body = await asyncio.wait_for(
+                        self._exchange(connection, next(self._pools[endpoint_index])), self.timeout)
+                except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                        asyncio.LimitOverrunError) as e:
+                    stats.errors[type(e).__name__] += 1
+                    if connection is not None:
+                        connection[1].close()
+                        connection = None
+                    continue
+                except asyncio.CancelledError:
+                    # Stopped by run_async while waiting for the response:
+                    stats.errors[_TIMEOUT_ERROR] += 1
+                    raise
+
+                stats.histogram.record((time.perf_counter() - scheduled_time) * 1e6)
+                stats.statuses[status] += 1
+                if headers.get('connection', '').lower() == 'close':
+                    connection[1].close()
+                    connection = None
+                if self.validate_fraction and self._random.random() < self.validate_fraction:
+                    self._validate(self.endpoints[endpoint_index], status, body, stats)
+        finally:
+            if connection is not None:
+                connection[1].close()
+
+    @staticmethod
+    async def _exchange(connection, request):
+        reader, writer = connection
+        writer.write(request)
+        await writer.drain()
+        return await _read_response(reader)
+
+    @staticmethod
+    def _validate(endpoint, status, body, stats):
+        stats.validated += 1
+        element = endpoint.get_response(status)
+        if element is None:
+            if endpoint.responses:
+                stats.mismatches['undocumented status %d' % status] += 1
+            return
+        try:
+            get_compiled_validator(element)(json.loads(body.decode('utf-8')))
+        except ValueError:
+            stats.mismatches['invalid JSON'] += 1
+        except (TestingException, AssertionError) as e:
+            key_path = getattr(e, 'user_info', {}).get('key_path', '-')
+            stats.mismatches['%s at %s' % (type(e).__name__, key_path)] += 1
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Define the entry point for running the load
+def _parse_weight(text):
+    name, separator, weight = text.rpartition('=')
+    if not separator:
+        raise argparse.ArgumentTypeError('expected "METHOD /path=WEIGHT": %s' % text)
+    return name.strip(), float(weight)
+
+
+def main(argv=None):
+    from pre_commit_hook.contract import _parse_pair, _parse_header
+    arg_parser = argparse.ArgumentParser(description='Send the requests of the blueprint at a target rate')
+    arg_parser.add_argument('blueprint', help='The blueprint (.apib)')
+    arg_parser.add_argument('base_url', help='The base url of the service, e.g. http://localhost:3000/v1')
+    arg_parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                            help='Requests per second (default: %(default)s)')
+    arg_parser.add_argument('--duration', type=float, default=DEFAULT_DURATION,
+                            help='Seconds of the load (default: %(default)s)')
+    arg_parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS,
+                            help='Number of the keep-alive connections (default: %(default)s)')
+    arg_parser.add_argument('--weight', type=_parse_weight, action='append', default=[], metavar='"METHOD /path=N"',
+                            help='Weight of an endpoint, 1 by default and 0 for skipping it, repeatable')
+    arg_parser.add_argument('--param', type=_parse_pair, action='append', default=[], metavar='NAME=VALUE',
+                            help='Value of a parameter of the url templates, repeatable')
+    arg_parser.add_argument('--header', type=_parse_header, action='append', default=[], metavar='"NAME: VALUE"',
+                            help='Header sent with every request, repeatable')
+    arg_parser.add_argument('--validate', type=float, default=0.0, metavar='FRACTION',
+                            help='Fraction of the responses checked against the blueprint (default: %(default)s)')
+    arg_parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                            help='Seconds for each request (default: %(default)s)')
+    arg_parser.add_argument('--seed', type=int, default=0, help='Seed of the requests (default: %(default)s)')
+    arg_parser.add_argument('--schema-cache', nargs='?', const='', default=None, metavar='DIRECTORY',
+                            help='Keep the parsed schemas of the blueprint in the directory (default: '
+                                 '.cache/pre-commit-apiary/schemas)')
+    arg_parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = arg_parser.parse_args(argv)
+
+    try:
+        if args.schema_cache is None:
+            from pre_commit_hook.blueprint import BlueprintReader
+            endpoints = BlueprintReader().read_file(args.blueprint)
+        else:
+            from pre_commit_hook.schema_cache import read_endpoints, DEFAULT_SCHEMA_DIRECTORY
+            endpoints = read_endpoints(args.blueprint, args.schema_cache or DEFAULT_SCHEMA_DIRECTORY)
+    except (ValueError, OSError) as e:
+        print('Error: could not read the blueprint %s: %s' % (args.blueprint, e))
+        return -1
+
+    try:
+        generator = LoadGenerator(endpoints, args.base_url, args.rate, args.duration, args.connections,
+                                  dict(args.weight), dict(args.param), dict(args.header), args.validate, args.timeout,
+                                  seed=args.seed)
+    except AssertionError as e:
+        print('Error: %s' % e)
+        return -1
+    report = generator.run()
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        report.print_report()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
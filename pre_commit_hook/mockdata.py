@@ -0,0 +1,282 @@
+__author__ = 'Arsenal_49'
+
+# Generate the mock JSON payloads of the element trees as a stream of bytes, for the load tests which need the bodies
+# of several MB. Unlike generate_json_object, the payload is never built as a tree of Python objects: the values are
+# rendered straight into bytes, and the large arrays are streamed in chunks.
+#
+# The generator is seeded and deterministic. The random values come from a buffer of random bytes, refilled from the
+# seeded random.Random, and the strings are the random bytes translated into the alphanumeric characters. The items of
+# an expanded array are drawn from a set of pre-rendered variants of the item, so a large array costs one join of the
+# bytes per batch of items instead of rendering every item.
+
+import argparse
+import json
+import random
+import string
+import sys
+from pre_commit_hook.api.ApiContentElement import ApiContentDuplicateElement
+from pre_commit_hook.api.ApiContentElement import ApiContentStringElement, ApiContentUrlElement
+from pre_commit_hook.api.ApiContentElement import ApiContentNumberElement, ApiContentTimestampElement
+from pre_commit_hook.api.ApiContentElement import ApiContentBooleanElement
+from pre_commit_hook.api.ApiContentElement import ApiContentArrayElement, ApiContentDictionaryElement
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_VARIANTS = 256  # picked by one random byte
+
+_RANDOM_BUFFER_SIZE = 64 * 1024
+_BATCH_SIZE = 1024  # the items of an expanded array joined at once
+_TIMESTAMP_BASE = 1500000000
+
+# The random bytes translated into the alphanumeric characters:
+_ALPHANUMERIC = (string.ascii_lowercase + string.ascii_uppercase + string.digits).encode('ascii')
+_ALPHANUMERIC_TABLE = bytes(_ALPHANUMERIC[i % len(_ALPHANUMERIC)] for i in range(256))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The source of the random bytes
+# ----------------------------------------------------------------------------------------------------------------------
+class _RandomBytes(object):
+
+    def __init__(self, seed):
+        self._random = random.Random(seed)
+        self._buffer = b''
+        self._index = 0
+
+    def take(self, count):
+        index = self._index
+        if index + count > len(self._buffer):
+            self._buffer = self._random.getrandbits(8 * _RANDOM_BUFFER_SIZE).to_bytes(_RANDOM_BUFFER_SIZE, 'little')
+            index = 0
+        self._index = index + count
+        return self._buffer[index:index + count]
+
+    def byte(self):
+        return self.take(1)[0]
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The generator
+# ----------------------------------------------------------------------------------------------------------------------
+class MockDataGenerator(object):
+    """
+    Render the JSON payloads which are valid against the element trees.
+
+    # For the doctest:
+    >>> from pre_commit_hook.api.ApiContentElement import ApiContentElementFactory
+    >>> schema = ApiContentElementFactory.get_response_element_by_type('array')
+    >>> schema.add_element(ApiContentElementFactory.get_response_element_by_type('number'))
+    >>> payload = b''.join(MockDataGenerator(seed=49).iter_chunks(schema, array_length=1000))
+    >>> len(json.loads(payload.decode('utf-8')))
+    1000
+    >>> payload == b''.join(MockDataGenerator(seed=49).iter_chunks(schema, array_length=1000))
+    True
+    """
+
+    def __init__(self, seed=0, variants=DEFAULT_VARIANTS, chunk_size=DEFAULT_CHUNK_SIZE):
+        assert 0 < variants <= 256, 'The number of the variants should be between 1 and 256'
+        self._random = _RandomBytes(seed)
+        self._variants = variants
+        self._chunk_size = chunk_size
+        self._variant_cache = dict()  # the pre-rendered variants by the id of the element
+        self._key_cache = dict()  # the encoded '"key":' by the key
+        self._renderers = {
+            ApiContentStringElement: self._render_string,
+            ApiContentUrlElement: self._render_url,
+            ApiContentNumberElement: self._render_number,
+            ApiContentTimestampElement: self._render_timestamp,
+            ApiContentBooleanElement: self._render_boolean,
+            ApiContentDictionaryElement: self._render_dictionary,
+            ApiContentArrayElement: self._render_array,
+            ApiContentDuplicateElement: self._render_duplicate,
+        }
+
+    # Streaming Related: -----------------------------------------------------------------------------------------------
+    def iter_chunks(self, element, array_length=None, size=None):
+        """
+        Yield the payload of the element as chunks of bytes. The outermost arrays (those not inside another array) get
+        array_length items instead of one item per documented element, and with the size, the first of them is
+        extended until the payload reaches about the size in bytes.
+        """
+        state = {'size': size, 'written': 0}
+        buffer, buffered = list(), 0
+        for piece in self._iter_pieces(element, array_length, state):
+            buffer.append(piece)
+            buffered += len(piece)
+            state['written'] += len(piece)
+            if buffered >= self._chunk_size:
+                yield b''.join(buffer)
+                buffer, buffered = list(), 0
+        if buffer:
+            yield b''.join(buffer)
+
+    def write(self, element, stream, array_length=None, size=None):
+        """
+        Write the payload to the binary file object, or send it to the socket. Return the number of the bytes.
+        """
+        write = stream.sendall if hasattr(stream, 'sendall') else stream.write
+        count = 0
+        for chunk in self.iter_chunks(element, array_length, size):
+            write(chunk)
+            count += len(chunk)
+        return count
+
+    def _iter_pieces(self, element, array_length, state):
+        while isinstance(element, ApiContentDuplicateElement):
+            element = element.source_element
+        if isinstance(element, ApiContentDictionaryElement):
+            yield b'{'
+            separator = b''
+            for key, child in element.content.items():
+                if child.required or self._random.byte() & 1:
+                    yield separator + self._get_encoded_key(key)
+                    for piece in self._iter_pieces(child, array_length, state):
+                        yield piece
+                    separator = b','
+            yield b'}'
+        elif isinstance(element, ApiContentArrayElement) and (array_length is not None or state['size']):
+            for piece in self._iter_array(element, array_length, state):
+                yield piece
+        else:
+            yield self.render(element)
+
+    def _iter_array(self, element, array_length, state):
+        content = element.content
+        size, state['size'] = state['size'], None  # only the first outermost array is extended for the size
+        if not content:
+            yield b'[]'
+            return
+        count = len(content) if array_length is None else array_length
+        documented = min(count, len(content))
+        yield b'[' + b','.join([self.render(child) for child in content[:documented]])
+
+        # The other items are validated against the first element, see ApiContentArrayElement.validate_json_object:
+        variants = self._get_variants(content[0])
+        average_size = sum(len(variant) for variant in variants) / float(len(variants)) + 1
+        take = self._random.take
+        need_separator = documented > 0
+        remaining = count - documented
+        while True:
+            if size is not None:
+                missing = size - state['written'] - 1  # without the closing bracket
+                remaining = int(missing / average_size) + 1 if missing > 0 else 0
+            if remaining <= 0:
+                break
+            batch = min(remaining, _BATCH_SIZE)
+            if size is not None:
+                batch = min(batch, remaining // 2 + 1)  # closer to the size with the smaller batches
+            piece = b','.join([variants[index] for index in take(batch)])
+            yield b',' + piece if need_separator else piece
+            need_separator = True
+            remaining -= batch
+        yield b']'
+
+    def _get_variants(self, element):
+        variants = self._variant_cache.get(id(element))
+        if variants is None or variants[0] is not element:
+            rendered = [self.render(element) for i in range(self._variants)]
+            variants = self._variant_cache[id(element)] = (element, [rendered[i % len(rendered)] for i in range(256)])
+        return variants[1]
+
+    def _get_encoded_key(self, key):
+        encoded_key = self._key_cache.get(key)
+        if encoded_key is None:
+            encoded_key = self._key_cache[key] = (json.dumps(key) + ':').encode('utf-8')
+        return encoded_key
+
+    # Rendering Related: -----------------------------------------------------------------------------------------------
+    def render(self, element):
+        """
+        Return the bytes of one value of the element, with one item per documented element of the arrays, like
+        generate_json_object.
+        """
+        renderer = self._renderers.get(type(element))
+        if renderer is None:
+            return json.dumps(element.generate_json_object()).encode('utf-8')
+        return renderer(element)
+
+    def _render_string(self, element):
+        length = 2 + self._random.byte() % 31
+        return b'"%s"' % self._random.take(length).translate(_ALPHANUMERIC_TABLE)
+
+    def _render_url(self, element):
+        take = self._random.take
+        sections = [take(1 + byte % 16).translate(_ALPHANUMERIC_TABLE) for byte in take(1 + self._random.byte() % 8)]
+        return b'"https://%s"' % b'/'.join(sections)
+
+    def _render_number(self, element):
+        return b'%d' % (int.from_bytes(self._random.take(2), 'little') % 19999 - 9999)
+
+    def _render_timestamp(self, element):
+        return b'%d' % (_TIMESTAMP_BASE + int.from_bytes(self._random.take(4), 'little') % 100000000)
+
+    def _render_boolean(self, element):
+        return b'true' if self._random.byte() & 1 else b'false'
+
+    def _render_dictionary(self, element):
+        pieces = list()
+        for key, child in element.content.items():
+            if child.required or self._random.byte() & 1:
+                pieces.append(self._get_encoded_key(key) + self.render(child))
+        return b'{%s}' % b','.join(pieces)
+
+    def _render_array(self, element):
+        return b'[%s]' % b','.join([self.render(child) for child in element.content])
+
+    def _render_duplicate(self, element):
+        return self.render(element.source_element)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Define the entry point for generating the mock payloads
+def _parse_size(text):
+    units = {'K': 1024, 'M': 1024 * 1024, 'G': 1024 * 1024 * 1024}
+    text = text.strip().upper()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='Generate a mock payload of an endpoint of the blueprint')
+    arg_parser.add_argument('blueprint', help='The blueprint (.apib)')
+    arg_parser.add_argument('endpoint', help='The endpoint as "METHOD /path", e.g. "GET /orders/{orderId}"')
+    arg_parser.add_argument('--status', type=int, default=None, help='Status code of the response (default: the first)')
+    arg_parser.add_argument('--request', action='store_true', help='Generate the request body instead of the response')
+    arg_parser.add_argument('--array-length', type=int, default=None, help='Number of the items of the outer arrays')
+    arg_parser.add_argument('--size', type=_parse_size, default=None, help='Target size of the payload, e.g. 64M')
+    arg_parser.add_argument('--seed', type=int, default=0, help='Seed of the random values (default: %(default)s)')
+    arg_parser.add_argument('-o', '--output', default=None, help='Path of the output (default: stdout)')
+    args = arg_parser.parse_args(argv)
+
+    from pre_commit_hook.blueprint import BlueprintReader
+    try:
+        endpoints = BlueprintReader().read_file(args.blueprint)
+    except ValueError as e:
+        print('Error: could not read the blueprint %s: %s' % (args.blueprint, e))
+        return -1
+
+    endpoint = dict((endpoint.name, endpoint) for endpoint in endpoints).get(args.endpoint)
+    if endpoint is None:
+        print('Error: could not find the endpoint %s' % args.endpoint)
+        return -1
+    if args.request:
+        element = endpoint.requests[0][1] if endpoint.requests else None
+    elif args.status is not None:
+        element = endpoint.get_response(args.status)
+    else:
+        element = next(iter(endpoint.responses.values()), None)
+    if element is None:
+        print('Error: no body documented for the endpoint %s' % args.endpoint)
+        return -1
+
+    generator = MockDataGenerator(args.seed)
+    if args.output is None:
+        generator.write(element, sys.stdout.buffer, args.array_length, args.size)
+    else:
+        with open(args.output, 'wb') as f:
+            generator.write(element, f, args.array_length, args.size)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,266 @@
+__author__ = 'Arsenal_49'
+
+# Serve the documented endpoints of a blueprint as a local mock server, for load-testing the clients against the
+# contract itself without the real service or the network.
+#
+# The server is a plain asyncio.Protocol speaking the minimal HTTP/1.1: keep-alive and pipelining, HEAD answered as GET
+# without the body, and the bodies of the requests are skipped. A body is only framed by its Content-Length, up to
+# _MAX_BODY_SIZE (413 otherwise), the requests with a Transfer-Encoding are answered with 501 and the connection is
+# closed, since the next request on it could not be found. The requests are resolved to the endpoints with the
+# RouteIndex of the url templates, and the responses are never serialized on the request path: each documented
+# response gets a pool of complete HTTP responses (the status line, the headers and a mock body from
+# MockDataGenerator) rendered when the server starts, which the requests cycle through.
+
+import argparse
+import asyncio
+import itertools
+import re
+import sys
+from http import HTTPStatus
+from pre_commit_hook.routes import RouteIndex
+from pre_commit_hook.mockdata import MockDataGenerator
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 3000
+DEFAULT_POOL_SIZE = 16  # the mock payloads of each response
+
+_MAX_RESOLVED_TARGETS = 4096  # the request targets kept with their resolved pools
+_MAX_HEAD_SIZE = 64 * 1024
+_MAX_BODY_SIZE = 1024 * 1024
+
+_content_length_search = re.compile(br'\r\ncontent-length:[ \t]*(\d+)', re.IGNORECASE).search
+_transfer_encoding_search = re.compile(br'\r\ntransfer-encoding:', re.IGNORECASE).search
+_connection_search = re.compile(br'\r\nconnection:[ \t]*(close|keep-alive)', re.IGNORECASE).search
+_prefer_status_search = re.compile(br'\r\nprefer:[^\r\n]*status=(\d{3})', re.IGNORECASE).search
+
+
+def _build_response(status, body, extra_headers=b''):
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = 'Unknown'
+    return b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n%s\r\n%s' % (
+        status, reason.encode('ascii'), len(body), extra_headers, body)
+
+
+_NOT_FOUND_RESPONSE = _build_response(404, b'{"message":"no documented endpoint"}')
+_BAD_REQUEST_RESPONSE = _build_response(400, b'{"message":"bad request"}', b'Connection: close\r\n')
+_TOO_LARGE_RESPONSE = _build_response(413, b'{"message":"request body too large"}', b'Connection: close\r\n')
+_NOT_IMPLEMENTED_RESPONSE = _build_response(501, b'{"message":"transfer encoding not supported"}',
+                                            b'Connection: close\r\n')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The responses of an endpoint
+# ----------------------------------------------------------------------------------------------------------------------
+class _EndpointResponses(object):
+    __slots__ = ('default', 'by_status')
+
+    def __init__(self, default, by_status):
+        self.default = default  # the pool of the default status, i.e. the first documented 2xx
+        self.by_status = by_status  # the pool of each documented status code
+
+    def get_pool(self, status=None):
+        if status is None:
+            return self.default
+        return self.by_status.get(status, self.default)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The mock server
+# ----------------------------------------------------------------------------------------------------------------------
+class MockServer(object):
+    """
+    Resolve the requests to the documented endpoints and answer them with the pre-rendered responses. A request picks
+    the status of its response with the header "Prefer: status=404", otherwise the first documented 2xx response is
+    served (200 with an empty body for an endpoint without any documented response body). A HEAD request is answered
+    with the headers of the response of GET.
+
+    # For the doctest:
+    >>> from pre_commit_hook.blueprint import BlueprintReader
+    >>> reader = BlueprintReader()
+    >>> reader.validate_lines(['# Group A', '## api [/a/{id}]', '### get [GET]', '+ Response 200',
+    ...                        '', '        {', '            "id": 1', '        }'])
+    (True, None)
+    >>> server = MockServer(reader.get_endpoints(), pool_size=2)
+    >>> server.get_response(b'GET', b'/a/7?verbose=1').split(b'\\r\\n')[0]
+    b'HTTP/1.1 200 OK'
+    >>> server.get_response(b'GET', b'/b').split(b'\\r\\n')[0]
+    b'HTTP/1.1 404 Not Found'
+    """
+
+    def __init__(self, endpoints, pool_size=DEFAULT_POOL_SIZE, seed=0, array_length=None):
+        assert pool_size > 0, 'The pool size should be positive'
+        self.endpoints = list(endpoints)
+        self._routes = RouteIndex()
+        self._responses = dict()  # the _EndpointResponses by the id of the endpoint
+        self._resolved = dict()  # the _EndpointResponses (or None) by (method, target)
+        generator = MockDataGenerator(seed)
+        for endpoint in self.endpoints:
+            if self._routes.get_endpoint(endpoint.method, endpoint.path) is not None:
+                continue  # the same route documented again, the first one is served
+            self._routes.add(endpoint)
+            self._responses[id(endpoint)] = self._build_responses(endpoint, generator, pool_size, array_length)
+
+    @staticmethod
+    def _build_responses(endpoint, generator, pool_size, array_length):
+        by_status = dict()
+        for status, element in endpoint.responses.items():
+            status = 200 if status is None else status
+            bodies = [b''.join(generator.iter_chunks(element, array_length)) for i in range(pool_size)]
+            by_status[status] = itertools.cycle([_build_response(status, body) for body in bodies])
+        if not by_status:
+            by_status[200] = itertools.cycle([_build_response(200, b'')])
+        successful = sorted(status for status in by_status if 200 <= status < 300)
+        return _EndpointResponses(by_status[successful[0] if successful else next(iter(by_status))], by_status)
+
+    # Serving Related: -------------------------------------------------------------------------------------------------
+    def get_response(self, method, target, status=None):
+        """
+        Return the bytes of the next response for the request target (the path with the query string).
+        """
+        key = (method, target)
+        responses = self._resolved.get(key, False)
+        if responses is False:
+            path = target.split(b'?', 1)[0].decode('latin-1')
+            route = self._routes.lookup(method.decode('latin-1'), path)
+            responses = None if route is None else self._responses[id(route[0])]
+            if len(self._resolved) >= _MAX_RESOLVED_TARGETS:
+                self._resolved.clear()
+            self._resolved[key] = responses
+        if responses is None:
+            return _NOT_FOUND_RESPONSE
+        return next(responses.get_pool(status))
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Start listening and return the asyncio server, e.g. with the port 0 and server.sockets[0].getsockname().
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.create_server(lambda: _MockProtocol(self), host, port, reuse_address=True)
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The connection
+# ----------------------------------------------------------------------------------------------------------------------
+class _MockProtocol(asyncio.Protocol):
+
+    def __init__(self, server):
+        self._server = server
+        self._transport = None
+        self._buffer = b''
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def connection_lost(self, exc):
+        self._transport = None
+
+    def data_received(self, data):
+        buffer = self._buffer + data if self._buffer else data
+        get_response = self._server.get_response
+        responses = list()
+        start, close = 0, False
+        while True:
+            end = buffer.find(b'\r\n\r\n', start)
+            if end < 0:
+                if len(buffer) - start > _MAX_HEAD_SIZE:
+                    responses.append(_BAD_REQUEST_RESPONSE)
+                    close = True
+                break
+            line_end = buffer.find(b'\r\n', start, end)
+            request_line = buffer[start:end if line_end < 0 else line_end]
+            parts = request_line.split(b' ')
+            if len(parts) != 3 or not parts[2].startswith(b'HTTP/1.'):
+                responses.append(_BAD_REQUEST_RESPONSE)
+                close = True
+                break
+            method, target, version = parts
+
+            status = None
+            body_end = end + 4
+            if line_end >= 0:
+                # Only the requests with the headers are searched for them:
+                head = buffer[line_end:end + 2]
+                if _transfer_encoding_search(head):
+                    responses.append(_NOT_IMPLEMENTED_RESPONSE)
+                    close = True
+                    break
+                content_length = _content_length_search(head)
+                if content_length:
+                    if int(content_length.group(1)) > _MAX_BODY_SIZE:
+                        responses.append(_TOO_LARGE_RESPONSE)
+                        close = True
+                        break
+                    body_end += int(content_length.group(1))
+                connection = _connection_search(head)
+                close = connection.group(1).lower() == b'close' if connection else version == b'HTTP/1.0'
+                prefer = _prefer_status_search(head)
+                if prefer:
+                    status = int(prefer.group(1))
+            else:
+                close = version == b'HTTP/1.0'
+            if body_end > len(buffer):
+                close = False
+                break  # wait for the rest of the body
+            if method == b'HEAD':
+                response = get_response(b'GET', target, status)
+                responses.append(response[:response.find(b'\r\n\r\n') + 4])
+            else:
+                responses.append(get_response(method, target, status))
+            start = body_end
+            if close:
+                break
+
+        self._buffer = b'' if close else buffer[start:]
+        if responses:
+            self._transport.write(b''.join(responses) if len(responses) > 1 else responses[0])
+        if close:
+            self._transport.close()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Define the entry point for serving the mock endpoints
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='Serve the documented endpoints of the blueprint with mock data')
+    arg_parser.add_argument('blueprint', help='The blueprint (.apib)')
+    arg_parser.add_argument('--host', default=DEFAULT_HOST, help='Host to listen on (default: %(default)s)')
+    arg_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on (default: %(default)s)')
+    arg_parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                            help='Number of the mock payloads of each response (default: %(default)s)')
+    arg_parser.add_argument('--array-length', type=int, default=None, help='Number of the items of the outer arrays')
+    arg_parser.add_argument('--seed', type=int, default=0, help='Seed of the mock payloads (default: %(default)s)')
+    arg_parser.add_argument('--schema-cache', nargs='?', const='', default=None, metavar='DIRECTORY',
+                            help='Keep the parsed schemas of the blueprint in the directory (default: '
+                                 '.cache/pre-commit-apiary/schemas)')
+    args = arg_parser.parse_args(argv)
+
+    try:
+        if args.schema_cache is None:
+            from pre_commit_hook.blueprint import BlueprintReader
+            endpoints = BlueprintReader().read_file(args.blueprint)
+        else:
+            from pre_commit_hook.schema_cache import read_endpoints, DEFAULT_SCHEMA_DIRECTORY
+            endpoints = read_endpoints(args.blueprint, args.schema_cache or DEFAULT_SCHEMA_DIRECTORY)
+    except ValueError as e:
+        print('Error: could not read the blueprint %s: %s' % (args.blueprint, e))
+        return -1
+
+    server = MockServer(endpoints, args.pool_size, args.seed, args.array_length)
+    print('serving %d endpoint(s) of %s on http://%s:%d' % (len(server._responses), args.blueprint, args.host,
+                                                             args.port))
+    sys.stdout.flush()
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
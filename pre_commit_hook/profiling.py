@@ -0,0 +1,289 @@
+__author__ = 'Arsenal_49'
+
+# Time the validation of a blueprint, for finding where the seconds of a slow document go: the lines read by the
+# validator, the lines scanned by the decoder, and the merges of the element trees in ApiContentArrayElement.add_element.
+#
+# Nothing of the validation pipeline checks whether it is profiled. profile_validation wraps the methods only while
+# profiling: the _read_line and _read_code_block of the validator instance, and ApiDecoder.scan_line,
+# ApiDecoder.decode_block and ApiContentArrayElement.add_element on their classes, which are restored at the end. Without it the validator runs
+# the same code as before, so the profiling costs nothing when it is disabled.
+
+import contextlib
+import heapq
+import re
+import time
+from pre_commit_hook.apiary import _classify_line, _api_method
+from pre_commit_hook.apiary import _line_group_title, _line_api_title, _line_api_method
+from pre_commit_hook.apiary import _line_request_title, _line_response_title
+from pre_commit_hook.apiary import _state_init, _state_read_group_title, _state_read_api_title
+from pre_commit_hook.apiary import _state_read_api_method, _state_read_param_tag
+from pre_commit_hook.apiary import _state_read_request_tag, _state_read_response_tag, _state_error
+
+DEFAULT_TOP = 10
+
+_STATE_NAMES = {
+    _state_init: 'init',
+    _state_read_group_title: 'read group title',
+    _state_read_api_title: 'read api title',
+    _state_read_api_method: 'read api method',
+    _state_read_param_tag: 'read parameters',
+    _state_read_request_tag: 'read request block',
+    _state_read_response_tag: 'read response block',
+    _state_error: 'error',
+}
+_SECTION_KINDS = ('group', 'endpoint', 'request', 'response')
+_header_lines = _line_group_title | _line_api_title | _line_api_method | _line_request_title | _line_response_title
+_url_search = re.compile(r'\[(\/.+)\]').search
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The hooks
+# ----------------------------------------------------------------------------------------------------------------------
+class ValidationHooks(object):
+    """
+    The interface called by the profiled validation (see profile_validation), all the methods do nothing by default.
+    The times are in seconds, and the line counts are the numbers of the lines in the document.
+    """
+
+    def on_line(self, line_count, line, state, next_state, seconds):
+        """
+        Called after the validator read the line in the state, with the state after the line and the time of
+        _read_line, including the decoder.
+        """
+
+    def on_code_block(self, line_count, lines, state, read, seconds):
+        """
+        Called after the validator tried to read the lines of a code block at once in the state, from the line count
+        (see ApiaryValidator._read_code_block), with the time including the decoder. If the block was not read, its
+        lines are read one by one with on_line afterwards.
+        """
+
+    def on_decode(self, line_count, seconds):
+        """
+        Called after ApiDecoder.scan_line scanned the line of a code block or ApiDecoder.decode_block parsed a whole
+        block, with its time including the merges.
+        """
+
+    def on_merge(self, line_count, seconds):
+        """
+        Called after an element was added to an array while scanning the line, with the time of
+        ApiContentArrayElement.add_element including the merge of the dictionaries.
+        """
+
+
+@contextlib.contextmanager
+def profile_validation(validator, hooks):
+    """
+    Call the hooks for the lines validated by the validator (an ApiaryValidator) within the context.
+
+    # For the doctest:
+    >>> from pre_commit_hook.apiary import ApiaryValidator
+    >>> class LineCounter(ValidationHooks):
+    ...     lines = list()
+    ...     def on_line(self, line_count, line, state, next_state, seconds):
+    ...         self.lines.append((line_count, _STATE_NAMES[next_state]))
+    >>> validator, counter = ApiaryValidator(), LineCounter()
+    >>> with profile_validation(validator, counter):
+    ...     validator.validate_lines(['# Group A', '## api [/a]', '### get [GET]'])
+    (True, None)
+    >>> counter.lines
+    [(1, 'read group title'), (2, 'read api title'), (3, 'read api method')]
+    """
+    from pre_commit_hook.decoder import ApiDecoder
+    from pre_commit_hook.api.ApiContentElement import ApiContentArrayElement
+
+    timer = time.perf_counter
+    position = {'depth': 0}
+    read_line = validator._read_line
+    read_code_block = validator._read_code_block
+    scan_line = ApiDecoder.scan_line
+    decode_block = ApiDecoder.decode_block
+    add_element = ApiContentArrayElement.add_element
+
+    def _read_line(line):
+        state = validator.state
+        start_time = timer()
+        try:
+            return read_line(line)
+        finally:
+            hooks.on_line(validator._line_count, line, state, validator.state, timer() - start_time)
+
+    def _read_code_block(lines):
+        state = validator.state
+        start_time = timer()
+        read = False
+        try:
+            read = read_code_block(lines)
+            return read
+        finally:
+            hooks.on_code_block(validator._line_count, lines, state, read, timer() - start_time)
+
+    def _scan_line(decoder, line):
+        start_time = timer()
+        try:
+            return scan_line(decoder, line)
+        finally:
+            hooks.on_decode(validator._line_count, timer() - start_time)
+
+    def _decode_block(decoder, lines):
+        start_time = timer()
+        try:
+            return decode_block(decoder, lines)
+        finally:
+            hooks.on_decode(validator._line_count, timer() - start_time)
+
+    def _add_element(array, element, key=None):
+        # Only the outermost call is timed, the merges add the elements of the nested arrays again:
+        if position['depth']:
+            return add_element(array, element, key)
+        position['depth'] += 1
+        start_time = timer()
+        try:
+            return add_element(array, element, key)
+        finally:
+            position['depth'] -= 1
+            hooks.on_merge(validator._line_count, timer() - start_time)
+
+    validator._read_line = _read_line
+    validator._read_code_block = _read_code_block
+    ApiDecoder.scan_line = _scan_line
+    ApiDecoder.decode_block = _decode_block
+    ApiContentArrayElement.add_element = _add_element
+    try:
+        yield validator
+    finally:
+        ApiDecoder.scan_line = scan_line
+        ApiDecoder.decode_block = decode_block
+        ApiContentArrayElement.add_element = add_element
+        del validator._read_line, validator._read_code_block
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The profiler
+# ----------------------------------------------------------------------------------------------------------------------
+class Profiler(ValidationHooks):
+    """
+    Sum the time of the lines by the validator state, and by the sections of the document: the group, the endpoint
+    (the method with the url of its resource) and the request or response code block around the line. The top slowest
+    lines and code blocks are kept.
+    """
+
+    def __init__(self, top=DEFAULT_TOP):
+        self.top = top
+        self.line_count = 0
+        self.read_time = 0.0
+        self.decode_time = 0.0
+        self.merge_time = 0.0
+        self.merge_count = 0
+        self.state_times = dict()  # the seconds of the lines by the state they were read in
+        self.section_times = dict((kind, dict()) for kind in _SECTION_KINDS)  # the seconds by the section title
+        self.blocks = list()  # the [seconds, kind, title, first line, last line] of the code blocks
+        self._slowest_lines = list()  # the heap of the (seconds, line count, line) of the slowest lines
+        self._group = None
+        self._resource = None
+        self._endpoint = None
+        self._block = None
+
+    # Hooks Related: ---------------------------------------------------------------------------------------------------
+    def on_line(self, line_count, line, state, next_state, seconds):
+        self.line_count += 1
+        self.read_time += seconds
+        self.state_times[state] = self.state_times.get(state, 0.0) + seconds
+        if len(self._slowest_lines) < self.top:
+            heapq.heappush(self._slowest_lines, (seconds, line_count, line.rstrip()))
+        elif self._slowest_lines and seconds > self._slowest_lines[0][0]:
+            heapq.heapreplace(self._slowest_lines, (seconds, line_count, line.rstrip()))
+
+        kinds = _classify_line(line) if line[:1] in '#+' else 0
+        if kinds & _header_lines:
+            self._update_section(kinds, line, line_count, next_state)
+
+        for kind, title in [('group', self._group), ('endpoint', self._endpoint)]:
+            if title is not None:
+                self.section_times[kind][title] = self.section_times[kind].get(title, 0.0) + seconds
+        if self._block is not None:
+            self._block[0] += seconds
+            self._block[4] = line_count
+            times = self.section_times[self._block[1]]
+            times[self._block[2]] = times.get(self._block[2], 0.0) + seconds
+
+    def on_code_block(self, line_count, lines, state, read, seconds):
+        # The block is within the sections of the last line read:
+        if read:
+            self.line_count += len(lines)
+        self.read_time += seconds
+        self.state_times[state] = self.state_times.get(state, 0.0) + seconds
+        for kind, title in [('group', self._group), ('endpoint', self._endpoint)]:
+            if title is not None:
+                self.section_times[kind][title] = self.section_times[kind].get(title, 0.0) + seconds
+        if self._block is not None:
+            self._block[0] += seconds
+            if read:
+                self._block[4] = line_count + len(lines) - 1
+            times = self.section_times[self._block[1]]
+            times[self._block[2]] = times.get(self._block[2], 0.0) + seconds
+
+    def on_decode(self, line_count, seconds):
+        self.decode_time += seconds
+
+    def on_merge(self, line_count, seconds):
+        self.merge_time += seconds
+        self.merge_count += 1
+
+    def _update_section(self, kinds, line, line_count, next_state):
+        self._block = None
+        if kinds & _line_group_title and next_state == _state_read_group_title:
+            self._group = line.lstrip('#').strip()
+            self._resource = self._endpoint = None
+        elif kinds & _line_api_title and next_state == _state_read_api_title:
+            url = _url_search(line.rstrip())
+            self._resource = url.group(1).split('{?')[0] if url else line.strip()
+            self._endpoint = None
+        elif kinds & _line_api_method and next_state == _state_read_api_method:
+            self._endpoint = '%s %s' % (_api_method(line).group(1), self._resource)
+        elif kinds & (_line_request_title | _line_response_title) and \
+                next_state in (_state_read_request_tag, _state_read_response_tag):
+            kind = 'request' if next_state == _state_read_request_tag else 'response'
+            title = '%s %s' % (self._endpoint, line.strip().lstrip('+ '))
+            self._block = [0.0, kind, title, line_count, line_count]
+            self.blocks.append(self._block)
+
+    # Report Related: --------------------------------------------------------------------------------------------------
+    def get_slowest_lines(self):
+        """
+        Return the (seconds, line count, line) of the top slowest lines, the slowest first.
+        """
+        return sorted(self._slowest_lines, reverse=True)
+
+    def get_slowest_blocks(self):
+        """
+        Return the (seconds, kind, title, first line, last line) of the top slowest code blocks, the slowest first.
+        """
+        return [tuple(block) for block in heapq.nlargest(self.top, self.blocks, key=lambda block: block[0])]
+
+    def print_report(self):
+        total = self.read_time or 1e-12
+        print('profiled %d line(s) in %.4fs: validator %.4fs, decoder.scan_line %.4fs, add_element %.4fs '
+              '(%d call(s))' % (self.line_count, self.read_time, self.read_time - self.decode_time,
+                                self.decode_time - self.merge_time, self.merge_time, self.merge_count))
+        print('time by validator state:')
+        for state, seconds in sorted(self.state_times.items(), key=lambda item: -item[1]):
+            print('    %10.4fs %5.1f%%  %s' % (seconds, 100.0 * seconds / total, _STATE_NAMES.get(state, state)))
+        print('time by section:')
+        for kind in _SECTION_KINDS:
+            times = self.section_times[kind]
+            seconds = sum(times.values())
+            print('    %10.4fs %5.1f%%  %d %s(s)' % (seconds, 100.0 * seconds / total, len(times), kind))
+        for kind in ('group', 'endpoint'):
+            times = self.section_times[kind]
+            if times:
+                print('slowest %ss:' % kind)
+                for title, seconds in heapq.nlargest(self.top, times.items(), key=lambda item: item[1]):
+                    print('    %10.4fs  %s' % (seconds, title))
+        if self.blocks:
+            print('slowest code blocks:')
+            for seconds, kind, title, first_line, last_line in self.get_slowest_blocks():
+                print('    %10.4fs  lines %d-%d  %s: %s' % (seconds, first_line, last_line, kind, title))
+        print('slowest lines:')
+        for seconds, line_count, line in self.get_slowest_lines():
+            print('    %10.6fs  line %d: %s' % (seconds, line_count, line.strip()[:80]))
@@ -0,0 +1,157 @@
+__author__ = 'Arsenal_49'
+
+# The index of the endpoints by the method and the url template, for resolving a concrete request path to its endpoint.
+#
+# The templates are split into the path segments and kept in one trie per method. A static segment is a key of the
+# dict of the children, a {param} segment is the single parameter child of the node, and a segment mixing the text
+# with the parameters (e.g. /files/{name}.{ext}) is matched by a regex. A lookup walks the segments of the path once,
+# trying the static child first, so its time depends on the length of the path and not on the number of endpoints;
+# it only backtracks to a parameter child when the static branch below has no match.
+
+import re
+
+_param_segment = re.compile(r'^\{([^{}/?]+)\}$').match
+_param_in_segment = re.compile(r'\{([^{}/?]+)\}')
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The node of the trie:
+# ----------------------------------------------------------------------------------------------------------------------
+class _RouteNode(object):
+    __slots__ = ('children', 'param_child', 'patterns', 'endpoint', 'param_names')
+
+    def __init__(self):
+        self.children = dict()  # the child of each static segment
+        self.param_child = None  # the child of the {param} segments
+        self.patterns = list()  # the (pattern, match, child) of the segments mixing the text and the parameters
+        self.endpoint = None
+        self.param_names = None  # the names of the parameters captured along the path of the endpoint
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The index of the routes
+# ----------------------------------------------------------------------------------------------------------------------
+class RouteIndex(object):
+    """
+    Resolve (method, path) to the endpoint documented with the matching url template, and the captured parameters.
+
+    # For the doctest:
+    >>> from pre_commit_hook.blueprint import ApiEndpoint
+    >>> index = RouteIndex([ApiEndpoint('GET', '/orders/{orderId}{?sessionKey}'), ApiEndpoint('GET', '/orders/new'),
+    ...                     ApiEndpoint('GET', '/files/{name}.{ext}')])
+    >>> index.lookup('GET', '/orders/T001')
+    (ApiEndpoint(GET /orders/{orderId}{?sessionKey}), {'orderId': 'T001'})
+    >>> index.lookup('GET', '/orders/new')
+    (ApiEndpoint(GET /orders/new), {})
+    >>> index.lookup('GET', '/files/report.pdf')
+    (ApiEndpoint(GET /files/{name}.{ext}), {'name': 'report', 'ext': 'pdf'})
+    >>> index.lookup('POST', '/orders/T001') is None
+    True
+    """
+
+    def __init__(self, endpoints=None):
+        self._roots = dict()  # the root node of each method
+        self._count = 0
+        for endpoint in endpoints or []:
+            self.add(endpoint)
+
+    def __len__(self):
+        return self._count
+
+    def add(self, endpoint, method=None, path=None):
+        """
+        Index the endpoint by its method and path (see ApiEndpoint.path), the first endpoint added for a template wins.
+        """
+        method = (method or endpoint.method).upper()
+        path = endpoint.path if path is None else path
+        node = self._roots.get(method)
+        if node is None:
+            node = self._roots[method] = _RouteNode()
+
+        names = list()
+        for segment in path.split('/'):
+            param = _param_segment(segment)
+            if param:
+                names.append(param.group(1))
+                if node.param_child is None:
+                    node.param_child = _RouteNode()
+                node = node.param_child
+            elif '{' in segment:
+                node = self._add_pattern(node, segment, names)
+            else:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _RouteNode()
+                node = child
+
+        if node.endpoint is None:
+            node.endpoint = endpoint
+            node.param_names = tuple(names)
+            self._count += 1
+
+    @staticmethod
+    def _add_pattern(node, segment, names):
+        parts = _param_in_segment.split(segment)  # the text and the names of the parameters, alternately
+        pattern = ''.join(re.escape(part) if i % 2 == 0 else '([^/]+?)' for i, part in enumerate(parts)) + '$'
+        names.extend(parts[1::2])
+        for other_pattern, match, child in node.patterns:
+            if other_pattern == pattern:
+                return child
+        child = _RouteNode()
+        node.patterns.append((pattern, re.compile(pattern).match, child))
+        return child
+
+    def lookup(self, method, path):
+        """
+        Return the (endpoint, parameters) of the route matching the path without the query string, or None.
+        """
+        node = self._roots.get(method.upper())
+        if node is None:
+            return None
+        segments = path.split('/')
+        result = self._lookup(node, segments, 0, list())
+        if result is None:
+            return None
+        endpoint, names, values = result
+        return endpoint, dict(zip(names, values))
+
+    def get_endpoint(self, method, path):
+        result = self.lookup(method, path)
+        return None if result is None else result[0]
+
+    def _lookup(self, node, segments, index, values):
+        # Follow the static segments iteratively, and only branch at the nodes with the parameter children:
+        count = len(segments)
+        while index < count:
+            segment = segments[index]
+            child = node.children.get(segment)
+            if node.param_child is None and not node.patterns:
+                if child is None:
+                    return None
+                node = child
+                index += 1
+                continue
+
+            if child is not None:
+                result = self._lookup(child, segments, index + 1, values)
+                if result is not None:
+                    return result
+            if node.param_child is not None and segment:
+                values.append(segment)
+                result = self._lookup(node.param_child, segments, index + 1, values)
+                if result is not None:
+                    return result
+                values.pop()
+            for pattern, match, pattern_child in node.patterns:
+                matched = match(segment)
+                if matched:
+                    values.extend(matched.groups())
+                    result = self._lookup(pattern_child, segments, index + 1, values)
+                    if result is not None:
+                        return result
+                    del values[len(values) - len(matched.groups()):]
+            return None
+
+        if node.endpoint is None:
+            return None
+        return node.endpoint, node.param_names, list(values)
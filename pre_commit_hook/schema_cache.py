@@ -0,0 +1,212 @@
+__author__ = 'Arsenal_49'
+
+# The serialized form of the endpoints parsed from a blueprint (see blueprint.BlueprintReader), so the tools which need
+# the element trees of the requests and responses could load them instead of validating and decoding the blueprint
+# again.
+#
+# The file is a header line with the digest of the sources (see cache.get_source_digest), the sha256 of the blueprint
+# content and the marshal dump of the endpoints. The element
+# trees are flattened into one table of nodes, and the children, the parents and the duplicate sources refer to the
+# nodes by their index, so the shared sub-trees stay shared after the loading:
+#   node:     (class index, type value, required, default, parent index, key in the parent, children)
+#   endpoint: (method, url, parameters, group, line_count, ((name, node index), ...), ((status, node index), ...),
+#              ((parameter, type, required), ...))
+# The children are ((key, node index), ...) for a dictionary, (node index, ...) for an array and the node index of the
+# source for a duplicate. marshal only loads the plain values, never an object of any other type.
+
+import hashlib
+import marshal
+import os
+import tempfile
+from sys import intern
+from pre_commit_hook.cache import get_source_digest
+from pre_commit_hook.blueprint import ApiEndpoint, BlueprintReader
+from pre_commit_hook.api.ApiContentElement import ApiContentElement, ApiContentDuplicateElement
+from pre_commit_hook.api.ApiContentElement import ApiContentStringElement, ApiContentUrlElement
+from pre_commit_hook.api.ApiContentElement import ApiContentNumberElement, ApiContentTimestampElement
+from pre_commit_hook.api.ApiContentElement import ApiContentBooleanElement
+from pre_commit_hook.api.ApiContentElement import ApiContentArrayElement, ApiContentDictionaryElement
+
+DEFAULT_SCHEMA_DIRECTORY = os.path.join('.cache', 'pre-commit-apiary', 'schemas')
+
+_SCHEMA_FORMAT = 3
+_SCHEMA_SUFFIX = '.schema'
+_HEADER = ('pre-commit-apiary-schema %d %s %d\n' % (_SCHEMA_FORMAT, get_source_digest(),
+                                                   marshal.version)).encode('utf-8')
+
+# The element classes by their index in the serialized nodes, the order should never change without bumping the format:
+_ELEMENT_CLASSES = (ApiContentDuplicateElement, ApiContentStringElement, ApiContentUrlElement,
+                    ApiContentNumberElement, ApiContentTimestampElement, ApiContentBooleanElement,
+                    ApiContentArrayElement, ApiContentDictionaryElement)
+_CLASS_INDEXES = dict((cls, index) for index, cls in enumerate(_ELEMENT_CLASSES))
+_DUPLICATE_INDEX = _CLASS_INDEXES[ApiContentDuplicateElement]
+_ARRAY_INDEX = _CLASS_INDEXES[ApiContentArrayElement]
+_DICTIONARY_INDEX = _CLASS_INDEXES[ApiContentDictionaryElement]
+_TYPES = dict((element_type.value, element_type) for element_type in ApiContentElement.Type)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Dump and load the endpoints:
+# ----------------------------------------------------------------------------------------------------------------------
+def dump_endpoints(endpoints, content_hash=''):
+    """
+    Serialize the endpoints with their element trees, the content hash is the sha256 of the blueprint.
+    """
+    nodes = list()
+    indexes = dict()  # the index of the node by the id of the element
+
+    def _add_element(element):
+        index = indexes.get(id(element))
+        if index is not None:
+            return index
+        index = indexes[id(element)] = len(nodes)
+        nodes.append(None)
+
+        class_index = _CLASS_INDEXES[type(element)]
+        if class_index == _DUPLICATE_INDEX:
+            children = _add_element(element.source_element)
+        elif class_index == _ARRAY_INDEX:
+            children = tuple(_add_element(child) for child in element.content)
+        elif class_index == _DICTIONARY_INDEX:
+            children = tuple((key, _add_element(child)) for key, child in element.content.items())
+        else:
+            children = None
+        parent = element._parent
+        parent_index = -1 if parent is None else _add_element(parent)
+        nodes[index] = (class_index, element.type.value, element.required, element.default, parent_index, element._key,
+                        children)
+        return index
+
+    dumped_endpoints = list()
+    for endpoint in endpoints:
+        requests = tuple((name, _add_element(element)) for name, element in endpoint.requests)
+        responses = tuple((status, _add_element(element)) for status, element in endpoint.responses.items())
+        parameter_types = tuple((name, type_string, required)
+                                for name, (type_string, required) in endpoint.parameter_types.items())
+        dumped_endpoints.append((endpoint.method, endpoint.url, tuple(endpoint.parameters), endpoint.group,
+                                 endpoint.line_count, requests, responses, parameter_types))
+
+    return b''.join([_HEADER, content_hash.encode('ascii'), b'\n',
+                     marshal.dumps((tuple(nodes), tuple(dumped_endpoints)))])
+
+
+def load_endpoints(data, content_hash=None):
+    """
+    Rebuild the endpoints from the data of dump_endpoints, return None if the data is in another format or, when the
+    content hash is given, was dumped from another content.
+
+    # For the doctest:
+    >>> reader = BlueprintReader()
+    >>> reader.validate_lines(['# Group A', '## api [/a/{id}]', '### get [GET]', '+ Response 200',
+    ...                        '', '        {', '            "id": 1', '        }'])
+    (True, None)
+    >>> endpoint = load_endpoints(dump_endpoints(reader.get_endpoints(), 'abc'), 'abc')[0]
+    >>> endpoint.name, str(endpoint.get_response(200))
+    ('GET /a/{id}', '{\\n\\tid: (number, required: True)\\n}')
+    >>> load_endpoints(dump_endpoints(reader.get_endpoints(), 'abc'), 'def') is None
+    True
+    """
+    if not data.startswith(_HEADER):
+        return None
+    index = data.find(b'\n', len(_HEADER))
+    if index < 0:
+        return None
+    if content_hash is not None and data[len(_HEADER):index].decode('ascii', 'replace') != content_hash:
+        return None
+    try:
+        nodes, dumped_endpoints = marshal.loads(data[index + 1:])
+        elements = _load_elements(nodes)
+    except (ValueError, EOFError, TypeError, IndexError, KeyError):
+        return None
+
+    endpoints = list()
+    for method, url, parameters, group, line_count, requests, responses, parameter_types in dumped_endpoints:
+        endpoint = ApiEndpoint(method, url, parameters, group, line_count)
+        endpoint.parameter_types = dict((name, (type_string, required))
+                                        for name, type_string, required in parameter_types)
+        endpoint.requests = [(name, elements[node_index]) for name, node_index in requests]
+        endpoint.responses = dict((status, elements[node_index]) for status, node_index in responses)
+        endpoints.append(endpoint)
+    return endpoints
+
+
+def _load_elements(nodes):
+    # The elements are created without calling __init__, all the attributes are set from the nodes:
+    elements = [_ELEMENT_CLASSES[node[0]].__new__(_ELEMENT_CLASSES[node[0]]) for node in nodes]
+    for element, (class_index, type_value, required, default, parent_index, key, children) in zip(elements, nodes):
+        element.type = _TYPES[type_value]
+        element._required = required
+        element._fingerprints = None
+        element.default = default
+        element._parent = None if parent_index < 0 else elements[parent_index]
+        element._key = key if key is None or isinstance(key, int) else intern(key)
+        element._compiled_validator = None
+        if class_index == _DICTIONARY_INDEX:
+            element.content = dict((intern(key), elements[child]) for key, child in children)
+            element._required_key_set = None  # built on the first use of required_keys
+            element._required_keys = None
+        elif class_index == _ARRAY_INDEX:
+            element.content = [elements[child] for child in children]
+        else:
+            element.content = None
+            if class_index == _DUPLICATE_INDEX:
+                element.source_element = elements[children]
+    return elements
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The cache of the endpoints of the blueprints
+# ----------------------------------------------------------------------------------------------------------------------
+def get_schema_path(file, directory=None, content_hash=''):
+    """
+    Return the path of the serialized schemas of the blueprint: next to the blueprint without the directory, or in the
+    directory keyed by the hash of the content of the blueprint.
+
+    # For the doctest:
+    >>> get_schema_path(os.path.join('docs', 'api.apib'))
+    'docs/.api.apib.schema'
+    >>> get_schema_path(os.path.join('docs', 'api.apib'), 'cache', 'abc')
+    'cache/abc.schema'
+    """
+    if directory is None:
+        head, tail = os.path.split(file)
+        return os.path.join(head, '.%s%s' % (tail, _SCHEMA_SUFFIX))
+    return os.path.join(directory, content_hash + _SCHEMA_SUFFIX)
+
+
+def read_endpoints(file, directory=DEFAULT_SCHEMA_DIRECTORY):
+    """
+    Return the endpoints of the blueprint, loaded from the serialized schemas when they were dumped from the same
+    content, or read from the blueprint and dumped for the next time. Raise ValueError if the blueprint is not valid.
+    The schemas are kept in the directory (by default in the working directory, like the cache of the validation
+    results), or next to the blueprint as a hidden file with the directory None.
+    """
+    with open(file, 'rb') as f:
+        content = f.read()
+    content_hash = hashlib.sha256(content).hexdigest()
+    path = get_schema_path(file, directory, content_hash)
+    try:
+        with open(path, 'rb') as f:
+            endpoints = load_endpoints(f.read(), content_hash)
+        if endpoints is not None:
+            return endpoints
+    except OSError:
+        pass
+
+    endpoints = BlueprintReader().read_stream(content)
+    temp_path = None
+    try:
+        schema_directory = os.path.dirname(path) or '.'
+        os.makedirs(schema_directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=schema_directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dump_endpoints(endpoints, content_hash))
+        os.replace(temp_path, path)
+    except OSError:
+        # The cache is only an optimization, never fail the reading because of it
+        if temp_path is not None:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+    return endpoints
@@ -0,0 +1,320 @@
+__author__ = 'Arsenal_49'
+
+# Check the recorded traffic against the response schemas of the blueprint. The traffic log is newline-delimited JSON,
+# one exchange per line, e.g. {"method": "GET", "path": "/orders/1?sessionKey=abc", "status": 200, "body": {...}}.
+#
+# The blueprint is parsed once, and the log is validated by a pool of processes forked after the parsing, so the
+# workers inherit the schemas and their compiled validators instead of receiving them through pickling. A plain log is
+# mapped into the memory and split into line-aligned byte ranges which the workers read by themselves, a gzip or xz
+# log is decompressed by the main process and sent to the workers in line-aligned blocks.
+
+import argparse
+import collections
+import json
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from urllib.parse import urlsplit
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.routes import RouteIndex
+from pre_commit_hook.api.ApiContentCompiler import get_compiled_validator
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_FIELDS = {'method': 'method', 'path': 'path', 'status': 'status', 'body': 'body'}
+
+# The counters of the report, besides the mismatches:
+_COUNTERS = ['records', 'valid', 'mismatched', 'unknown_route', 'undocumented_status', 'invalid_line']
+
+# The state inherited by the forked workers, see TrafficValidator.validate_files:
+_worker_validator = None
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The report of the validation
+# ----------------------------------------------------------------------------------------------------------------------
+class TrafficReport(object):
+    """
+    The counts of the records, and the counts of the mismatches by (endpoint, key path, kind of the error).
+    """
+
+    def __init__(self):
+        self.counts = dict((name, 0) for name in _COUNTERS)
+        self.mismatches = collections.Counter()
+        self.byte_count = 0
+
+    def merge(self, other):
+        for name in _COUNTERS:
+            self.counts[name] += other.counts[name]
+        self.mismatches.update(other.mismatches)
+        self.byte_count += other.byte_count
+
+    def get_mismatches(self):
+        """
+        Return the ((endpoint, key path, kind), count) of the mismatches, the most common first. The ties are sorted by
+        the keys, since the workers merge their reports in any order.
+        """
+        return sorted(self.mismatches.items(), key=lambda item: (-item[1], tuple(str(key) for key in item[0])))
+
+    def to_dict(self):
+        result = dict(self.counts)
+        result['bytes'] = self.byte_count
+        result['mismatches'] = [{'endpoint': endpoint, 'key_path': key_path, 'kind': kind, 'count': count}
+                                for (endpoint, key_path, kind), count in self.get_mismatches()]
+        return result
+
+    def print_report(self, elapsed=None):
+        counts = self.counts
+        rate = ''
+        if elapsed:
+            rate = ' in %.1fs (%.1f MB/s)' % (elapsed, self.byte_count / elapsed / 1e6)
+        print('checked %d record(s)%s: %d valid, %d mismatched, %d unknown route, %d undocumented status, '
+              '%d invalid line' % (counts['records'], rate, counts['valid'], counts['mismatched'],
+                                   counts['unknown_route'], counts['undocumented_status'], counts['invalid_line']))
+        if self.mismatches:
+            print('mismatches by endpoint and key path:')
+            for (endpoint, key_path, kind), count in self.get_mismatches():
+                print('%10d  %s  %s  (%s)' % (count, endpoint, key_path, kind))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The validator of the traffic records
+# ----------------------------------------------------------------------------------------------------------------------
+class TrafficValidator(object):
+
+    def __init__(self, endpoints, fields=None):
+        self.fields = dict(DEFAULT_FIELDS)
+        self.fields.update(fields or {})
+        self._routes = RouteIndex(endpoints)
+        for endpoint in endpoints:
+            # Compiled before forking the workers, so that they share the compiled validators:
+            for element in endpoint.responses.values():
+                get_compiled_validator(element)
+
+    @classmethod
+    def from_blueprint(cls, file, fields=None, schema_cache=None):
+        """
+        Read the endpoints of the blueprint, through the serialized schemas (see schema_cache.read_endpoints) with the
+        schema cache, which is the cache directory or '' for the default one.
+        """
+        if schema_cache is None:
+            return cls(BlueprintReader().read_file(file), fields)
+        from pre_commit_hook.schema_cache import read_endpoints, DEFAULT_SCHEMA_DIRECTORY
+        return cls(read_endpoints(file, schema_cache or DEFAULT_SCHEMA_DIRECTORY), fields)
+
+    def get_endpoint(self, method, path):
+        return self._routes.get_endpoint(method, path)
+
+    # Validation Related: ----------------------------------------------------------------------------------------------
+    def validate_record(self, record, report):
+        report.counts['records'] += 1
+        try:
+            method = str(record[self.fields['method']]).upper()
+            path = urlsplit(str(record[self.fields['path']])).path
+            status = record.get(self.fields['status'])
+            body = record.get(self.fields['body'])
+            if isinstance(body, str):
+                body = json.loads(body)
+        except (KeyError, TypeError, AttributeError, ValueError):
+            report.counts['invalid_line'] += 1
+            return
+
+        endpoint = self.get_endpoint(method, path)
+        if endpoint is None:
+            report.counts['unknown_route'] += 1
+            return
+        response = endpoint.get_response(status)
+        if response is None:
+            report.counts['undocumented_status'] += 1
+            report.mismatches[(endpoint.name, '-', 'status %s' % status)] += 1
+            return
+
+        try:
+            get_compiled_validator(response)(body)
+        except AssertionError:
+            kind, key_path = 'AssertionError', '?'
+        except Exception as e:
+            kind, key_path = type(e).__name__, getattr(e, 'user_info', {}).get('key_path', '?')
+        else:
+            report.counts['valid'] += 1
+            return
+        report.counts['mismatched'] += 1
+        report.mismatches[(endpoint.name, str(key_path), kind)] += 1
+
+    def validate_lines(self, lines, report=None):
+        report = report or TrafficReport()
+        for line in lines:
+            report.byte_count += len(line) + 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                report.counts['records'] += 1
+                report.counts['invalid_line'] += 1
+                continue
+            if not isinstance(record, dict):
+                report.counts['records'] += 1
+                report.counts['invalid_line'] += 1
+                continue
+            self.validate_record(record, report)
+        return report
+
+    def validate_range(self, file, start, end):
+        """
+        Validate the lines in the byte range of the plain file, the range should be line-aligned.
+        """
+        with open(file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return self.validate_lines(_iterate_lines(buffer, start, end))
+
+    # File Related: ----------------------------------------------------------------------------------------------------
+    def validate_files(self, files, jobs=1, chunk_size=DEFAULT_CHUNK_SIZE):
+        global _worker_validator
+
+        report = TrafficReport()
+        pool = None
+        if jobs > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            _worker_validator = self
+            pool = multiprocessing.get_context('fork').Pool(processes=jobs)
+        try:
+            for file in files:
+                if _get_opener(file) is None:
+                    self._validate_plain_file(file, report, pool, jobs, chunk_size)
+                else:
+                    self._validate_compressed_file(file, report, pool, jobs, chunk_size)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            _worker_validator = None
+        return report
+
+    def _validate_plain_file(self, file, report, pool, jobs, chunk_size):
+        size = os.path.getsize(file)
+        if size == 0:
+            return
+        with open(file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            ranges = list(_split_ranges(buffer, size, chunk_size))
+            if pool is None:
+                for start, end in ranges:
+                    report.merge(self.validate_lines(_iterate_lines(buffer, start, end)))
+                return
+
+        arguments = [(file, start, end) for start, end in ranges]
+        for result in pool.imap_unordered(_validate_range_in_worker, arguments):
+            report.merge(result)
+
+    def _validate_compressed_file(self, file, report, pool, jobs, chunk_size):
+        pending = collections.deque()
+        with _get_opener(file)(file, 'rb') as f:
+            for block in _iterate_blocks(f, chunk_size):
+                if pool is None:
+                    report.merge(self.validate_lines(block.split(b'\n')))
+                    continue
+                # Keep a bounded number of the blocks in flight, the decompression is faster than the validation:
+                pending.append(pool.apply_async(_validate_block_in_worker, (block,)))
+                while len(pending) > jobs * 2:
+                    report.merge(pending.popleft().get())
+        while pending:
+            report.merge(pending.popleft().get())
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The tasks of the workers, which use the validator inherited from the main process:
+# ----------------------------------------------------------------------------------------------------------------------
+def _validate_range_in_worker(arguments):
+    return _worker_validator.validate_range(*arguments)
+
+
+def _validate_block_in_worker(block):
+    return _worker_validator.validate_lines(block.split(b'\n'))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# The utilities for reading the files:
+# ----------------------------------------------------------------------------------------------------------------------
+def _get_opener(file):
+    if file.endswith('.gz'):
+        import gzip
+        return gzip.open
+    if file.endswith('.xz'):
+        import lzma
+        return lzma.open
+    return None
+
+
+def _split_ranges(buffer, size, chunk_size):
+    start = 0
+    while start < size:
+        end = buffer.find(b'\n', min(start + chunk_size, size) - 1)
+        end = size if end < 0 else end + 1
+        yield start, end
+        start = end
+
+
+def _iterate_lines(buffer, start, end):
+    find = buffer.find
+    while start < end:
+        index = find(b'\n', start, end)
+        if index < 0:
+            index = end
+        yield buffer[start:index]
+        start = index + 1
+
+
+def _iterate_blocks(f, chunk_size):
+    remainder = b''
+    while True:
+        data = f.read(chunk_size)
+        if not data:
+            break
+        data = remainder + data
+        index = data.rfind(b'\n')
+        if index < 0:
+            remainder = data
+            continue
+        remainder = data[index + 1:]
+        yield data[:index]
+    if remainder:
+        yield remainder
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Define the entry point for validating the traffic
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='Check the recorded traffic against the response schemas')
+    arg_parser.add_argument('blueprint', help='The blueprint (.apib) documenting the responses')
+    arg_parser.add_argument('logs', nargs='+', help='The NDJSON traffic logs, optionally compressed as .gz or .xz')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=0,
+                            help='Number of processes for validating the logs, 0 for all the cpu cores (default)')
+    arg_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE // (1024 * 1024),
+                            help='Size in MB of the chunk of the log validated by one task (default: %(default)s)')
+    for name in sorted(DEFAULT_FIELDS):
+        arg_parser.add_argument('--%s-field' % name, default=DEFAULT_FIELDS[name],
+                                help='Field of the record holding the %s (default: %%(default)s)' % name)
+    arg_parser.add_argument('--schema-cache', nargs='?', const='', default=None, metavar='DIRECTORY',
+                            help='Keep the parsed schemas of the blueprint in the directory (default: '
+                                 '.cache/pre-commit-apiary/schemas)')
+    arg_parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = arg_parser.parse_args(argv)
+
+    fields = dict((name, getattr(args, '%s_field' % name)) for name in DEFAULT_FIELDS)
+    try:
+        validator = TrafficValidator.from_blueprint(args.blueprint, fields, args.schema_cache)
+    except (ValueError, OSError) as e:
+        print('Error: could not read the blueprint %s: %s' % (args.blueprint, e))
+        return -1
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    start_time = time.time()
+    report = validator.validate_files(args.logs, jobs, max(1, args.chunk_size) * 1024 * 1024)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        report.print_report(time.time() - start_time)
+    return 0 if report.counts['records'] == report.counts['valid'] else -1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
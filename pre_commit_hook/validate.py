@@ -1,9 +1,13 @@
 __author__ = 'Arsenal_49'
 
-from pre_commit_hook.apiary import ApiaryValidator
+from pre_commit_hook.apiary import ApiaryValidator, DEFAULT_MAX_ERRORS
 from pre_commit_hook.mixins.pre_validations import PreValidationTabMixin, PreValidationBaseMixin
 import argparse
+import io
 import os
+import contextlib
+import functools
+import sys
 
 
 class MixValidator(PreValidationTabMixin, PreValidationBaseMixin, ApiaryValidator):
@@ -13,26 +17,67 @@ class MixValidator(PreValidationTabMixin, PreValidationBaseMixin, ApiaryValidato
             valid, error = super(MixValidator, self)._read_line(line)
         return valid, error
 
+    def _read_code_block(self, lines):
+        # The lines failing the pre-validations are read one by one, for the errors at their lines:
+        for line in lines:
+            if not self.pre_validate(line)[0]:
+                return False
+        return super(MixValidator, self)._read_code_block(lines)
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 # validate the single file with the filename:
-def _validate_with_filename(filename):
+def _validate_with_filename(filename, cache=None, max_errors=1):
     file_path = '%s/%s' % (os.getcwd(), filename)
     print('start validate file: %s' % file_path)
-    validator = MixValidator()
-    return validator.validate_file(file_path)
+    if cache is None:
+        return MixValidator().validate_file(file_path, max_errors=max_errors)
+
+    from pre_commit_hook.cache import ValidationCache
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        key = cache.get_key(content)
+    except OSError:
+        return MixValidator().validate_file(file_path, max_errors=max_errors)
+
+    record = cache.get(key)
+    if record is not None:
+        errors = ValidationCache.get_errors_from_record(record)
+        for line_count, error in errors:
+            print('ValError: %s (@ %d)' % (error.message, line_count))
+        return record['valid'], (errors[0][1] if errors else None)
+
+    if max_errors > 1:
+        # The sections are skipped only up to the first error, so collect all the errors from the whole file:
+        validator = MixValidator()
+        valid, error = validator.validate_stream(content, max_errors=max_errors)
+        cache.set(key, ValidationCache.make_record(valid, validator.errors))
+        return valid, error
+
+    # Only re-validate the sections changed since the cached results:
+    from pre_commit_hook.incremental import IncrementalValidator
+    section_cache = ValidationCache(cache.directory, cache.max_entries, namespace='%s/sections' % cache.namespace)
+    validator = IncrementalValidator(section_cache, validator_cls=MixValidator)
+    valid, error = validator.validate_stream(content)
+    cache.set(key, ValidationCache.make_record(valid, validator.errors))
+    return valid, error
+
+
+def _validate_with_filename_in_worker(filename, cache=None, max_errors=1):
+    # The output of the workers is captured, so that the summary could be printed in the order of the filenames
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        valid, error = _validate_with_filename(filename, cache, max_errors)
+    return filename, valid, error, output.getvalue()
 
 
 # ----------------------------------------------------------------------------------------------------------------------
-# Define the entry point for executing the validation
-def validate(argv=None):
+# validate the files one by one, and stop at the first failing file:
+def _validate_files(filenames, cache=None, max_errors=1):
     result = 0
-    arg_parser = argparse.ArgumentParser()
-    arg_parser.add_argument('filenames', nargs='*', help='Filenames to validate')
-    args = arg_parser.parse_args(argv)
-
-    for filename in args.filenames:
-        valid, error = _validate_with_filename(filename)
+    for filename in filenames:
+        valid, error = _validate_with_filename(filename, cache, max_errors)
         if error is not None:
             print('validation not pass with file: %s' % filename)
             result = -1
@@ -41,3 +86,116 @@ def validate(argv=None):
             print('validation pass with file: %s' % filename)
 
     return result
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# validate the files one by one in this process without the cache, and report where the time goes:
+def _profile_files(filenames, max_errors=1, top=10):
+    from pre_commit_hook.profiling import Profiler, profile_validation
+
+    result = 0
+    for filename in filenames:
+        file_path = '%s/%s' % (os.getcwd(), filename)
+        print('start profile file: %s' % file_path)
+        validator = MixValidator()
+        profiler = Profiler(top)
+        with profile_validation(validator, profiler):
+            valid, error = validator.validate_file(file_path, max_errors=max_errors)
+        profiler.print_report()
+        if error is not None:
+            print('validation not pass with file: %s' % filename)
+            result = -1
+        else:
+            print('validation pass with file: %s' % filename)
+
+    return result
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# validate the files with a process pool, and report all the files with the order of the filenames:
+def _validate_files_in_parallel(filenames, jobs, cache=None, max_errors=1, pool=None):
+    from multiprocessing import Pool
+
+    result = 0
+    failed_count = 0
+    chunk_size = max(1, len(filenames) // (jobs * 4))
+    worker = functools.partial(_validate_with_filename_in_worker, cache=cache, max_errors=max_errors)
+    with contextlib.ExitStack() as stack:
+        if pool is None:
+            pool = stack.enter_context(Pool(processes=jobs))
+        for filename, valid, error, output in pool.imap(worker, filenames, chunk_size):
+            print(output, end='')
+            if error is not None:
+                print('validation not pass with file: %s' % filename)
+                failed_count += 1
+                result = -1
+            else:
+                print('validation pass with file: %s' % filename)
+
+    print('validated %d file(s): %d passed, %d failed'
+          % (len(filenames), len(filenames) - failed_count, failed_count))
+    return result
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Define the entry point for executing the validation, the daemon passes its warm process pools
+def validate(argv=None, pools=None):
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('filenames', nargs='*', help='Filenames to validate')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help='Number of processes for validating the files, 0 for using all the cpu cores. '
+                                 'With more than one process, all the files are validated even if some fail.')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='Validate all the files without reading or writing the validation cache')
+    arg_parser.add_argument('--cache-dir', default=None,
+                            help='Directory of the validation cache (default: .cache/pre-commit-apiary)')
+    arg_parser.add_argument('--cache-size', type=int, default=None,
+                            help='Max number of entries kept in the validation cache (default: 65536)')
+    arg_parser.add_argument('--all-errors', action='store_true',
+                            help='Report all the errors of each file instead of stopping at the first one. The '
+                                 'validation resumes at the next header after each error.')
+    arg_parser.add_argument('--max-errors', type=int, default=DEFAULT_MAX_ERRORS,
+                            help='Max number of errors reported for each file with --all-errors (default: %(default)s)')
+    arg_parser.add_argument('--daemon', action='store_true',
+                            help='Validate the files with the resident daemon of the current directory, which is '
+                                 'started on the first use and shuts down after --daemon-idle-timeout seconds')
+    arg_parser.add_argument('--daemon-idle-timeout', type=float, default=None,
+                            help='Seconds without any request before the daemon shuts down (default: 600)')
+    arg_parser.add_argument('--profile', action='store_true',
+                            help='Report the time of the validation by the validator state, the section, and the '
+                                 'slowest lines and code blocks. The files are validated in this process, without '
+                                 'the cache or the daemon.')
+    arg_parser.add_argument('--profile-top', type=int, default=10,
+                            help='Number of the slowest sections, code blocks and lines reported (default: %(default)s)')
+    args = arg_parser.parse_args(argv)
+    if args.daemon and pools is None and not args.profile:
+        from pre_commit_hook.daemon import run_client, DEFAULT_IDLE_TIMEOUT
+        forwarded = [arg for arg in (sys.argv[1:] if argv is None else argv) if arg != '--daemon']
+        idle_timeout = DEFAULT_IDLE_TIMEOUT if args.daemon_idle_timeout is None else args.daemon_idle_timeout
+        result = run_client(forwarded, idle_timeout=idle_timeout)
+        if result is not None:
+            return result
+        # Fall back to the validation in this process when the daemon is not available
+
+    if args.max_errors < 1:
+        arg_parser.error('--max-errors should be a positive integer')
+    max_errors = args.max_errors if args.all_errors else 1
+    if args.profile:
+        return _profile_files(args.filenames, max_errors, args.profile_top)
+
+    cache = None
+    if not args.no_cache:
+        namespace = MixValidator.__name__
+        if max_errors > 1:
+            namespace = '%s/max-errors-%d' % (namespace, max_errors)
+        from pre_commit_hook.cache import ValidationCache, DEFAULT_CACHE_DIRECTORY, DEFAULT_CACHE_ENTRIES
+        cache_dir = DEFAULT_CACHE_DIRECTORY if args.cache_dir is None else args.cache_dir
+        cache_size = DEFAULT_CACHE_ENTRIES if args.cache_size is None else args.cache_size
+        cache = ValidationCache(cache_dir, max_entries=cache_size, namespace=namespace)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    jobs = min(jobs, len(args.filenames))
+    if jobs > 1:
+        pool = pools.get(jobs) if pools is not None else None
+        return _validate_files_in_parallel(args.filenames, jobs, cache, max_errors, pool)
+    return _validate_files(args.filenames, cache, max_errors)
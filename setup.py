@@ -11,7 +11,11 @@ setup(
     install_requires=install_requires,
     entry_points={
         'console_scripts': [
-            'validate_apiary = pre_commit_hook.validate:validate'
+            'validate_apiary = pre_commit_hook.validate:validate',
+            'validate_traffic = pre_commit_hook.traffic:main',
+            'mock_apiary = pre_commit_hook.mockserver:main',
+            'contract_apiary = pre_commit_hook.contract:main',
+            'load_apiary = pre_commit_hook.loadtest:main',
         ]
     }
 )
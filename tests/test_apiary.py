@@ -1,12 +1,16 @@
 __author__ = 'admin'
 
 import re
+import io
 import json
-from unittest import TestCase
+import mmap
+import contextlib
+from unittest import TestCase, mock
 from os import listdir
 from os import path
 from pre_commit_hook.decoder import ApiDecoder
 from pre_commit_hook.apiary import ApiaryValidator
+from pre_commit_hook.validate import MixValidator
 from pre_commit_hook.apiary import _state_init
 from pre_commit_hook.apiary import _state_read_group_title
 from pre_commit_hook.apiary import _state_read_api_title
@@ -383,6 +387,90 @@ class ApiaryTest(TestCase):
                 self.assertFalse(valid)
                 self.assertEqual(error.type, ApiarySyntaxError().type)
 
+    # ------------------------------------------------------------------------------------------------------------------
+    # TestCase: the inputs of the validation
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_validate_with_streams(self):
+        file_path = path.join(_current_file_path, 'test_case_002.apib')
+        with open(file_path, 'rb') as f:
+            content = f.read()
+
+        self.assertEqual(ApiaryValidator().validate_file(file_path), (True, None))
+        self.assertEqual(ApiaryValidator().validate_text(content.decode('utf-8')), (True, None))
+        self.assertEqual(ApiaryValidator().validate_stream(content), (True, None))
+        self.assertEqual(ApiaryValidator().validate_stream(content.decode('utf-8').splitlines(True)), (True, None))
+        with open(file_path, 'rb') as f:
+            self.assertEqual(ApiaryValidator().validate_stream(f), (True, None))
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            self.assertEqual(ApiaryValidator().validate_stream(buffer), (True, None))
+
+        v = ApiaryValidator()
+        valid, error = v.validate_text(content.decode('utf-8').replace('## 10/27', '### 10/27'))
+        self.assertFalse(valid)
+        self.assertEqual(v.errors, [(4, error)])
+
+    def test_validate_with_all_errors(self):
+        with open(path.join(_current_file_path, 'test_case_002.apib'), 'r') as f:
+            content = f.read()
+        broken_content = content.replace('## 10/27', '### 10/27')
+        line_count = content.count('\n')
+
+        self.assertEqual(ApiaryValidator().validate_text(content * 3, max_errors=10), (True, None))
+
+        v = ApiaryValidator()
+        valid, error = v.validate_text(broken_content + content + broken_content, max_errors=10)
+        self.assertFalse(valid)
+        self.assertEqual([line for line, e in v.errors], [4, 2 * line_count + 4])
+        self.assertIs(v.errors[0][1], error)
+
+        v = ApiaryValidator()
+        valid, error = v.validate_text(broken_content * 3, max_errors=2)
+        self.assertFalse(valid)
+        self.assertEqual([line for line, e in v.errors], [4, line_count + 4])
+
+    def test_validate_with_all_errors_after_decoder_error(self):
+        # The error in the middle of a line leaves the comment of the line in the decoder, which should not be seen by
+        # the code block of the next endpoint:
+        broken_block = ['# Group A', '## api [/a]', '### get [GET]', _TEST_RESPONSE_TAG, '',
+                        '        {', '            "k": "v" x // [string]', '        }', '']
+        block = ['## api [/b]', '### get [GET]', _TEST_RESPONSE_TAG, '',
+                 '        [ // [optional]', '            {', '                "id": 1', '            }', '        ]']
+        for validator_cls in [ApiaryValidator, MixValidator]:
+            self.assertEqual(validator_cls().validate_lines(['# Group B'] + block), (True, None))
+            v = validator_cls()
+            with contextlib.redirect_stdout(io.StringIO()):
+                valid, error = v.validate_lines(broken_block + block, max_errors=10)
+            self.assertFalse(valid)
+            self.assertEqual([line for line, e in v.errors], [7])
+
+    def test_validate_with_code_blocks_read_at_once(self):
+        with open(path.join(_current_file_path, 'test_case_002.apib'), 'r') as f:
+            content = f.read()
+
+        # All the code blocks of the document are parsed by the json fast path of the decoder:
+        with mock.patch.object(ApiDecoder, 'scan_line', autospec=True, side_effect=ApiDecoder.scan_line) as scan_line:
+            self.assertEqual(ApiaryValidator().validate_text(content), (True, None))
+        self.assertEqual(scan_line.call_count, 0)
+
+        # The errors in the code blocks are reported at their lines, as if the lines were read one by one:
+        broken_contents = [content.replace('"verifier": "111283"', '"verifier": "111283",', 1),
+                           content.replace('"method": "DELETE"', '"method": DELETE', 1),
+                           content.replace('        {\n            "sessionKey"', '    {\n            "sessionKey"', 1),
+                           content.replace('"method": "PATCH",', '"method": "PATCH"\t,', 1),
+                           content + '+ Response 404\n\n        {\n            "message": "test",\n']
+        for broken_content in broken_contents:
+            self.assertNotEqual(broken_content, content)
+            for validator_cls in [ApiaryValidator, MixValidator]:
+                line_by_line_cls = type('LineByLine%s' % validator_cls.__name__, (validator_cls,),
+                                        {'_read_code_block': lambda validator, lines: False})
+                results = list()
+                for validator in [validator_cls(), line_by_line_cls()]:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        validator.validate_text(broken_content * 2, max_errors=10)
+                    results.append([(line_count, e.type, e.message) for line_count, e in validator.errors])
+                self.assertEqual(results[0], results[1])
+            self.assertTrue(results[0])
+
     # ------------------------------------------------------------------------------------------------------------------
     # Utilities for testing:
     # ------------------------------------------------------------------------------------------------------------------
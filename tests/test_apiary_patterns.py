@@ -8,7 +8,12 @@ from pre_commit_hook.apiary import _param_title
 from pre_commit_hook.apiary import _param_string
 from pre_commit_hook.apiary import _request_title
 from pre_commit_hook.apiary import _response_title
+from pre_commit_hook.apiary import _classify_line
+from pre_commit_hook.apiary import _line_group_title, _line_api_title, _line_api_method, _line_param_title
+from pre_commit_hook.apiary import _line_param_string, _line_request_title, _line_response_title, _line_indented
 
+import re
+from os import path
 from unittest import TestCase
 
 
@@ -71,4 +76,29 @@ class ApiaryPatternsTest(TestCase):
         self.assertTrue(_response_title('+ Response 300'))
         self.assertTrue(_response_title('+ Response'))
         self.assertFalse(_response_title('+ Request'))
-        self.assertFalse(_response_title('+ Parameters'))
\ No newline at end of file
+        self.assertFalse(_response_title('+ Parameters'))
+
+    def test_classify_line(self):
+        patterns = [(_group_title, _line_group_title),
+                    (_api_title, _line_api_title),
+                    (_api_method, _line_api_method),
+                    (_param_title, _line_param_title),
+                    (_param_string, _line_param_string),
+                    (_request_title, _line_request_title),
+                    (_response_title, _line_response_title),
+                    (re.compile(r'\s+').match, _line_indented)]
+
+        lines = ['', '\n', '#\n', '# Group', '## api [/test]', '##  api [/test] [GET]', '### method [PATCH]',
+                 '+ Parameters (string)', '+ Request (abc)', '+ Request', '+ Response', '+Response 200',
+                 '   + Response 200', '\t+ test (number)', '- Parameters', 'text with [GET] and + test (number)']
+        current_file_path = path.dirname(path.abspath(__file__))
+        for filename in ['order_2.apib', 'test_case_002.apib']:
+            with open(path.join(current_file_path, filename), 'r') as f:
+                lines.extend(f.readlines())
+
+        for line in lines:
+            expected = 0
+            for pattern, kind in patterns:
+                if pattern(line):
+                    expected |= kind
+            self.assertEqual(_classify_line(line), expected, 'Unexpected kinds of line: %r' % line)
@@ -0,0 +1,78 @@
+__author__ = 'Arsenal_49'
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+from pre_commit_hook.cache import ValidationCache, get_source_digest
+from pre_commit_hook.error import ApiarySyntaxError
+
+
+class ValidationCacheTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_and_set(self):
+        cache = ValidationCache(self.directory)
+        key = cache.get_key(b'# Group TEST')
+        self.assertIsNone(cache.get(key))
+
+        errors = [(12, ApiarySyntaxError(message='Missing api method string'))]
+        cache.set(key, ValidationCache.make_record(False, errors))
+        record = cache.get(key)
+        self.assertFalse(record['valid'])
+
+        line_count, error = ValidationCache.get_errors_from_record(record)[0]
+        self.assertEqual(line_count, 12)
+        self.assertEqual(error.type, ApiarySyntaxError().type)
+        self.assertEqual(error.message, 'Missing api method string')
+
+    def test_key_with_namespace(self):
+        content = b'# Group TEST'
+        self.assertEqual(ValidationCache(self.directory).get_key(content),
+                         ValidationCache(self.directory).get_key(content))
+        self.assertNotEqual(ValidationCache(self.directory).get_key(content),
+                            ValidationCache(self.directory, namespace='MixValidator').get_key(content))
+        self.assertNotEqual(ValidationCache(self.directory).get_key(content),
+                            ValidationCache(self.directory).get_key(content + b' '))
+
+    def test_key_with_source_digest(self):
+        # The results of the changed validator should not be read from the cache:
+        package = os.path.join(self.directory, 'package')
+        os.makedirs(os.path.join(package, 'api'))
+        for name in ['apiary.py', os.path.join('api', 'ApiContentElement.py')]:
+            with open(os.path.join(package, name), 'w') as f:
+                f.write('# %s\n' % name)
+        digest = get_source_digest(package)
+        self.assertEqual(get_source_digest(package), digest)
+
+        with open(os.path.join(package, 'api', 'ApiContentElement.py'), 'a') as f:
+            f.write('# changed\n')
+        from pre_commit_hook import cache
+        del cache._source_digests[package]
+        self.assertNotEqual(get_source_digest(package), digest)
+
+    def test_set_without_writable_directory(self):
+        cache = ValidationCache(self.directory)
+        key = cache.get_key(b'# Group TEST')
+        with mock.patch('os.replace', side_effect=OSError('read-only')):
+            cache.set(key, ValidationCache.make_record(True, []))
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_eviction(self):
+        cache = ValidationCache(self.directory, max_entries=3)
+        keys = [cache.get_key(('# Group %d' % i).encode('utf-8')) for i in range(5)]
+        for index, key in enumerate(keys):
+            cache.set(key, ValidationCache.make_record(True, []))
+            os.utime(cache._get_path(key), (index, index))
+
+        cache.set(keys[0], ValidationCache.make_record(True, []))
+        self.assertEqual(len(os.listdir(self.directory)), 3)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNone(cache.get(keys[2]))
@@ -0,0 +1,126 @@
+__author__ = 'Arsenal_49'
+
+import copy
+import random
+from os import listdir
+from os import path
+from unittest import TestCase
+from pre_commit_hook.decoder import ApiDecoder
+from pre_commit_hook.api.ApiContentCompiler import get_compiled_validator, clear_compiled_validators
+from pre_commit_hook.api.ApiContentElement import ApiContentElementFactory, ApiContentDuplicateElement
+
+_current_file_path = path.dirname(path.abspath(__file__))
+_FUZZ_SEED = 49
+_FUZZ_CASES = 300
+_FUZZ_VALUES = [None, 0, 1, -2.5, True, False, '', 'text', 'https://www.example.com/path', 'http:/', [], [1, 'a'],
+                {}, {'key': 1}]
+
+
+class ApiContentCompilerTest(TestCase):
+    # ------------------------------------------------------------------------------------------------------------------
+    # Differential tests: the compiled validator should give the same result as validate_json_object
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_compiled_validator_with_content_files(self):
+        rand = random.Random(_FUZZ_SEED)
+        random.seed(_FUZZ_SEED)  # for generate_json_object
+        for schema in self._get_schemas():
+            for i in range(_FUZZ_CASES // 10):
+                json_object = schema.generate_json_object()
+                self._assert_same_result(schema, json_object)
+                for j in range(10):
+                    mutated = copy.deepcopy(json_object)
+                    for k in range(rand.randint(1, 3)):
+                        mutated = self._mutate(rand, mutated)
+                    self._assert_same_result(schema, mutated)
+
+    def test_compiled_validator_with_values(self):
+        for type_string in ['string', 'url', 'number', 'timestamp', 'boolean', 'array', 'dictionary']:
+            schema = ApiContentElementFactory.get_response_element_by_type(type_string)
+            for value in _FUZZ_VALUES:
+                self._assert_same_result(schema, value)
+
+        array = ApiContentElementFactory.get_response_element_by_type('array')
+        array.add_element(ApiContentElementFactory.get_response_element_by_type('number'))
+        array.add_element(ApiContentElementFactory.get_response_element_by_type('string'))
+        dictionary = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        dictionary.add_element(array, 'items')
+        dictionary.add_element(ApiContentDuplicateElement(array), 'copies')
+        for value in [[1, 'a'], [1, 'a', 2], ['a'], [1, 2, 'a'], 1]:
+            self._assert_same_result(array, value)
+            self._assert_same_result(dictionary, {'items': value, 'copies': value})
+
+    def test_compiled_validator_with_primitive_arrays(self):
+        for type_string, value, invalid_value in [('number', 1.5, 'a'), ('boolean', True, 1), ('string', 'a', None),
+                                                  ('url', 'https://www.example.com', 1)]:
+            array = ApiContentElementFactory.get_response_element_by_type('array')
+            for i in range(2):
+                array.add_element(ApiContentElementFactory.get_response_element_by_type(type_string))
+            dictionary = ApiContentElementFactory.get_response_element_by_type('dictionary')
+            dictionary.add_element(array, 'values')
+            values = [value] * 1000
+            for json_object in [values, values + [invalid_value], [invalid_value] + values, [], [True, 0, 2.5]]:
+                self._assert_same_result(array, json_object)
+                self._assert_same_result(dictionary, {'values': json_object})
+
+    def test_compiled_validator_cache(self):
+        schema = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        schema.add_element(ApiContentElementFactory.get_response_element_by_type('number'), 'id')
+        validator = get_compiled_validator(schema)
+        self.assertIs(get_compiled_validator(schema), validator)
+        clear_compiled_validators(schema)
+        self.assertIsNot(get_compiled_validator(schema), validator)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Utilities for testing:
+    # ------------------------------------------------------------------------------------------------------------------
+    def _assert_same_result(self, schema, json_object):
+        expected = self._validate(schema.validate_json_object, json_object)
+        result = self._validate(get_compiled_validator(schema), json_object)
+        self.assertEqual(result, expected, 'Results not matched with %r for schema:\n%s' % (json_object, schema))
+
+    @staticmethod
+    def _validate(validator, json_object):
+        try:
+            result = validator(json_object)
+        except Exception as e:
+            return 'error', type(e).__name__, str(e)
+        return 'valid', bool(result), type(result).__name__
+
+    @staticmethod
+    def _mutate(rand, json_object):
+        # Replace, delete or add one value at a random place of the object:
+        if isinstance(json_object, dict) and json_object and rand.random() < 0.7:
+            key = rand.choice(sorted(json_object))
+            operation = rand.randrange(3)
+            if operation == 0:
+                json_object[key] = ApiContentCompilerTest._mutate(rand, json_object[key])
+            elif operation == 1:
+                del json_object[key]
+            else:
+                json_object[key] = rand.choice(_FUZZ_VALUES)
+            return json_object
+        if isinstance(json_object, list) and json_object and rand.random() < 0.7:
+            index = rand.randrange(len(json_object))
+            operation = rand.randrange(3)
+            if operation == 0:
+                json_object[index] = ApiContentCompilerTest._mutate(rand, json_object[index])
+            elif operation == 1:
+                json_object.append(copy.deepcopy(json_object[index]))
+            else:
+                json_object[index] = rand.choice(_FUZZ_VALUES)
+            return json_object
+        return rand.choice(_FUZZ_VALUES)
+
+    @staticmethod
+    def _get_schemas():
+        schemas = list()
+        for sub_path in ['request', 'response']:
+            content_path = path.join(_current_file_path, sub_path)
+            for filename in sorted(listdir(content_path)):
+                if 'good' in filename:
+                    decoder = ApiDecoder()
+                    with open(path.join(content_path, filename), 'r') as f:
+                        for line in f:
+                            decoder.scan_line(line)
+                    schemas.append(decoder.get_parsed_objects())
+        return schemas
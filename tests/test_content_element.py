@@ -0,0 +1,231 @@
+__author__ = 'Arsenal_49'
+
+import copy
+import gc
+import io
+import pickle
+import random
+import weakref
+from contextlib import redirect_stdout
+from os import listdir
+from os import path
+from unittest import TestCase
+from pre_commit_hook.decoder import ApiDecoder, ApiDictionaryObject
+from pre_commit_hook.api.ApiContentElement import ApiContentElementFactory, ApiContentDuplicateElement
+from pre_commit_hook.api.ApiContentElement import ApiContentArrayElement, ApiContentDictionaryElement
+from pre_commit_hook.api.ApiContentElement import ApiContentElementInterner
+from pre_commit_hook.api.ApiContentCompiler import get_compiled_validator
+from pre_commit_hook.api.Exception import ResponseContentTypeNotValidException
+
+_current_file_path = path.dirname(path.abspath(__file__))
+
+
+class ApiContentElementTest(TestCase):
+
+    def setUp(self):
+        self.schema = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        items = ApiContentElementFactory.get_response_element_by_type('array')
+        item = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        item.add_element(ApiContentElementFactory.get_response_element_by_type('number'), ''.join(['co', 'de']))
+        items.add_element(item)
+        self.schema.add_element(items, 'items')
+        self.schema.add_element(ApiContentDuplicateElement(items), 'copies')
+
+    def test_slots(self):
+        elements = [self.schema, self.schema['items'], self.schema['items'][0]['code'], self.schema['copies'],
+                    ApiDictionaryObject()]
+        for type_string in ['string', 'url', 'number', 'timestamp', 'boolean']:
+            elements.append(ApiContentElementFactory.get_response_element_by_type(type_string))
+        for element in elements:
+            self.assertFalse(hasattr(element, '__dict__'), type(element).__name__)
+
+    def test_interned_keys(self):
+        key = [key for key in self.schema['items'][0].content][0]
+        self.assertIs(key, 'code')
+
+    def test_weak_parent(self):
+        item = self.schema['items'][0]
+        self.assertIs(item['code']._parent, item)
+        self.assertEqual(item['code'].get_key_path(), 'items.0.code')
+
+        # Without the reference cycles, the tree is freed as soon as it is dropped:
+        schema_ref = weakref.ref(self.schema)
+        gc.disable()
+        try:
+            del self.schema, item
+            self.assertIsNone(schema_ref())
+        finally:
+            gc.enable()
+
+    def test_decoded_tree_without_cycles(self):
+        decoder = ApiDecoder()
+        for line in ['{\n', '  "items": [\n', '    {"code": 1}\n', '  ]\n', '}\n']:
+            decoder.scan_line(line)
+        schema_ref = weakref.ref(decoder.get_parsed_objects())
+        gc.disable()
+        try:
+            del decoder
+            self.assertIsNone(schema_ref())
+        finally:
+            gc.enable()
+
+    def test_copy_and_pickle(self):
+        for schema in [copy.deepcopy(self.schema), pickle.loads(pickle.dumps(self.schema))]:
+            self.assertEqual(str(schema), str(self.schema))
+            self.assertIs(schema['items'][0]._parent, schema['items'])
+            self.assertIs(schema['copies'].source_element, schema['items'])
+            with self.assertRaises(ResponseContentTypeNotValidException) as context:
+                schema.validate_json_object({'items': [{'code': 'A'}]})
+            self.assertIn('items.0.code', str(context.exception))
+
+    def test_key_path(self):
+        array = self.schema['items']
+        for i in range(3):
+            array.add_element(ApiContentElementFactory.get_response_element_by_type('string'))
+        self.assertEqual([element.get_key_path() for element in array.content], ['items.0', 'items.1', 'items.2',
+                                                                                 'items.3'])
+        self.assertEqual(array[0]['code'].get_key_path(), 'items.0.code')
+        self.assertEqual(self.schema.get_key_path_with_element(array), 'items')
+        self.assertIsNone(self.schema.get_key_path())
+
+        # The elements placed without add_element are still found in their parent:
+        element = array.content.pop()
+        array.content.insert(0, element)
+        self.assertEqual(element.get_key_path(), 'items.0')
+        self.schema.content['renamed'] = self.schema.content.pop('items')
+        self.assertEqual(element.get_key_path(), 'renamed.0')
+
+    def test_equality_with_fingerprints(self):
+        # The equality should be the same as comparing the trees element by element, as __eq__ did before:
+        rand = random.Random(49)
+        schemas = self._get_schemas()
+        for i in range(300):
+            a, b = copy.deepcopy(rand.choice(schemas)), copy.deepcopy(rand.choice(schemas))
+            for schema in [a, b]:
+                for j in range(rand.randint(0, 2)):
+                    element = rand.choice(self._get_elements(schema))
+                    element.required = not element.required
+            output = io.StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(a == b, self._compare_elements(a, b))
+                self.assertEqual(b == a, self._compare_elements(b, a))
+            self.assertEqual(output.getvalue(), '')
+            self.assertEqual(a == b, a.get_fingerprint() == b.get_fingerprint())
+
+    def test_required_keys(self):
+        item = self.schema['items'][0]
+        self.assertEqual(item.required_keys, frozenset(['code']))
+        self.assertIs(item.required_keys, item.required_keys)
+
+        optional = ApiContentElementFactory.get_response_element_by_type('string')
+        optional.required = False
+        other = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        other.add_element(ApiContentElementFactory.get_response_element_by_type('number'), 'code')
+        other.add_element(optional, 'note')
+        self.schema['items'].add_element(other)  # merged with the item
+        merged = self.schema['items'][0]
+        self.assertEqual(merged.required_keys, frozenset(['code']))
+        merged['note'].required = True
+        self.assertEqual(merged.required_keys, frozenset(['code', 'note']))
+        optional_code = ApiContentElementFactory.get_response_element_by_type('number')
+        optional_code.required = False
+        merged.add_element(optional_code, 'code')
+        self.assertEqual(merged._get_required_keys(), ['note'])
+
+        copied = merged.copy()
+        self.assertEqual(copied.required_keys, merged.required_keys)
+        self.assertEqual(self.schema['copies']._get_required_keys(), [])
+
+    def test_copy(self):
+        fingerprint = self.schema.get_fingerprint()
+        for schema in [self.schema.copy(), self.schema['items'].copy()]:
+            self.assertIsNone(schema._parent)
+            for element in self._get_elements(schema):
+                if isinstance(element, ApiContentDictionaryElement):
+                    self.assertTrue(all(child._parent is element for child in element.content.values()))
+                elif isinstance(element, ApiContentArrayElement):
+                    self.assertTrue(all(child._parent is element for child in element.content))
+        schema = self.schema.copy()
+        self.assertEqual(str(schema), str(self.schema))
+        self.assertEqual(schema['items'][0]['code'].get_key_path(), 'items.0.code')
+
+        # The changes of the copy are not seen by the original, and the other way around:
+        self.assertEqual(schema.get_fingerprint(), fingerprint)
+        schema['items'][0]['code'].required = False
+        self.assertEqual(schema['items'][0].required_keys, frozenset())
+        self.assertNotEqual(schema.get_fingerprint(), fingerprint)
+        self.assertEqual(self.schema['items'][0].required_keys, frozenset(['code']))
+        self.assertEqual(self.schema.get_fingerprint(), fingerprint)
+        self.schema['items'][0]['code'].required = False
+        self.assertEqual(schema.get_fingerprint(), self.schema.get_fingerprint())
+
+    def test_intern(self):
+        interner = ApiContentElementInterner()
+        schema = copy.deepcopy(self.schema)
+        self.assertIs(interner.intern(self.schema), self.schema)
+        self.assertIs(interner.intern(schema), self.schema)
+        self.assertEqual(len(interner), 5)
+
+        # The same sub-tree nested in another tree is shared, the errors have the key paths from the validated object:
+        wrapper = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        wrapper.add_element(copy.deepcopy(self.schema['items']), 'data')
+        wrapper.add_element(ApiContentElementFactory.get_response_element_by_type('string'), 'next')
+        self.assertIs(interner.intern(wrapper), wrapper)
+        self.assertIs(wrapper['data'], self.schema['items'])
+        self.assertEqual(len(interner), 7)
+        self.assertEqual(wrapper['data'][0]['code'].get_key_path(), 'items.0.code')
+        for validate in [wrapper.validate_json_object, get_compiled_validator(wrapper)]:
+            with self.assertRaises(ResponseContentTypeNotValidException) as context:
+                validate({'data': [{'code': 'A'}], 'next': 'B'})
+            self.assertEqual(context.exception.user_info['key_path'], 'data.0.code')
+        for validate in [self.schema.validate_json_object, get_compiled_validator(self.schema)]:
+            with self.assertRaises(ResponseContentTypeNotValidException) as context:
+                validate({'items': [{'code': 'A'}], 'copies': []})
+            self.assertEqual(context.exception.user_info['key_path'], 'items.0.code')
+
+        other = copy.deepcopy(wrapper)
+        other['data'][0]['code'].required = False
+        self.assertIs(interner.intern(other), other)
+        self.assertIsNot(other['data'], self.schema['items'])
+        self.assertIs(other['next'], wrapper['next'])
+
+    @staticmethod
+    def _compare_elements(a, b):
+        if a.type != b.type:
+            return False
+        if isinstance(a, ApiContentDictionaryElement):
+            required_keys = sorted(key for key in a.content if a.content[key].required)
+            if required_keys != sorted(key for key in b.content if b.content[key].required):
+                return False
+            return all(ApiContentElementTest._compare_elements(a.content[key], b.content[key])
+                       for key in required_keys)
+        if isinstance(a, ApiContentArrayElement):
+            return all(any(ApiContentElementTest._compare_elements(x, y) for y in b.content) for x in a.content) and \
+                all(any(ApiContentElementTest._compare_elements(x, y) for x in a.content) for y in b.content)
+        return True
+
+    @staticmethod
+    def _get_elements(schema):
+        elements, result = [schema], list()
+        while elements:
+            element = elements.pop()
+            result.append(element)
+            if isinstance(element, ApiContentDictionaryElement):
+                elements.extend(element.content.values())
+            elif isinstance(element, ApiContentArrayElement):
+                elements.extend(element.content)
+        return result
+
+    @staticmethod
+    def _get_schemas():
+        schemas = list()
+        for sub_path in ['request', 'response']:
+            content_path = path.join(_current_file_path, sub_path)
+            for filename in sorted(listdir(content_path)):
+                if 'good' in filename:
+                    decoder = ApiDecoder()
+                    with open(path.join(content_path, filename), 'r') as f:
+                        for line in f:
+                            decoder.scan_line(line)
+                    schemas.append(decoder.get_parsed_objects())
+        return schemas
@@ -0,0 +1,242 @@
+__author__ = 'Arsenal_49'
+
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.contract import ContractRunner
+from pre_commit_hook.mockserver import MockServer
+from pre_commit_hook.api.Exception import UrlNotReachException, ResponseNotFoundException
+from pre_commit_hook.api.Exception import ResponseContentStatusNotMatchException, ResponseContentJsonException
+from pre_commit_hook.api.Exception import ResponseContentTypeNotValidException
+
+import asyncio
+import io
+import os
+import socket
+from unittest import TestCase
+
+_current_file_path = os.path.dirname(os.path.abspath(__file__))
+
+_BLUEPRINT = '''# Group Orders
+
+## Order [/orders/{orderId}{?sessionKey}]
+### Get the order [GET]
+
++ Response 200 (application/json)
+
+        {
+            "id": "T001",
+            "quantity": 2
+        }
+
++ Response 404 (application/json)
+
+        {
+            "message": "not found"
+        }
+
+## Order Items [/orders/{orderId}/items]
+### List the items [GET]
+
++ Response 200 (application/json)
+
+        [
+            {
+                "code": "A"
+            }
+        ]
+
+### Add an item [POST]
+
++ Request Item (application/json)
+
+        {
+            "code": "A"
+        }
+
++ Response 200 (application/json)
+
+        {
+            "code": "A"
+        }
+
+## Customers [/customers/{customerId}]
+### Get the customer [GET]
+
++ Response 200 (application/json)
+
+        {
+            "name": "Ann"
+        }
+
+### Delete the customer [DELETE]
+
++ Response 200 (application/json)
+
+        {
+            "deleted": true
+        }
+
+## Invoices [/invoices]
+### List the invoices [GET]
+
++ Response 200 (application/json)
+
+        {
+            "total": 1
+        }
+'''
+
+_LINK_BLUEPRINT = '''# Group Links
+
+## Links [/links]
+### Get the links [GET]
+
++ Response 200 (application/json)
+
+        {
+            "link": "https://example.com/a" // [string(url)]
+        }
+'''
+
+# The responses of the stand-in server by the request line, chunked with the None length:
+_STAND_IN_RESPONSES = {
+    'GET /orders/T001?sessionKey=abc': (404, b'{"message": "not found"}', True),
+    'GET /orders/T001/items': (200, b'[{"code": "A"}, {"code": "B"}]', True),
+    'POST /orders/T001/items': (500, b'{"message": "oops"}', True),
+    'GET /customers/1': (200, b'<html></html>', True),
+    'DELETE /customers/1': (200, b'{"deleted": "yes"}', False),
+    'GET /links': (200, b'{"link": 5}', True),
+}
+
+
+# Define the testCase
+class ContractRunnerTest(TestCase):
+
+    def setUp(self):
+        self.endpoints = BlueprintReader().read_stream(io.StringIO(_BLUEPRINT))
+
+    @staticmethod
+    def _run_with_stand_in(runner_factory):
+        state = {'connections': 0, 'bodies': []}
+
+        async def _handle(reader, writer):
+            state['connections'] += 1
+            try:
+                while True:
+                    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+                    request_line = head.split('\r\n')[0].rsplit(' ', 1)[0]
+                    length = [int(line.split(':')[1]) for line in head.split('\r\n')
+                              if line.lower().startswith('content-length')]
+                    if length:
+                        state['bodies'].append(await reader.readexactly(length[0]))
+                    if request_line == 'GET /invoices':
+                        await asyncio.sleep(1)
+                    status, body, with_length = _STAND_IN_RESPONSES.get(request_line, (200, b'{}', True))
+                    if with_length:
+                        writer.write(b'HTTP/1.1 %d X\r\nContent-Length: %d\r\n\r\n%s' % (status, len(body), body))
+                    else:
+                        writer.write(b'HTTP/1.1 %d X\r\nTransfer-Encoding: chunked\r\n\r\n%x\r\n%s\r\n0\r\n\r\n' % (
+                            status, len(body), body))
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+
+        return ContractRunnerTest._run_with_server(_handle, runner_factory), state
+
+    @staticmethod
+    def _run_with_server(handle, runner_factory):
+        async def _run():
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            try:
+                runner = runner_factory('http://127.0.0.1:%d' % server.sockets[0].getsockname()[1])
+                return await runner.run_async()
+            finally:
+                server.close()
+
+        return asyncio.run(_run())
+
+    def test_failures(self):
+        report, state = self._run_with_stand_in(
+            lambda url: ContractRunner(self.endpoints, url, concurrency=2, timeout=0.3,
+                                       parameters={'orderId': 'T001', 'sessionKey': 'abc'}))
+        errors = [type(result.error) if result.error else None for result in report.results]
+        self.assertEqual(errors, [ResponseContentStatusNotMatchException, None, ResponseNotFoundException,
+                                  ResponseContentJsonException, ResponseContentTypeNotValidException,
+                                  UrlNotReachException])
+        self.assertEqual([result.status for result in report.results], [404, 200, 500, 200, 200, None])
+        self.assertEqual(report.results[4].to_dict()['key_path'], 'deleted')
+        self.assertEqual(len(report.failures), 5)
+        self.assertEqual(len(state['bodies']), 1)
+        self.assertIn(b'"code"', state['bodies'][0])
+
+        # The connections are kept alive, one for each worker and one more after the timeout:
+        self.assertLessEqual(state['connections'], 3)
+
+    def test_assertion_failure(self):
+        # The url of a number fails the assertion of the element, only its own endpoint fails:
+        endpoints = BlueprintReader().read_stream(io.StringIO(_LINK_BLUEPRINT)) + self.endpoints[1:2]
+        report, state = self._run_with_stand_in(
+            lambda url: ContractRunner(endpoints, url, parameters={'orderId': 'T001'}))
+        self.assertEqual([type(result.error) if result.error else None for result in report.results],
+                         [AssertionError, None])
+        self.assertEqual(report.results[0].status, 200)
+        self.assertEqual(report.results[0].to_dict()['error'], 'AssertionError')
+        self.assertEqual(report.results[0].message, 'AssertionError')
+
+    def test_retry(self):
+        # The server drops the second request of every connection without answering it, as if it closed the idle
+        # connection at the same time:
+        requests = list()
+
+        async def _handle(reader, writer):
+            try:
+                for served in range(2):
+                    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+                    request_line = head.split('\r\n')[0].rsplit(' ', 1)[0]
+                    requests.append(request_line)
+                    if served:
+                        break
+                    length = [int(line.split(':')[1]) for line in head.split('\r\n')
+                              if line.lower().startswith('content-length')]
+                    if length:
+                        await reader.readexactly(length[0])
+                    body = b'[{"code": "A"}]' if request_line.startswith('GET') else b'{"code": "A"}'
+                    writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body))
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+            writer.close()
+
+        endpoints = [self.endpoints[1], self.endpoints[2], self.endpoints[1], self.endpoints[1]]
+        report = self._run_with_server(_handle, lambda url: ContractRunner(endpoints, url, concurrency=1,
+                                                                            parameters={'orderId': 'T001'}))
+        # The dropped POST is not sent again, the dropped GET is sent again on a new connection:
+        self.assertEqual([type(result.error) if result.error else None for result in report.results],
+                         [None, UrlNotReachException, None, None])
+        self.assertEqual([request.split(' ')[0] for request in requests], ['GET', 'POST', 'GET', 'GET', 'GET'])
+
+    def test_unreachable(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        report = ContractRunner(self.endpoints[:2], 'http://127.0.0.1:%d/v1' % port).run()
+        self.assertEqual([type(result.error) for result in report.results], [UrlNotReachException] * 2)
+        self.assertEqual(report.results[0].url, 'http://127.0.0.1:%d/v1/orders/1' % port)
+
+    def test_against_mock_server(self):
+        endpoints = BlueprintReader().read_file(os.path.join(_current_file_path, 'order_2.apib'))
+        # The mock server serves the first of the endpoints documented for the same route:
+        endpoints = [endpoint for index, endpoint in enumerate(endpoints)
+                     if endpoint.name not in [other.name for other in endpoints[:index]]]
+
+        async def _run():
+            server = await MockServer(endpoints).start('127.0.0.1', 0)
+            try:
+                url = 'http://127.0.0.1:%d' % server.sockets[0].getsockname()[1]
+                return await ContractRunner(endpoints, url, concurrency=4).run_async()
+            finally:
+                server.close()
+
+        report = asyncio.run(_run())
+        self.assertEqual(len(report.results), len(endpoints))
+        self.assertEqual([str(result.error) for result in report.failures], [])
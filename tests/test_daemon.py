@@ -0,0 +1,83 @@
+__author__ = 'Arsenal_49'
+
+from pre_commit_hook.daemon import run_client, stop_daemon, get_socket_path
+from pre_commit_hook.validate import validate
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase, mock, skipUnless
+
+
+# Define the testCase
+@skipUnless(hasattr(os, 'fork'), 'The daemon listens on a Unix socket')
+class ValidationDaemonTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.directory, 'daemon.sock')
+
+    def tearDown(self):
+        stop_daemon(self.socket_path)
+        shutil.rmtree(self.directory)
+
+    def test_socket_path(self):
+        self.assertEqual(get_socket_path('a'), get_socket_path(os.path.abspath('a')))
+        self.assertNotEqual(get_socket_path('a'), get_socket_path('b'))
+        # The daemon of the sources before an upgrade is not reused:
+        socket_path = get_socket_path('a')
+        with mock.patch('pre_commit_hook.daemon.get_source_digest', return_value='upgraded'):
+            self.assertNotEqual(get_socket_path('a'), socket_path)
+
+    def test_socket_directory(self):
+        runtime_directory = os.path.join(self.directory, 'runtime')
+        os.mkdir(runtime_directory, 0o700)
+        with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': runtime_directory}):
+            socket_path = get_socket_path('a')
+            self.assertEqual(os.path.dirname(socket_path), os.path.join(runtime_directory, 'pre-commit-apiary'))
+            self.assertEqual(os.stat(os.path.dirname(socket_path)).st_mode & 0o777, 0o700)
+
+            # The directory which the other users could write to is never used:
+            os.chmod(os.path.dirname(socket_path), 0o777)
+            self.assertIsNone(get_socket_path('a'))
+            self.assertIsNone(run_client(['--no-cache', 'test_case_002.apib']))
+
+    def test_untrusted_daemon(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(run_client(['--no-cache', 'test_case_002.apib'], self.socket_path), 0)
+            # The daemon of another user is never trusted with the results:
+            with mock.patch('pre_commit_hook.daemon.os.getuid', return_value=os.getuid() + 1):
+                self.assertIsNone(run_client(['--no-cache', 'test_case_002.apib'], self.socket_path))
+
+    def test_validate_with_daemon(self):
+        argv = ['--no-cache', 'order_2.apib', 'test_case_002.apib']
+        for jobs in ['1', '2']:
+            local_output = io.StringIO()
+            with contextlib.redirect_stdout(local_output):
+                local_result = validate(argv + ['--jobs', jobs])
+
+            for i in range(2):  # the first request starts the daemon, the second one reuses it
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    result = run_client(argv + ['--jobs', jobs], self.socket_path)
+                self.assertEqual(result, local_result)
+                self.assertEqual(output.getvalue(), local_output.getvalue())
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(run_client(['--no-cache', 'test_case_002.apib'], self.socket_path), 0)
+        self.assertIn('validation pass with file: test_case_002.apib', output.getvalue())
+
+        self.assertTrue(stop_daemon(self.socket_path))
+        self.assertFalse(stop_daemon(self.socket_path))
+
+    def test_idle_timeout(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(run_client(['--no-cache', 'test_case_002.apib'], self.socket_path, idle_timeout=0.2), 0)
+        deadline = time.time() + 10
+        while os.path.exists(self.socket_path) and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(os.path.exists(self.socket_path))
@@ -0,0 +1,101 @@
+__author__ = 'Arsenal_49'
+
+import random
+from os import listdir
+from os import path
+from unittest import TestCase
+from pre_commit_hook.decoder import ApiDecoder
+from pre_commit_hook.api.ApiContentElement import ApiContentArrayElement, ApiContentDictionaryElement
+
+_current_file_path = path.dirname(path.abspath(__file__))
+_FUZZ_SEED = 49
+_FUZZ_CASES = 500
+_FUZZ_CHARACTERS = '{}[]",:.019 tf-\\/\n'
+_FUZZ_LINES = ['        ...\n', '        // [string]\n', '\n', '        {\n', '        }\n', '        ],\n',
+               '        "extra": 1,\n', '        "extra": "text"   // [string, optional]\n']
+_FUZZ_COMMENTS = ['  // [optional]', '  // [string, optional]', '  // [number]', '  // [boolean]',
+                  '  // [optional, duplicate]', '  // [duplicate]', '  // description only', '// [array]']
+
+
+class DecoderBlockTest(TestCase):
+    # ------------------------------------------------------------------------------------------------------------------
+    # Differential tests: scan_block should give the same result as scanning the block line by line
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_scan_block_with_content_files(self):
+        decoded_count = 0
+        for lines in self._get_content_files():
+            self._assert_same_result(lines)
+            if ApiDecoder()._decode_block_with_json(lines) is not None:
+                decoded_count += 1
+        # all the valid content files could be parsed by the json module:
+        self.assertEqual(decoded_count, 7)
+
+    def test_scan_block_with_mutated_content(self):
+        rand = random.Random(_FUZZ_SEED)
+        contents = self._get_content_files()
+        decoded_count = 0
+        for i in range(_FUZZ_CASES):
+            lines = list(rand.choice(contents))
+            for j in range(rand.randint(1, 2)):
+                index = rand.randrange(len(lines))
+                line = lines[index]
+                operation = rand.randrange(4)
+                if operation == 0:  # replace a character
+                    position = rand.randrange(len(line) + 1)
+                    lines[index] = line[:position] + rand.choice(_FUZZ_CHARACTERS) + line[position + 1:]
+                elif operation == 1:  # insert a line
+                    lines.insert(index, rand.choice(_FUZZ_LINES))
+                elif operation == 2:  # delete a line
+                    del lines[index]
+                    if not lines:
+                        lines.append('\n')
+                else:  # change the comment
+                    lines[index] = line.split('//')[0].rstrip('\n') + rand.choice(_FUZZ_COMMENTS) + '\n'
+            self._assert_same_result(lines)
+            if ApiDecoder()._decode_block_with_json(lines) is not None:
+                decoded_count += 1
+        self.assertTrue(decoded_count > 0)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Utilities for testing:
+    # ------------------------------------------------------------------------------------------------------------------
+    def _assert_same_result(self, lines):
+        expected = self._scan(lines, by_block=False)
+        result = self._scan(lines, by_block=True)
+        self.assertEqual(result, expected, 'Results not matched with lines:\n%s' % ''.join(lines))
+
+    @staticmethod
+    def _scan(lines, by_block):
+        decoder = ApiDecoder()
+        try:
+            if by_block:
+                decoder.scan_block(lines)
+            else:
+                for line in lines:
+                    decoder.scan_line(line)
+        except Exception as e:
+            return 'error', type(e).__name__, str(e)
+        return 'parsed', DecoderBlockTest._get_signature(decoder.get_parsed_objects())
+
+    @staticmethod
+    def _get_signature(element):
+        if element is None:
+            return None
+        if isinstance(element, ApiContentDictionaryElement):
+            content = [(key, DecoderBlockTest._get_signature(child)) for key, child in element.content.items()]
+        elif isinstance(element, ApiContentArrayElement):
+            content = [DecoderBlockTest._get_signature(child) for child in element.content]
+        else:
+            content = None
+        return type(element).__name__, element.required, element.default, content
+
+    @staticmethod
+    def _get_content_files():
+        contents = list()
+        for sub_path in ['request', 'response']:
+            content_path = path.join(_current_file_path, sub_path)
+            for filename in sorted(listdir(content_path)):
+                if filename.endswith('.json'):
+                    with open(path.join(content_path, filename), 'r') as f:
+                        contents.append(['        %s' % line for line in f.readlines()])
+        return contents
@@ -0,0 +1,75 @@
+__author__ = 'Arsenal_49'
+
+import random
+from os import listdir
+from os import path
+from unittest import TestCase
+from pre_commit_hook.apiary import ApiaryValidator
+from pre_commit_hook.decoder import ApiDecoder, ENGINE_CHARACTER, ENGINE_REGEX
+
+_current_file_path = path.dirname(path.abspath(__file__))
+_FUZZ_CHARACTERS = '{}[]",:.0123456789 \ttTrRuUeEfFaAlLsS-_/\\#\n'
+_FUZZ_SEED = 49
+_FUZZ_CASES = 300
+
+
+class DecoderEnginesTest(TestCase):
+    # ------------------------------------------------------------------------------------------------------------------
+    # Differential tests: the regex engine should give the same result as the character engine
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_engines_with_content_files(self):
+        for lines in self._get_content_files():
+            self._assert_same_result(lines)
+
+    def test_engines_with_mutated_content(self):
+        rand = random.Random(_FUZZ_SEED)
+        contents = self._get_content_files()
+        for i in range(_FUZZ_CASES):
+            lines = list(rand.choice(contents))
+            index = rand.randrange(len(lines))
+            line = lines[index]
+            position = rand.randrange(len(line) + 1)
+            operation = rand.randrange(3)
+            if operation == 0:  # insert
+                line = line[:position] + rand.choice(_FUZZ_CHARACTERS) + line[position:]
+            elif operation == 1:  # delete
+                line = line[:position] + line[position + 1:]
+            else:  # replace
+                line = line[:position] + rand.choice(_FUZZ_CHARACTERS) + line[position + 1:]
+            lines[index] = line
+            self._assert_same_result(lines)
+
+    def test_engines_with_validator(self):
+        for filename in ['order_2.apib', 'test_case_002.apib']:
+            file_path = path.join(_current_file_path, filename)
+            self.assertEqual(ApiaryValidator(decoder_engine=ENGINE_CHARACTER).validate_file(file_path),
+                             ApiaryValidator(decoder_engine=ENGINE_REGEX).validate_file(file_path))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Utilities for testing:
+    # ------------------------------------------------------------------------------------------------------------------
+    def _assert_same_result(self, lines):
+        expected = self._scan_lines(ENGINE_CHARACTER, lines)
+        result = self._scan_lines(ENGINE_REGEX, lines)
+        self.assertEqual(result, expected, 'Results not matched with lines:\n%s' % ''.join(lines))
+
+    @staticmethod
+    def _scan_lines(engine, lines):
+        decoder = ApiDecoder(engine=engine)
+        for line_count, line in enumerate(lines, 1):
+            try:
+                decoder.scan_line(line)
+            except Exception as e:
+                return 'error', line_count, type(e).__name__, str(e)
+        return 'parsed', str(decoder.get_parsed_objects())
+
+    @staticmethod
+    def _get_content_files():
+        contents = list()
+        for sub_path in ['request', 'response']:
+            content_path = path.join(_current_file_path, sub_path)
+            for filename in sorted(listdir(content_path)):
+                if filename.endswith('.json') and not filename.endswith('template.json'):
+                    with open(path.join(content_path, filename), 'r') as f:
+                        contents.append(['        %s' % line for line in f.readlines()])
+        return contents
@@ -0,0 +1,67 @@
+__author__ = 'Arsenal_49'
+
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+_package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The budget of importing pre_commit_hook.validate for `validate_apiary --help`, in microseconds. The import takes
+# about 30ms on a laptop, the budget leaves some room for the slower machines.
+_IMPORT_TIME_BUDGET = 60000
+
+# The modules which should only be loaded when they are used:
+_LAZY_MODULES = ['pre_commit_hook.decoder', 'pre_commit_hook.api.ApiContentElement', 'pre_commit_hook.api.Exception',
+                 'pre_commit_hook.cache', 'pre_commit_hook.incremental', 'pre_commit_hook.daemon',
+                 'pre_commit_hook.profiling', 'six', 'random']
+
+
+# Define the testCase
+class ImportTimeTest(TestCase):
+
+    def test_help_import_time(self):
+        code = 'import sys; from pre_commit_hook.validate import validate; sys.exit(validate(["--help"]))'
+        import_times = list()
+        for i in range(3):
+            stdout, stderr = self._run_python(['-X', 'importtime', '-c', code])
+            self.assertIn('--jobs', stdout)
+            import_times.append(self._get_import_times(stderr))
+
+        for module in _LAZY_MODULES:
+            self.assertNotIn(module, import_times[0], '%s is imported for --help' % module)
+        cumulative = min(times['pre_commit_hook.validate'] for times in import_times)
+        self.assertLess(cumulative, _IMPORT_TIME_BUDGET,
+                        'importing pre_commit_hook.validate takes %dus, over the budget of %dus'
+                        % (cumulative, _IMPORT_TIME_BUDGET))
+
+    def test_load_decoder_with_code_block(self):
+        code = ('import sys; from pre_commit_hook.validate import MixValidator; '
+                'print(MixValidator().validate_text(sys.argv[1])[0], "pre_commit_hook.decoder" in sys.modules)')
+        document = '# Group A\n## api [/a]\n### get [GET]\n'
+        self.assertEqual(self._run_python(['-c', code, document])[0].split(), ['True', 'False'])
+
+        document += '+ Response 200 (application/json)\n\n        {\n            "id": 1\n        }\n'
+        self.assertEqual(self._run_python(['-c', code, document])[0].split(), ['True', 'True'])
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Utilities for testing:
+    # ------------------------------------------------------------------------------------------------------------------
+    @staticmethod
+    def _run_python(arguments):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [_package_root, env.get('PYTHONPATH')]))
+        process = subprocess.run([sys.executable] + arguments, cwd=_package_root, env=env,
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        return process.stdout, process.stderr
+
+    @staticmethod
+    def _get_import_times(output):
+        # The lines of -X importtime: "import time: <self us> | <cumulative us> | <indented module name>"
+        import_times = dict()
+        for line in output.splitlines():
+            if line.startswith('import time:'):
+                fields = line[len('import time:'):].split('|')
+                if len(fields) == 3 and fields[1].strip().isdigit():
+                    import_times[fields[2].strip()] = int(fields[1])
+        return import_times
@@ -0,0 +1,75 @@
+__author__ = 'Arsenal_49'
+
+import shutil
+import tempfile
+from os import path
+from unittest import TestCase
+from pre_commit_hook.apiary import ApiaryValidator
+from pre_commit_hook.cache import ValidationCache
+from pre_commit_hook.incremental import IncrementalValidator, split_sections
+from pre_commit_hook.validate import MixValidator
+
+_current_file_path = path.dirname(path.abspath(__file__))
+
+
+class IncrementalValidatorTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ValidationCache(self.directory)
+        with open(path.join(_current_file_path, 'order_2.apib'), 'r') as f:
+            self.lines = [line.replace('\t', '    ') for line in f.readlines()]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_split_sections(self):
+        sections = split_sections(self.lines)
+        self.assertEqual(len(sections), 13)
+        self.assertEqual(sum([len(section) for start, section in sections]), len(self.lines))
+        self.assertTrue(sections[1][1][0].startswith('## 7/21'))
+
+    def test_validate_unchanged_document(self):
+        v = IncrementalValidator(self.cache)
+        self.assertEqual(v.validate_lines(self.lines), (True, None))
+        self.assertEqual(v.validated_section_count, 13)
+
+        v = IncrementalValidator(self.cache)
+        self.assertEqual(v.validate_lines(self.lines), (True, None))
+        self.assertEqual(v.validated_section_count, 0)
+        self.assertEqual(v.cached_section_count, 13)
+
+    def test_validate_changed_section(self):
+        IncrementalValidator(self.cache).validate_lines(self.lines)
+
+        lines = self.lines[:]
+        lines[6] = '    + sessionKey    (string) ... The session key\n'
+        v = IncrementalValidator(self.cache)
+        self.assertEqual(v.validate_lines(lines), (True, None))
+        self.assertEqual(v.validated_section_count, 1)
+
+    def test_validate_with_same_errors(self):
+        IncrementalValidator(self.cache).validate_lines(self.lines)
+
+        lines = self.lines[:]
+        lines[6] = '    + undefinedKey    (string) ... SessionKey\n'
+        for i in range(2):
+            expected = ApiaryValidator()
+            self.assertFalse(expected.validate_lines(lines)[0])
+            v = IncrementalValidator(self.cache)
+            valid, error = v.validate_lines(lines)
+            self.assertFalse(valid)
+            self.assertEqual(error.message, expected.errors[0][1].message)
+            self.assertEqual(v.errors[0][0], expected.errors[0][0])
+            self.assertEqual(v.errors[0][0], 7)
+
+    def test_validate_with_mix_validator(self):
+        with open(path.join(_current_file_path, 'order_2.apib'), 'r') as f:
+            lines = f.readlines()
+        for i in range(2):
+            v = IncrementalValidator(self.cache, validator_cls=MixValidator)
+            valid, error = v.validate_lines(lines)
+            self.assertFalse(valid)
+            self.assertEqual(error.message, 'contains tab in line')
+            self.assertEqual(v.errors[0][0], 504)
+
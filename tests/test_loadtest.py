@@ -0,0 +1,149 @@
+__author__ = 'Arsenal_49'
+
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.loadtest import LoadGenerator, LatencyHistogram, _EndpointStats
+from pre_commit_hook.mockserver import MockServer
+
+import asyncio
+import io
+import os
+import random
+from urllib.parse import urlsplit, parse_qs
+from unittest import TestCase
+
+_current_file_path = os.path.dirname(os.path.abspath(__file__))
+
+
+# Define the testCase
+class LoadGeneratorTest(TestCase):
+
+    def setUp(self):
+        self.endpoints = BlueprintReader().read_file(os.path.join(_current_file_path, 'order_2.apib'))
+
+    def test_histogram(self):
+        rand = random.Random(49)
+        values = sorted(int(rand.lognormvariate(8, 1.5)) for i in range(20000))
+        histogram = LatencyHistogram()
+        for value in values[:10000]:
+            histogram.record(value)
+        other = LatencyHistogram()
+        for value in values[10000:]:
+            other.record(value)
+        histogram.merge(other)
+        self.assertEqual(histogram.count, len(values))
+        self.assertEqual(histogram.max, values[-1])
+        for percentile in [50, 90, 99, 99.9]:
+            exact = values[int(percentile / 100.0 * len(values)) - 1]
+            self.assertLess(abs(histogram.get_percentile(percentile) - exact), exact / 100.0 + 1, percentile)
+
+    def test_targets(self):
+        generator = LoadGenerator(self.endpoints, 'http://localhost:3000/v1', parameters={'sessionKey': 'abc'},
+                                  pool_size=1)
+        endpoint = self.endpoints[0]  # /departments{?sessionKey,hospitalCode,patientClass,offset,limit}
+        self.assertEqual(endpoint.parameter_types['offset'], ('number', False))
+        target = urlsplit(generator.get_target(endpoint))
+        self.assertEqual(target.path, '/v1/departments')
+        query = parse_qs(target.query)
+        self.assertEqual(sorted(query), ['hospitalCode', 'patientClass', 'sessionKey'])
+        self.assertEqual(query['sessionKey'], ['abc'])
+
+        target = generator.get_target(self.endpoints[1])  # /interface/order/dictionary/{dictionaryId}
+        self.assertRegex(urlsplit(target).path, r'^/v1/interface/order/dictionary/[a-z0-9]{8}$')
+        self.assertIn('limit=', target)
+
+    def test_weights_and_validation(self):
+        weights = dict((endpoint.name, 0) for endpoint in self.endpoints)
+        weights['GET /orders'] = 3
+        weights['GET /order/{orderCode}'] = 1
+
+        async def _run():
+            server = await MockServer(self.endpoints).start('127.0.0.1', 0)
+            try:
+                url = 'http://127.0.0.1:%d' % server.sockets[0].getsockname()[1]
+                generator = LoadGenerator(self.endpoints, url, rate=400, duration=0.5, connections=4,
+                                          weights=weights, validate_fraction=1.0)
+                return await generator.run_async()
+            finally:
+                server.close()
+
+        report = asyncio.run(_run())
+        result = report.to_dict()
+        self.assertEqual(sorted(result['endpoints']), ['GET /order/{orderCode}', 'GET /orders'])
+        self.assertEqual(result['scheduled'], 200)
+        self.assertEqual(result['requests'], 200)
+        self.assertEqual((result['errors'], result['mismatches'], result['validated']), (0, 0, 200))
+        self.assertGreater(result['endpoints']['GET /orders']['requests'], 100)
+        self.assertEqual(result['endpoints']['GET /orders']['statuses'], {'200': result['endpoints']['GET /orders']
+                                                                                       ['requests']})
+
+    def test_coordinated_omission(self):
+        # The service stalls 300ms on the first request of its only connection, the requests scheduled meanwhile
+        # wait behind it and their latencies are counted from their scheduled times:
+        state = {'stalled': False}
+
+        async def _handle(reader, writer):
+            try:
+                while True:
+                    await reader.readuntil(b'\r\n\r\n')
+                    if not state['stalled']:
+                        state['stalled'] = True
+                        await asyncio.sleep(0.3)
+                    writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}')
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+
+        async def _run():
+            server = await asyncio.start_server(_handle, '127.0.0.1', 0)
+            try:
+                url = 'http://127.0.0.1:%d' % server.sockets[0].getsockname()[1]
+                generator = LoadGenerator(self.endpoints[6:7], url, rate=100, duration=0.5, connections=1)
+                return await generator.run_async()
+            finally:
+                server.close()
+
+        histogram = asyncio.run(_run()).get_total_histogram()
+        self.assertEqual(histogram.count, 50)
+        self.assertGreater(histogram.get_percentile(50), 20000)
+        self.assertGreater(histogram.get_percentile(99), 250000)
+
+    def test_stalled_service(self):
+        # The service never answers: the request waiting for its response and the ones never sent when the run
+        # stops are counted as timed out, with the one which timed out by itself:
+        async def _handle(reader, writer):
+            try:
+                await reader.read()
+            except ConnectionError:
+                pass
+            writer.close()
+
+        async def _run():
+            server = await asyncio.start_server(_handle, '127.0.0.1', 0)
+            try:
+                url = 'http://127.0.0.1:%d' % server.sockets[0].getsockname()[1]
+                generator = LoadGenerator(self.endpoints[6:7], url, rate=50, duration=0.2, connections=1, timeout=0.3)
+                return await generator.run_async()
+            finally:
+                server.close()
+
+        result = asyncio.run(_run()).to_dict()
+        self.assertEqual((result['scheduled'], result['requests'], result['errors']), (10, 0, 10))
+        self.assertEqual(result['endpoints']['GET /order/{orderCode}']['error_kinds'], {'TimeoutError': 10})
+
+    def test_validation_mismatches(self):
+        link_endpoints = BlueprintReader().read_stream(io.StringIO('''# Group Links
+
+## Links [/links]
+### Get the links [GET]
+
++ Response 200 (application/json)
+
+        {
+            "link": "https://example.com/a" // [string(url)]
+        }
+'''))
+        stats = _EndpointStats()
+        for body in [b'{"link": 5}', b'{"link": "https://example.com/b"}', b'{}']:
+            LoadGenerator._validate(link_endpoints[0], 200, body, stats)
+        self.assertEqual(stats.validated, 3)
+        self.assertEqual(dict(stats.mismatches), {'AssertionError at -': 1,
+                                                  'ResponseContentNotFoundException at None.link': 1})
@@ -1,7 +1,9 @@
 __author__ = 'admin'
 
 import os
-from pre_commit_hook.validate import MixValidator
+import shutil
+import tempfile
+from pre_commit_hook.validate import MixValidator, validate
 from unittest import TestCase
 
 
@@ -27,3 +29,26 @@ class TestMixValidator(TestCase):
         self.assertFalse(result)
         self.assertIsNotNone(error)
         self.assertEqual('contains tab in line', error.message)
+
+    def test_validate_with_jobs(self):
+        filenames = ['order_2.apib', 'test_case_002.apib']
+        self.assertEqual(validate(['--no-cache'] + filenames), -1)
+        self.assertEqual(validate(['--no-cache', '--jobs', '2'] + filenames), -1)
+        self.assertEqual(validate(['--no-cache', '--jobs', '2', 'test_case_002.apib', 'test_case_002.apib']), 0)
+
+    def test_validate_with_all_errors(self):
+        v = MixValidator()
+        result, error = v.validate_file('%s/order_2.apib' % os.getcwd(), max_errors=10)
+        self.assertFalse(result)
+        self.assertEqual([line for line, e in v.errors], [504, 784])
+        self.assertEqual(validate(['--no-cache', '--all-errors', 'order_2.apib']), -1)
+
+    def test_validate_with_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            for i in range(2):
+                self.assertEqual(validate(['--cache-dir', cache_dir, 'order_2.apib']), -1)
+                self.assertEqual(validate(['--cache-dir', cache_dir, 'test_case_002.apib']), 0)
+            self.assertTrue(len(os.listdir(cache_dir)) > 2)  # the results of the files and their sections
+        finally:
+            shutil.rmtree(cache_dir)
@@ -0,0 +1,100 @@
+__author__ = 'Arsenal_49'
+
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.mockserver import MockServer
+from pre_commit_hook.api.ApiContentCompiler import get_compiled_validator
+
+import asyncio
+import json
+import os
+from unittest import TestCase
+
+_current_file_path = os.path.dirname(os.path.abspath(__file__))
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.lower().split(': ', 1) for line in lines[1:] if line)
+    body = await reader.readexactly(int(headers['content-length']))
+    return int(lines[0].split(' ')[1]), body
+
+
+# Define the testCase
+class MockServerTest(TestCase):
+
+    def setUp(self):
+        self.endpoints = BlueprintReader().read_file(os.path.join(_current_file_path, 'order_2.apib'))
+        self.server = MockServer(self.endpoints, pool_size=4, seed=49)
+
+    def _exchange(self, payload, count):
+        async def _read(reader):
+            responses = [await _read_response(reader) for i in range(count)]
+            return responses, await reader.read() == b''
+        return self._connect(payload, _read)
+
+    def _connect(self, payload, read):
+        async def _run():
+            server = await self.server.start('127.0.0.1', 0)
+            try:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                writer.write(payload)
+                result = await read(reader)
+                writer.close()
+                return result
+            finally:
+                server.close()
+                await server.wait_closed()
+        return asyncio.run(_run())
+
+    def test_pipelined_requests(self):
+        requests = [b'GET /orders?sessionKey=abc HTTP/1.1\r\nHost: localhost\r\n\r\n',
+                    b'GET /patients/P001/cre HTTP/1.1\r\nPrefer: status=404\r\n\r\n',
+                    b'POST /account/A001/orderRecords HTTP/1.1\r\nContent-Length: 12\r\n\r\n{"quantity":',
+                    b'1}GET /unknown HTTP/1.1\r\n\r\n',
+                    b'GET /order/O001 HTTP/1.1\r\nConnection: close\r\n\r\n']
+        responses, closed = self._exchange(b''.join(requests), 5)
+        self.assertTrue(closed)
+        self.assertEqual([status for status, body in responses], [200, 404, 200, 404, 200])
+
+        expected = [self.endpoints[3].get_response(200), self.endpoints[4].get_response(404),
+                    self.endpoints[8].get_response(200), None, self.endpoints[6].get_response(200)]
+        for (status, body), element in zip(responses, expected):
+            if element is None:
+                continue
+            get_compiled_validator(element)(json.loads(body.decode('utf-8')))
+
+    def test_pool(self):
+        bodies = [self.server.get_response(b'GET', b'/order/O%03d' % i) for i in range(8)]
+        self.assertEqual(len(set(bodies)), 4)
+        self.assertEqual(bodies[:4], bodies[4:])
+        self.assertEqual(MockServer(self.endpoints, pool_size=4, seed=49).get_response(b'GET', b'/order/O001'),
+                         bodies[0])
+
+    def test_bad_request(self):
+        responses, closed = self._exchange(b'GARBAGE\r\n\r\nGET /orders HTTP/1.1\r\n\r\n', 1)
+        self.assertEqual(responses[0][0], 400)
+        self.assertTrue(closed)
+
+    def test_head_request(self):
+        async def _read(reader):
+            head = await reader.readuntil(b'\r\n\r\n')
+            return head, await _read_response(reader), await reader.read() == b''
+        head, (status, body), closed = self._connect(b'HEAD /order/O001 HTTP/1.1\r\n\r\n'
+                                                     b'GET /order/O001 HTTP/1.1\r\nConnection: close\r\n\r\n', _read)
+        self.assertTrue(head.startswith(b'HTTP/1.1 200 OK\r\n'))
+        self.assertIn(b'Content-Length: ', head)
+        self.assertEqual(status, 200)
+        self.assertTrue(closed)
+        get_compiled_validator(self.endpoints[6].get_response(200))(json.loads(body.decode('utf-8')))
+
+    def test_rejected_bodies(self):
+        responses, closed = self._exchange(b'POST /account/A001/orderRecords HTTP/1.1\r\n'
+                                           b'Content-Length: 1073741824\r\n\r\n{"quantity":', 1)
+        self.assertEqual(responses[0][0], 413)
+        self.assertTrue(closed)
+
+        responses, closed = self._exchange(b'POST /account/A001/orderRecords HTTP/1.1\r\n'
+                                           b'Transfer-Encoding: chunked\r\n\r\n4\r\nGET \r\n0\r\n\r\n', 1)
+        self.assertEqual(responses[0][0], 501)
+        self.assertTrue(closed)
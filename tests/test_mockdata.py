@@ -0,0 +1,83 @@
+__author__ = 'Arsenal_49'
+
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.mockdata import MockDataGenerator, main
+from pre_commit_hook.api.ApiContentElement import ApiContentElementFactory
+from pre_commit_hook.api.ApiContentCompiler import get_compiled_validator
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+_current_file_path = os.path.dirname(os.path.abspath(__file__))
+
+
+# Define the testCase
+class MockDataGeneratorTest(TestCase):
+
+    def setUp(self):
+        self.endpoints = BlueprintReader().read_file(os.path.join(_current_file_path, 'order_2.apib'))
+        self.schemas = [element for endpoint in self.endpoints for element in endpoint.responses.values()]
+
+    def test_valid_payloads(self):
+        generator = MockDataGenerator(seed=49)
+        for schema in self.schemas:
+            for options in [{}, {'array_length': 0}, {'array_length': 100}, {'size': 100000}]:
+                payload = b''.join(generator.iter_chunks(schema, **options))
+                get_compiled_validator(schema)(json.loads(payload.decode('utf-8')))
+
+    def test_deterministic(self):
+        payloads = list()
+        for i in range(2):
+            generator = MockDataGenerator(seed=7)
+            payloads.append([b''.join(generator.iter_chunks(schema, array_length=20)) for schema in self.schemas])
+        self.assertEqual(payloads[0], payloads[1])
+        generator = MockDataGenerator(seed=8)
+        self.assertNotEqual([b''.join(generator.iter_chunks(schema, array_length=20)) for schema in self.schemas],
+                            payloads[0])
+
+    def test_array_length_and_size(self):
+        item = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        item.add_element(ApiContentElementFactory.get_response_element_by_type('string'), 'name')
+        items = ApiContentElementFactory.get_response_element_by_type('array')
+        items.add_element(item)
+        schema = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        schema.add_element(items, 'items')
+        schema.add_element(ApiContentElementFactory.get_response_element_by_type('number'), 'total')
+
+        generator = MockDataGenerator(seed=49, chunk_size=4096)
+        payload = json.loads(b''.join(generator.iter_chunks(schema, array_length=5000)).decode('utf-8'))
+        self.assertEqual(len(payload['items']), 5000)
+        self.assertEqual(len(json.loads(generator.render(schema).decode('utf-8'))['items']), 1)
+
+        chunks = list(generator.iter_chunks(schema, size=1000000))
+        self.assertTrue(all(len(chunk) >= 4096 for chunk in chunks[:-1]))
+        size = sum(len(chunk) for chunk in chunks)
+        self.assertTrue(1000000 <= size < 1000000 + 100, size)
+        get_compiled_validator(schema)(json.loads(b''.join(chunks).decode('utf-8')))
+
+    def test_write(self):
+        schema = ApiContentElementFactory.get_response_element_by_type('array')
+        schema.add_element(ApiContentElementFactory.get_response_element_by_type('boolean'))
+        output = io.BytesIO()
+        count = MockDataGenerator().write(schema, output, array_length=10)
+        self.assertEqual(count, len(output.getvalue()))
+        self.assertEqual(len(json.loads(output.getvalue().decode('utf-8'))), 10)
+
+    def test_main(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'orders.json')
+            argv = [os.path.join(_current_file_path, 'order_2.apib'), 'GET /orders', '--size', '64K', '-o', path]
+            self.assertEqual(main(argv), 0)
+            with open(path, 'rb') as f:
+                payload = json.loads(f.read().decode('utf-8'))
+            get_compiled_validator(self.endpoints[3].get_response(200))(payload)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(main([argv[0], 'GET /unknown']), -1)
+        finally:
+            shutil.rmtree(directory)
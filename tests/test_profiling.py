@@ -0,0 +1,102 @@
+__author__ = 'Arsenal_49'
+
+from pre_commit_hook.apiary import ApiaryValidator
+from pre_commit_hook.decoder import ApiDecoder
+from pre_commit_hook.profiling import Profiler, ValidationHooks, profile_validation
+from pre_commit_hook.validate import validate
+from pre_commit_hook.api.ApiContentElement import ApiContentArrayElement
+
+import contextlib
+import io
+import os
+from unittest import TestCase
+
+_current_file_path = os.path.dirname(os.path.abspath(__file__))
+
+
+class _RecordingHooks(ValidationHooks):
+
+    def __init__(self):
+        self.lines = list()
+        self.decoded_lines = list()
+        self.merges = 0
+
+    def on_line(self, line_count, line, state, next_state, seconds):
+        self.lines.append(line_count)
+
+    def on_decode(self, line_count, seconds):
+        self.decoded_lines.append(line_count)
+
+    def on_merge(self, line_count, seconds):
+        self.merges += 1
+
+
+# Define the testCase
+class ProfilingTest(TestCase):
+
+    def test_profiler(self):
+        path = os.path.join(_current_file_path, 'order_2.apib')
+        with open(path, 'r') as f:
+            lines = f.readlines()
+        validator, profiler = ApiaryValidator(), Profiler(top=5)
+        with profile_validation(validator, profiler):
+            self.assertEqual(validator.validate_file(path), (True, None))
+
+        self.assertEqual(profiler.line_count, len(lines))
+        self.assertAlmostEqual(sum(profiler.state_times.values()), profiler.read_time)
+        self.assertLessEqual(profiler.merge_time, profiler.decode_time)
+        self.assertLessEqual(profiler.decode_time, profiler.read_time)
+        self.assertGreater(profiler.merge_count, 0)
+
+        blocks = profiler.get_slowest_blocks()
+        self.assertEqual(len(profiler.blocks), len([line for line in lines if line.startswith(('+ Request',
+                                                                                                 '+ Response'))]))
+        self.assertEqual(len(blocks), 5)
+        self.assertEqual(blocks, sorted(blocks, reverse=True))
+        for seconds, kind, title, first_line, last_line in blocks:
+            self.assertTrue(lines[first_line - 1].startswith('+ %s' % kind.capitalize()))
+            self.assertLessEqual(first_line, last_line)
+        self.assertIn('GET /orders', profiler.section_times['endpoint'])
+        self.assertEqual(len(profiler.section_times['group']), 1)
+        slowest_lines = profiler.get_slowest_lines()
+        self.assertEqual(len(slowest_lines), 5)
+        self.assertEqual(slowest_lines, sorted(slowest_lines, reverse=True))
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            profiler.print_report()
+        self.assertIn('read response block', output.getvalue())
+        self.assertIn('slowest code blocks:', output.getvalue())
+
+    def test_line_counts_with_errors(self):
+        lines = ['# Group A', '+ Response 200', '## api [/a]', '+ Request abc', '## api [/b]', '### get [GET]',
+                 '+ Response 200', '', '        [', '            {"id": 1},', '            {"id": 2}', '        ]']
+        validator, hooks = ApiaryValidator(), _RecordingHooks()
+        with profile_validation(validator, hooks), contextlib.redirect_stdout(io.StringIO()):
+            validator.validate_lines(lines, max_errors=10)
+        # The lines skipped while recovering from the errors are not read, the others keep their line numbers:
+        self.assertEqual(hooks.lines, [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12])
+        self.assertEqual([line_count for line_count, error in validator.errors], [2, 4])
+        # The block is tried at once from its first line, then scanned line by line since json does not read its layout:
+        self.assertEqual(hooks.decoded_lines, [9, 9, 10, 11, 12])
+        self.assertEqual(hooks.merges, 2)
+
+    def test_restored(self):
+        scan_line, add_element = ApiDecoder.scan_line, ApiContentArrayElement.add_element
+        validator, hooks = ApiaryValidator(), _RecordingHooks()
+        with self.assertRaises(ValueError):
+            with profile_validation(validator, hooks):
+                raise ValueError()
+        self.assertIs(ApiDecoder.scan_line, scan_line)
+        self.assertIs(ApiContentArrayElement.add_element, add_element)
+        self.assertNotIn('_read_line', vars(validator))
+        validator.validate_file(os.path.join(_current_file_path, 'order_2.apib'))
+        self.assertEqual(hooks.lines, [])
+
+    def test_validate_with_profile(self):
+        filename = os.path.relpath(os.path.join(_current_file_path, 'test_case_002.apib'), os.getcwd())
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(validate(['--profile', '--profile-top', '2', filename]), 0)
+        self.assertIn('time by validator state:', output.getvalue())
+        self.assertIn('validation pass with file', output.getvalue())
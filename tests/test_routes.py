@@ -0,0 +1,58 @@
+__author__ = 'Arsenal_49'
+
+from pre_commit_hook.blueprint import ApiEndpoint
+from pre_commit_hook.routes import RouteIndex
+
+from unittest import TestCase
+
+
+# Define the testCase
+class RouteIndexTest(TestCase):
+
+    def setUp(self):
+        self.endpoints = [
+            ApiEndpoint('GET', '/interface/order/dictionary/{dictionaryId}{?sessionKey,keyword}'),
+            ApiEndpoint('GET', '/interface/order/dictionary/search'),
+            ApiEndpoint('POST', '/interface/order/dictionary/{dictionaryId}'),
+            ApiEndpoint('GET', '/interface/order/{orderId}/items/{itemId}'),
+            ApiEndpoint('GET', '/interface/order/{orderId}/history'),
+            ApiEndpoint('GET', '/interface/order/latest/items/{itemId}.{format}'),
+            ApiEndpoint('GET', '/'),
+        ]
+        self.index = RouteIndex(self.endpoints)
+
+    def test_lookup(self):
+        cases = [
+            ('GET', '/interface/order/dictionary/D01', 0, {'dictionaryId': 'D01'}),
+            ('get', '/interface/order/dictionary/search', 1, {}),
+            ('POST', '/interface/order/dictionary/search', 2, {'dictionaryId': 'search'}),
+            ('GET', '/interface/order/T001/items/3', 3, {'orderId': 'T001', 'itemId': '3'}),
+            ('GET', '/interface/order/T001/history', 4, {'orderId': 'T001'}),
+            # The static segment is tried first, then the parameter when the static branch has no match below:
+            ('GET', '/interface/order/latest/history', 4, {'orderId': 'latest'}),
+            ('GET', '/interface/order/latest/items/3', 3, {'orderId': 'latest', 'itemId': '3'}),
+            ('GET', '/interface/order/latest/items/3.json', 5, {'itemId': '3', 'format': 'json'}),
+            ('GET', '/', 6, {}),
+        ]
+        for method, path, index, parameters in cases:
+            self.assertEqual(self.index.lookup(method, path), (self.endpoints[index], parameters), path)
+
+    def test_lookup_without_match(self):
+        for method, path in [('DELETE', '/interface/order/dictionary/D01'), ('GET', '/interface/order/dictionary'),
+                             ('GET', '/interface/order/dictionary/D01/more'), ('GET', '/interface/order//history'),
+                             ('GET', '/interface/order/dictionary/D01/'), ('GET', ''), ('GET', '/unknown')]:
+            self.assertIsNone(self.index.lookup(method, path), path)
+            self.assertIsNone(self.index.get_endpoint(method, path), path)
+
+    def test_first_endpoint_wins(self):
+        index = RouteIndex([ApiEndpoint('GET', '/a/{id}'), ApiEndpoint('GET', '/a/{name}')])
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.lookup('GET', '/a/1')[1], {'id': '1'})
+
+    def test_many_endpoints(self):
+        endpoints = [ApiEndpoint(method, '/service%d/resource%d/{id}' % (i % 50, i))
+                     for i in range(5000) for method in ['GET', 'PUT']]
+        index = RouteIndex(endpoints)
+        self.assertEqual(len(index), 10000)
+        self.assertIs(index.get_endpoint('PUT', '/service49/resource4999/7'), endpoints[-1])
+        self.assertIs(index.get_endpoint('GET', '/service0/resource0/7'), endpoints[0])
@@ -0,0 +1,120 @@
+__author__ = 'Arsenal_49'
+
+from pre_commit_hook.blueprint import BlueprintReader
+from pre_commit_hook.cache import get_source_digest
+from pre_commit_hook.schema_cache import dump_endpoints, load_endpoints, read_endpoints, get_schema_path
+from pre_commit_hook.api.ApiContentElement import ApiContentElementFactory, ApiContentDuplicateElement
+from pre_commit_hook.api.ApiContentCompiler import get_compiled_validator
+
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+_current_file_path = os.path.dirname(os.path.abspath(__file__))
+
+
+# Define the testCase
+class SchemaCacheTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.blueprint = os.path.join(self.directory, 'order_2.apib')
+        shutil.copy(os.path.join(_current_file_path, 'order_2.apib'), self.blueprint)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_dump_and_load(self):
+        endpoints = BlueprintReader().read_file(self.blueprint)
+        loaded_endpoints = load_endpoints(dump_endpoints(endpoints, 'hash'), 'hash')
+        self.assertEqual(len(loaded_endpoints), len(endpoints))
+        for endpoint, loaded_endpoint in zip(endpoints, loaded_endpoints):
+            self.assertEqual(vars(loaded_endpoint).keys(), vars(endpoint).keys())
+            for name in ['method', 'url', 'parameters', 'parameter_types', 'group', 'line_count']:
+                self.assertEqual(getattr(loaded_endpoint, name), getattr(endpoint, name))
+            self.assertEqual([name for name, element in loaded_endpoint.requests],
+                             [name for name, element in endpoint.requests])
+            self.assertEqual(sorted(loaded_endpoint.responses, key=str), sorted(endpoint.responses, key=str))
+            elements = [element for name, element in endpoint.requests] + list(endpoint.responses.values())
+            loaded_elements = [element for name, element in loaded_endpoint.requests] + \
+                              list(loaded_endpoint.responses.values())
+            for element, loaded_element in zip(elements, loaded_elements):
+                self.assertEqual(str(loaded_element), str(element))
+                # The parents are kept for the key paths of the errors:
+                self._assert_same_error(element, loaded_element, element.generate_json_object())
+
+    def test_load_shared_elements(self):
+        dictionary = ApiContentElementFactory.get_response_element_by_type('dictionary')
+        dictionary.add_element(ApiContentElementFactory.get_response_element_by_type('number'), 'id')
+        dictionary.add_element(ApiContentDuplicateElement(dictionary['id']), 'copy')
+        reader = BlueprintReader()
+        reader.validate_lines(['# Group A\n', '## api [/a]\n', '### get [GET]\n'])
+        endpoint = reader.get_endpoints()[0]
+        endpoint.responses[200] = dictionary
+        endpoint.responses[201] = dictionary
+
+        loaded_endpoint = load_endpoints(dump_endpoints([endpoint]))[0]
+        loaded_dictionary = loaded_endpoint.responses[200]
+        self.assertIs(loaded_endpoint.responses[201], loaded_dictionary)
+        self.assertIs(loaded_dictionary['copy'].source_element, loaded_dictionary['id'])
+        self._assert_same_error(dictionary, loaded_dictionary, {'id': 1, 'copy': 'text'})
+
+    def test_load_invalid_data(self):
+        self.assertIsNone(load_endpoints(b''))
+        self.assertIsNone(load_endpoints(b'pre-commit-apiary-schema 0\n'))
+        data = dump_endpoints([], 'hash')
+        self.assertIn(get_source_digest().encode('ascii'), data.split(b'\n')[0])
+        self.assertEqual(load_endpoints(data), [])
+        self.assertIsNone(load_endpoints(data, 'other'))
+        self.assertIsNone(load_endpoints(data[:-1]))
+
+    def test_read_endpoints(self):
+        for directory in [None, os.path.join(self.directory, 'cache')]:
+            endpoints = read_endpoints(self.blueprint, directory)
+            path = get_schema_path(self.blueprint, directory, self._get_content_hash())
+            self.assertTrue(os.path.exists(path))
+
+            # The second reading loads the serialized schemas:
+            os.utime(path, ns=(0, 0))
+            loaded_endpoints = read_endpoints(self.blueprint, directory)
+            self.assertEqual([e.name for e in loaded_endpoints], [e.name for e in endpoints])
+            self.assertEqual(os.stat(path).st_mtime_ns, 0)
+
+            # Changing the blueprint invalidates the serialized schemas:
+            with open(self.blueprint, 'a') as f:
+                f.write('\n')
+            read_endpoints(self.blueprint, directory)
+            path = get_schema_path(self.blueprint, directory, self._get_content_hash())
+            self.assertNotEqual(os.stat(path).st_mtime_ns, 0)
+
+    def test_read_invalid_blueprint(self):
+        with open(self.blueprint, 'w') as f:
+            f.write('# Group A\n### get [GET]\n')
+        with self.assertRaises(ValueError):
+            read_endpoints(self.blueprint, None)
+        self.assertFalse(os.path.exists(get_schema_path(self.blueprint)))
+
+    def test_read_endpoints_without_writable_directory(self):
+        directory = os.path.join(self.directory, 'cache')
+        os.makedirs(directory)
+        with mock.patch('os.replace', side_effect=OSError('read-only')):
+            endpoints = read_endpoints(self.blueprint, directory)
+        self.assertTrue(endpoints)
+        # The temporary file of the failed writing is removed:
+        self.assertEqual(os.listdir(directory), [])
+
+    def _get_content_hash(self):
+        with open(self.blueprint, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def _assert_same_error(self, element, loaded_element, json_object):
+        results = list()
+        for schema in [element, loaded_element]:
+            try:
+                get_compiled_validator(schema)(json_object)
+                results.append(None)
+            except Exception as e:
+                results.append((type(e).__name__, str(e)))
+        self.assertEqual(results[1], results[0])
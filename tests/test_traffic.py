@@ -0,0 +1,135 @@
+__author__ = 'Arsenal_49'
+
+from pre_commit_hook.traffic import TrafficValidator, main
+from pre_commit_hook.blueprint import BlueprintReader
+
+import contextlib
+import gzip
+import io
+import json
+import lzma
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+_BLUEPRINT = '''# Group Orders
+
+## Orders [/orders/{orderId}{?sessionKey}]
+### Get the order [GET]
+
++ Parameters
+    + orderId (string) ... The id of the order
+    + sessionKey (string) ... The session key
+
++ Response 200 (application/json)
+
+        {
+            "id": "T001",
+            "quantity": 2,
+            "note": "text"    // [string, optional]
+        }
+
++ Response 404 (application/json)
+
+        {
+            "message": "not found"
+        }
+
+## Order Items [/orders/{orderId}/items]
+### List the items [GET]
+
++ Parameters
+    + orderId (string) ... The id of the order
+
++ Response 200 (application/json)
+
+        {
+            "items": [
+                {
+                    "code": "A01"
+                }
+            ]
+        }
+'''
+
+_RECORDS = [
+    {'method': 'GET', 'path': '/orders/T001?sessionKey=abc', 'status': 200, 'body': {'id': 'T001', 'quantity': 2}},
+    {'method': 'get', 'path': 'https://host/orders/T002', 'status': 200, 'body': '{"id": "T002", "quantity": 1}'},
+    {'method': 'GET', 'path': '/orders/T003', 'status': 200, 'body': {'id': 'T003'}},
+    {'method': 'GET', 'path': '/orders/T004', 'status': 200, 'body': {'id': 4, 'quantity': 1}},
+    {'method': 'GET', 'path': '/orders/T005', 'status': 404, 'body': {'message': 'not found'}},
+    {'method': 'GET', 'path': '/orders/T006', 'status': 500, 'body': {}},
+    {'method': 'GET', 'path': '/orders/T007/items', 'status': 200, 'body': {'items': [{'code': 'A'}, {'code': 1}]}},
+    {'method': 'POST', 'path': '/orders/T008', 'status': 200, 'body': {}},
+    {'method': 'GET', 'path': '/unknown', 'status': 200, 'body': {}},
+    {'path': '/orders/T009'},
+]
+
+
+# Define the testCase
+class TrafficValidatorTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.blueprint = os.path.join(self.directory, 'orders.apib')
+        with open(self.blueprint, 'w') as f:
+            f.write(_BLUEPRINT)
+        lines = [json.dumps(record) for record in _RECORDS] + ['{not json', '', '[1, 2]']
+        self.content = ('\n'.join(lines * 50) + '\n').encode('utf-8')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_blueprint(self):
+        endpoints = BlueprintReader().read_file(self.blueprint)
+        self.assertEqual([endpoint.name for endpoint in endpoints],
+                         ['GET /orders/{orderId}', 'GET /orders/{orderId}/items'])
+        self.assertEqual(sorted(endpoints[0].responses), [200, 404])
+        self.assertEqual(endpoints[0].parameters, ['orderId', 'sessionKey'])
+
+    def test_validate_lines(self):
+        validator = TrafficValidator.from_blueprint(self.blueprint)
+        report = validator.validate_lines(self.content.splitlines())
+        self.assertEqual(report.counts, {'records': 12 * 50, 'valid': 3 * 50, 'mismatched': 3 * 50,
+                                         'unknown_route': 2 * 50, 'undocumented_status': 50, 'invalid_line': 3 * 50})
+        self.assertEqual(dict(report.mismatches), {
+            ('GET /orders/{orderId}', 'None.quantity', 'ResponseContentNotFoundException'): 50,
+            ('GET /orders/{orderId}', 'id', 'ResponseContentTypeNotValidException'): 50,
+            ('GET /orders/{orderId}', '-', 'status 500'): 50,
+            ('GET /orders/{orderId}/items', 'items.0.code', 'ResponseContentTypeNotValidException'): 50,
+        })
+
+    def test_validate_files(self):
+        validator = TrafficValidator.from_blueprint(self.blueprint)
+        expected = validator.validate_lines(self.content.splitlines()).to_dict()
+
+        files = {'traffic.ndjson': open, 'traffic.ndjson.gz': gzip.open, 'traffic.ndjson.xz': lzma.open}
+        for filename, opener in files.items():
+            path = os.path.join(self.directory, filename)
+            with opener(path, 'wb') as f:
+                f.write(self.content)
+            for jobs in [1, 2]:
+                for chunk_size in [100, 1024 * 1024]:  # a small chunk size splits the file into many chunks
+                    report = validator.validate_files([path], jobs, chunk_size)
+                    self.assertEqual(report.to_dict(), expected, '%s with %d jobs' % (filename, jobs))
+
+    def test_main(self):
+        path = os.path.join(self.directory, 'traffic.ndjson')
+        with open(path, 'wb') as f:
+            f.write(self.content)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main([self.blueprint, path, '--jobs', '2', '--json']), -1)
+        self.assertEqual(json.loads(output.getvalue())['records'], 12 * 50)
+
+        valid_path = os.path.join(self.directory, 'valid.ndjson')
+        with open(valid_path, 'w') as f:
+            f.write(json.dumps(_RECORDS[0]) + '\n')
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main([self.blueprint, valid_path, '--jobs', '1']), 0)
+            cache_directory = os.path.join(self.directory, 'cache')
+            for i in range(2):  # parse the blueprint, then load the serialized schemas
+                argv = [self.blueprint, valid_path, '--jobs', '1', '--schema-cache', cache_directory]
+                self.assertEqual(main(argv), 0)
+            self.assertEqual(len(os.listdir(cache_directory)), 1)